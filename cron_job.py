@@ -16,8 +16,8 @@ from typing import List, Dict, Any
 
 from paperscraper.get_dumps import arxiv
 
-from src import config_loader, psql
-from src.arxiv_pipeline import ArxivProcessPipeline
+from src import arxiv_metadata, config_loader, psql
+from src.batch_pipeline import BatchIngestPipeline
 from src.MindsDBMiddleware import knowledge_base, manager
 
 # Constants
@@ -123,45 +123,39 @@ def process_new_arxiv_ids() -> None:
 
         logger.info(f"Starting processing of {len(papers_metadata)} papers")
 
-        processed_count = 0
-        failed_count = 0
+        arxiv_ids = []
+        dump_metadata = {}
+        invalid_count = 0
 
         for i, paper_metadata in enumerate(papers_metadata, 1):
-            try:
-                # Extract ArXiv ID from DOI
-                doi = paper_metadata.get("doi", "")
-                if not doi:
-                    logger.warning(f"Paper {i}: Missing DOI, skipping")
-                    failed_count += 1
-                    continue
-
-                doi_parts = doi.split("/")
-                if len(doi_parts) < 2:
-                    logger.warning(f"Paper {i}: Invalid DOI format '{doi}', skipping")
-                    failed_count += 1
-                    continue
-
-                arxiv_id = doi_parts[1].replace("arXiv.", "")
-
-                logger.info(f"Processing paper {i}/{len(papers_metadata)}: {arxiv_id}")
-
-                # Process paper through pipeline
-                pipeline = ArxivProcessPipeline(
-                    arxiv_id=arxiv_id, knowledge_base=kb, postgres_client=psql_client
-                )
-                pipeline.process(create_paper_kb=False, add_to_main_kb=False)
-
-                processed_count += 1
-                logger.info(f"Successfully processed paper: {arxiv_id}")
+            # Extract ArXiv ID from DOI
+            doi = paper_metadata.get("doi", "")
+            if not doi:
+                logger.warning(f"Paper {i}: Missing DOI, skipping")
+                invalid_count += 1
+                continue
+
+            arxiv_id = arxiv_metadata.arxiv_id_from_doi(doi)
+            if not arxiv_id:
+                logger.warning(f"Paper {i}: Invalid DOI format '{doi}', skipping")
+                invalid_count += 1
+                continue
+
+            arxiv_ids.append(arxiv_id)
+            # Title, authors, abstract and date come from the dump, only the
+            # categories and version are looked up, in batches
+            dump_metadata[arxiv_id] = arxiv_metadata.metadata_from_dump(
+                paper_metadata, arxiv_id
+            )
 
-            except Exception as e:
-                failed_count += 1
-                arxiv_id = paper_metadata.get("doi", "unknown")
-                logger.error(f"Failed to process paper {arxiv_id}: {e}")
+        # Downloads, extraction and PostgreSQL writes of different papers overlap
+        pipeline = BatchIngestPipeline.from_config(kb, psql_client)
+        stats = pipeline.run(arxiv_ids, dump_metadata)
 
         logger.info(
-            f"Processing complete. Successfully processed: {processed_count}, "
-            f"Failed: {failed_count}"
+            f"Processing complete. Successfully processed: {stats.processed}, "
+            f"Already stored: {stats.skipped}, "
+            f"Failed: {stats.failed + invalid_count}"
         )
 
     except Exception as e:
@@ -169,6 +163,20 @@ def process_new_arxiv_ids() -> None:
         raise
 
 
+def refresh_facets() -> None:
+    """
+    Refresh the category/year facet counts after ingestion.
+
+    A failed refresh only leaves the counts stale, so it is logged rather than
+    failing the pipeline.
+    """
+    try:
+        psql_client.create_facet_view()
+        psql_client.refresh_facet_view()
+    except Exception as e:
+        logger.error(f"Failed to refresh facet counts: {e}")
+
+
 def remove_file() -> None:
     """
     Remove the metadata file after processing.
@@ -240,6 +248,9 @@ def start_arxiv_pipeline() -> None:
         # Process the downloaded papers
         process_new_arxiv_ids()
 
+        # Update the search facet counts with the new papers
+        refresh_facets()
+
         # Clean up the metadata file
         remove_file()
 
@@ -139,6 +139,7 @@ class KnowledgeBase:
         metadata: Dict[str, Any],
         limit: int = 10,
         relevance_threshold: float = 0.0,
+        rerank: bool = True,
     ) -> List[Dict[str, Any]]:
         """Search the knowledge base.
 
@@ -147,13 +148,14 @@ class KnowledgeBase:
             metadata: Metadata filters for search
             limit: Maximum number of results to return
             relevance_threshold: Minimum relevance score threshold
+            rerank: Whether to rerank results with the reranking model
 
         Returns:
             List of search results, empty list if no results or on error
         """
         try:
             search_query = utils.build_search_query(
-                name, query, metadata, limit, relevance_threshold
+                name, query, metadata, limit, relevance_threshold, rerank
             )
             results = self.conn.execute_query(search_query)
 
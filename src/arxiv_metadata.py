@@ -0,0 +1,182 @@
+"""
+Paper metadata from paperscraper dumps and batched ArXiv API lookups.
+
+The daily paperscraper dump already holds the title, authors, abstract and
+date of every new paper, but not its categories or version. Metadata taken
+from the dump is completed with batched arxiv.Search lookups of up to
+LOOKUP_BATCH_SIZE IDs each, instead of one rate-limited API call per paper.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import arxiv
+
+from . import paper_cache
+
+logger = logging.getLogger(__name__)
+
+# Fields of the metadata stored with every article
+METADATA_FIELDS = (
+    "authors",
+    "abstract",
+    "categories",
+    "published_year",
+    "primary_category",
+    "title",
+    "article_id",
+)
+
+# IDs per arxiv.Search; the API's page size limit is far higher, but long
+# id_list queries are slow to answer
+LOOKUP_BATCH_SIZE = 100
+
+# ArXiv DOIs look like 10.48550/arXiv.2301.12345
+ARXIV_DOI_PREFIX = "arXiv."
+
+
+def arxiv_id_from_doi(doi: str) -> Optional[str]:
+    """
+    Extract the ArXiv ID from a DOI in a paperscraper dump.
+
+    Args:
+        doi: DOI like "10.48550/arXiv.2301.12345"
+
+    Returns:
+        The ArXiv ID, or None if the DOI has no ID part
+    """
+    doi_parts = doi.split("/")
+    if len(doi_parts) < 2:
+        return None
+    return doi_parts[1].replace(ARXIV_DOI_PREFIX, "")
+
+
+def metadata_from_dump(entry: Dict[str, Any], arxiv_id: str) -> Dict[str, str]:
+    """
+    Map a paperscraper dump entry to article metadata.
+
+    Args:
+        entry: One line of the dump, with title, authors, abstract and date
+        arxiv_id: ID of the paper
+
+    Returns:
+        The metadata fields present in the entry; categories are never present
+    """
+    metadata = {"article_id": arxiv_id}
+    for field in ("title", "authors", "abstract"):
+        if entry.get(field) is not None:
+            metadata[field] = str(entry[field])
+    # Dates are formatted as YYYY-MM-DD
+    if entry.get("date"):
+        metadata["published_year"] = str(entry["date"])[:4]
+    return metadata
+
+
+def metadata_from_result(paper: arxiv.Result, arxiv_id: str) -> Dict[str, str]:
+    """
+    Map an arxiv API result to article metadata.
+
+    Args:
+        paper: Search result of the paper
+        arxiv_id: ID the article is stored under
+
+    Returns:
+        All metadata fields
+    """
+    return {
+        "authors": ", ".join(author.name for author in paper.authors),
+        "abstract": paper.summary or "",
+        "categories": ", ".join(paper.categories) if paper.categories else "",
+        "published_year": str(paper.published.year) if paper.published else "",
+        "primary_category": paper.primary_category or "",
+        "title": paper.title or "",
+        "article_id": arxiv_id,
+    }
+
+
+def missing_fields(metadata: Optional[Dict[str, str]]) -> List[str]:
+    """Return the metadata fields that are absent or None."""
+    metadata = metadata or {}
+    return [field for field in METADATA_FIELDS if metadata.get(field) is None]
+
+
+def fetch_metadata_batch(
+    arxiv_ids: List[str], client: arxiv.Client
+) -> Dict[str, Tuple[Dict[str, str], Optional[str]]]:
+    """
+    Look up several papers with one arxiv.Search.
+
+    Args:
+        arxiv_ids: IDs to look up, with or without version suffix
+        client: ArXiv API client, which spaces out consecutive requests
+
+    Returns:
+        Metadata and version of every paper found, keyed by the requested ID
+    """
+    # Results carry versioned IDs, map them back to the requested ones
+    requested = {
+        paper_cache.split_version(arxiv_id)[0]: arxiv_id for arxiv_id in arxiv_ids
+    }
+    search = arxiv.Search(id_list=list(arxiv_ids), max_results=len(arxiv_ids))
+
+    found = {}
+    for paper in client.results(search):
+        base_id, version = paper_cache.split_version(paper.get_short_id())
+        arxiv_id = requested.get(base_id)
+        if arxiv_id is not None:
+            found[arxiv_id] = (metadata_from_result(paper, arxiv_id), version)
+    return found
+
+
+def complete_metadata(
+    papers: Dict[str, Dict[str, str]],
+    client: Optional[arxiv.Client] = None,
+    batch_size: int = LOOKUP_BATCH_SIZE,
+) -> Iterable[Tuple[str, Dict[str, str], Optional[str]]]:
+    """
+    Fill in missing metadata fields with batched ArXiv API lookups.
+
+    Papers are yielded batch by batch, so callers can start working on the
+    first papers while later batches are looked up. Fields present in the
+    supplied metadata are kept. Papers that a failed or incomplete lookup
+    could not complete are yielded with their partial metadata.
+
+    Args:
+        papers: Supplied, possibly partial or empty, metadata keyed by ArXiv ID
+        client: ArXiv API client, a default client is created if None
+        batch_size: IDs per arxiv.Search
+
+    Yields:
+        Tuples of ArXiv ID, metadata and version (None if unknown)
+    """
+    client = client or arxiv.Client()
+    arxiv_ids = list(papers)
+
+    for start in range(0, len(arxiv_ids), batch_size):
+        batch = arxiv_ids[start : start + batch_size]
+        incomplete = [
+            arxiv_id for arxiv_id in batch if missing_fields(papers[arxiv_id])
+        ]
+
+        found = {}
+        if incomplete:
+            try:
+                found = fetch_metadata_batch(incomplete, client)
+                logger.info(
+                    f"Looked up metadata of {len(incomplete)} papers, "
+                    f"found {len(found)}"
+                )
+            except Exception as e:
+                logger.error(
+                    f"Batched metadata lookup of {len(incomplete)} papers failed: {e}"
+                )
+
+        for arxiv_id in batch:
+            metadata = dict(papers[arxiv_id] or {})
+            version = paper_cache.split_version(arxiv_id)[1]
+            if arxiv_id in found:
+                looked_up, version = found[arxiv_id]
+                for field, value in looked_up.items():
+                    if metadata.get(field) is None:
+                        metadata[field] = value
+            yield arxiv_id, metadata, version
@@ -7,15 +7,24 @@ in a knowledge base system.
 
 from io import BytesIO
 import logging
-import re
-import string
-from typing import List, Dict, Any
+import threading
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
 
-import PyPDF2
 import arxiv
-import requests
 
-from . import utils, config_loader as config, psql
+from . import (
+    utils,
+    arxiv_metadata,
+    config_loader as config,
+    dedup,
+    downloader,
+    paper_cache,
+    pdf_extraction,
+    psql,
+    sections,
+    stage_graph,
+    text_normalizer,
+)
 from src.MindsDBMiddleware import knowledge_base
 
 # Constants
@@ -45,6 +54,8 @@ class ArxivProcessPipeline:
         arxiv_id: str,
         knowledge_base: knowledge_base.KnowledgeBase,
         postgres_client: psql.PostgresHandler,
+        metadata: Optional[Dict[str, str]] = None,
+        version: Optional[str] = None,
     ) -> None:
         """
         Initialize the ArXiv processing pipeline.
@@ -53,6 +64,9 @@ class ArxivProcessPipeline:
             arxiv_id: The ArXiv paper ID (e.g., "2301.12345")
             knowledge_base: Knowledge base instance for storing processed data
             postgres_client: PostgreSQL client for database operations
+            metadata: Pre-supplied, possibly partial metadata, e.g. from a
+                paperscraper dump; the ArXiv API is only asked for missing fields
+            version: Paper version (e.g. "v2") if known from the metadata source
 
         Raises:
             ValueError: If arxiv_id is empty or invalid
@@ -61,53 +75,34 @@ class ArxivProcessPipeline:
             raise ValueError("arxiv_id must be a non-empty string")
 
         self.arxiv_id = arxiv_id
+        # Resolved from the metadata when the ID has no version suffix
+        self.version = version or paper_cache.split_version(arxiv_id)[1]
+        self._supplied_metadata = dict(metadata or {})
         self._knowledge_base = knowledge_base
         self._postgres_client = postgres_client
         self._arxiv_client = arxiv.Client()
+        self._paper_cache = paper_cache.shared_cache()
         self.kb_name = utils.generate_kb_name(arxiv_id)
-
-        # Patterns for different types of equations and LaTeX commands
-        self.equation_patterns = [
-            # Display equations ($$...$$, \[...\], \begin{equation}...\end{equation})
-            r'\$\$.*?\$\$',
-            r'\\\[.*?\\\]',
-            r'\\begin\{equation\*?\}.*?\\end\{equation\*?\}',
-            r'\\begin\{align\*?\}.*?\\end\{align\*?\}',
-            r'\\begin\{eqnarray\*?\}.*?\\end\{eqnarray\*?\}',
-            r'\\begin\{gather\*?\}.*?\\end\{gather\*?\}',
-            r'\\begin\{multline\*?\}.*?\\end\{multline\*?\}',
-            r'\\begin\{split\}.*?\\end\{split\}',
-            
-            # Inline equations ($...$)
-            r'\$[^$\n]+\$',
-            
-            # LaTeX math environments
-            r'\\begin\{math\}.*?\\end\{math\}',
-            r'\\begin\{displaymath\}.*?\\end\{displaymath\}',
-            
-            # Numbered equations
-            r'\\begin\{equation\}.*?\\end\{equation\}',
-            r'\\begin\{align\}.*?\\end\{align\}',
-        ]
-        
-        # LaTeX commands to remove
-        self.latex_commands = [
-            r'\\[a-zA-Z]+\*?(\[[^\]]*\])?(\{[^}]*\})*',  # General LaTeX commands
-            r'\\\\',  # Line breaks
-            r'\\&',   # Alignment characters
-            r'\{|\}', # Braces
-            r'\\textbf\{([^}]+)\}',  # Bold text
-            r'\\textit\{([^}]+)\}',  # Italic text
-            r'\\emph\{([^}]+)\}',    # Emphasized text
-            r'\\cite\{[^}]+\}',      # Citations
-            r'\\ref\{[^}]+\}',       # References
-            r'\\label\{[^}]+\}',     # Labels
-        ]
+        # Stage name -> (start offset, duration) in seconds of the last process()
+        self.stage_timings: Dict[str, Tuple[float, float]] = {}
+        # Section kind -> chunks left out of the last process()
+        self.chunks_saved: Dict[str, int] = {}
+        # Near-duplicate chunks dropped in the last process()
+        self.chunks_deduplicated = 0
+        # Set to abort the download stage once its PDF is not needed anymore
+        self._download_cancel = threading.Event()
+        # PDF of the download stage until the extract stage takes it over
+        self._downloaded_pdf: Optional[BinaryIO] = None
 
     def add_to_main_knowledge_base(self, chunks: List[Dict[str, Any]]) -> None:
         """
         Add processed chunks to the main knowledge base.
 
+        With dedup.across_papers enabled, chunks duplicating chunks of papers
+        added earlier are left out. The paper's own chunks are only remembered
+        once the insert succeeded, so a failed paper is not deduplicated
+        against itself when it is retried.
+
         Args:
             chunks: List of text chunks with metadata to be stored
 
@@ -115,16 +110,37 @@ class ArxivProcessPipeline:
             ArxivProcessingError: If insertion fails
         """
         try:
+            corpus_filter = dedup.shared_filter()
+            signatures = []
+            if corpus_filter is not None:
+                total = len(chunks)
+                chunks, signatures = corpus_filter.filter(chunks)
+                logger.info(
+                    f"Dropped {total - len(chunks)} chunks duplicating other papers"
+                )
+
             main_kb_name = config.kb.name
-            self._knowledge_base.insert(main_kb_name, chunks, MAX_CHUNKS_TO_PROCESS)
-            logger.info(f"Added {len(chunks)} chunks to main knowledge base")
+            inserted = self._knowledge_base.insert(
+                main_kb_name, chunks, MAX_CHUNKS_TO_PROCESS
+            )
         except Exception as e:
             raise ArxivProcessingError(f"Failed to add chunks to main KB: {e}") from e
 
+        if not inserted:
+            raise ArxivProcessingError(
+                f"Failed to add chunks to main KB: insert into {main_kb_name} failed"
+            )
+        if corpus_filter is not None:
+            corpus_filter.add(signatures)
+        logger.info(f"Added {len(chunks)} chunks to main knowledge base")
+
     def get_paper_metadata(self) -> Dict[str, str]:
         """
         Retrieve metadata for the ArXiv paper.
 
+        Complete pre-supplied metadata is used as is. Otherwise the paper is
+        looked up, and the supplied fields take precedence over the API's.
+
         Returns:
             Dictionary containing paper metadata including authors, abstract,
             categories, publication year, primary category, title, and article ID
@@ -132,19 +148,22 @@ class ArxivProcessPipeline:
         Raises:
             ArxivProcessingError: If paper metadata cannot be retrieved
         """
+        if not arxiv_metadata.missing_fields(self._supplied_metadata):
+            return dict(self._supplied_metadata)
+
         try:
             search = arxiv.Search(id_list=[self.arxiv_id])
             paper = next(self._arxiv_client.results(search))
 
-            metadata = {
-                "authors": ", ".join(author.name for author in paper.authors),
-                "abstract": paper.summary or "",
-                "categories": ", ".join(paper.categories) if paper.categories else "",
-                "published_year": str(paper.published.year) if paper.published else "",
-                "primary_category": paper.primary_category or "",
-                "title": paper.title or "",
-                "article_id": self.arxiv_id,
-            }
+            if not self.version:
+                self.version = paper_cache.split_version(paper.get_short_id())[1]
+
+            metadata = arxiv_metadata.metadata_from_result(paper, self.arxiv_id)
+            metadata.update(
+                (field, value)
+                for field, value in self._supplied_metadata.items()
+                if value is not None
+            )
 
             logger.info(f"Retrieved metadata for paper: {metadata['title']}")
             return metadata
@@ -167,95 +186,67 @@ class ArxivProcessPipeline:
         except Exception as e:
             raise ArxivProcessingError(f"Failed to create paper KB: {e}")
         
-    def download_arxiv_pdf(self) -> BytesIO:
+    def download_arxiv_pdf(self) -> BinaryIO:
         """
-        Download file from URL to temporary directory.
+        Download the paper PDF, or read it from the paper cache.
 
-        Args:
-            url: URL to download from
-            filename: Name for the downloaded file
+        The PDF is streamed through the shared downloader into a spooled
+        temporary file, so it is never held in memory as a whole while
+        downloading.
 
         Returns:
-            Path to downloaded file or None if download failed
+            Binary file with the PDF, positioned at the start; the caller closes it
 
         Raises:
-            FileProcessingError: If download fails
+            DownloadError: If download fails
         """
-        url = f"https://arxiv.org/pdf/{self.arxiv_id}"
-
-        if not url:
-            logger.error("Cannot download file: URL cannot be empty")
-            raise ValueError("URL cannot be empty")
-
-        logger.info(f"Downloading file from URL: {url[:100]}...")
+        if self._paper_cache and self.version:
+            cached_pdf = self._paper_cache.get_pdf(self.arxiv_id, self.version)
+            if cached_pdf is not None:
+                logger.info(f"Using cached PDF for {self.arxiv_id}{self.version}")
+                return BytesIO(cached_pdf)
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            logger.info(
-                f"Download successful, content length: {len(response.content)} bytes"
+            pdf_file = downloader.shared_downloader().download_pdf(
+                self.arxiv_id, self.version
             )
+        except downloader.DownloadError as e:
+            logger.error(f"Failed to download PDF of {self.arxiv_id}: {e}")
+            raise
 
-            return BytesIO(response.content)
+        if self._paper_cache and self.version:
+            self._paper_cache.put_pdf(self.arxiv_id, self.version, pdf_file)
+            pdf_file.seek(0)
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to download {url}: {e}")
-            raise e
+        return pdf_file
         
-    def extract_text_from_pdf(self, pdf_file: BytesIO) -> str:
+    def extract_text_from_pdf(self, pdf_file: BinaryIO) -> str:
         """Extract raw text from PDF file."""
-        text = ""
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            return pdf_extraction.extract_text(
+                pdf_file,
+                backend=config.extraction.backend,
+                workers=config.extraction.workers,
+                min_parallel_pages=config.extraction.min_parallel_pages,
+                page_timeout_seconds=config.extraction.page_timeout_seconds,
+                timeout_seconds=config.extraction.file_timeout_seconds,
+                max_memory_mb=config.extraction.max_memory_mb,
+            )
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {e}")
-        
-        return text
     
     def remove_equations(self, text):
         """Remove mathematical equations from text."""
-        # Remove equations (use DOTALL flag to match across newlines)
-        for pattern in self.equation_patterns:
-            text = re.sub(pattern, ' ', text, flags=re.DOTALL)
-        
-        return text
-    
+        return text_normalizer.remove_equations(text)
+
     def remove_latex_commands(self, text):
         """Remove LaTeX formatting commands."""
-        for pattern in self.latex_commands:
-            # For text formatting commands, keep the content
-            if r'\{([^}]+)\}' in pattern:
-                text = re.sub(pattern, r'\1', text)
-            else:
-                text = re.sub(pattern, ' ', text)
-        
-        return text
-    
+        return text_normalizer.remove_latex_commands(text)
 
     def clean_text(self, text):
         """Clean up the text formatting."""
-        # Remove extra whitespace and newlines
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Multiple newlines
-        text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces
-        text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)  # Leading/trailing whitespace
-        
-        # Remove common LaTeX artifacts
-        text = re.sub(r'\\[a-zA-Z]+\*?', '', text)  # Remaining LaTeX commands
-        text = re.sub(r'[{}]', '', text)  # Remaining braces
-        text = re.sub(r'\\\\', '', text)  # Remaining line breaks
-        
-        # Clean up punctuation spacing
-        text = re.sub(r'\s+([.,;:])', r'\1', text)  # Space before punctuation
-        text = re.sub(r'([.,;:])\s*\n', r'\1\n', text)  # Punctuation at line end
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)  # Remove control chars
-        translator = str.maketrans("", "", string.punctuation)
-        text = text.strip().translate(translator)
-
-        return text.strip()
-    
+        return text_normalizer.clean_text(text)
+
     def process_text(self, text):
         """Main processing pipeline."""
         print("Removing equations...")
@@ -272,29 +263,161 @@ class ArxivProcessPipeline:
         
         return text
 
-    def extract_from_arxiv(self) -> str:
+    def get_cached_text(self) -> Optional[str]:
+        """Return the cached cleaned text of this paper version, if any."""
+        if self._paper_cache is None or self.version is None:
+            return None
+
+        cached_text = self._paper_cache.get_text(
+            self.arxiv_id, self.version, self._extractor_version()
+        )
+        if cached_text is not None:
+            logger.info(f"Using cached text for {self.arxiv_id}{self.version}")
+            self.processed_text = cached_text
+        return cached_text
+
+    @staticmethod
+    def _extractor_version() -> str:
+        return f"{config.extraction.backend}-{text_normalizer.VERSION}"
+
+    def extract_from_arxiv(self, pdf_file: Optional[BinaryIO] = None) -> str:
         """
         Download the paper PDF and extract text content.
 
+        Args:
+            pdf_file: Already downloaded PDF, closed by this method; the PDF
+                is downloaded when None
+
         Returns:
             Extracted text content from the PDF
 
         Raises:
             ArxivProcessingError: If download or text extraction fails
         """
-        
+        cached_text = self.get_cached_text()
+        if cached_text is not None:
+            if pdf_file is not None:
+                pdf_file.close()
+            return cached_text
 
         try:
-            print(f"Downloading arXiv paper: {self.arxiv_id}")
-            pdf_file = self.download_arxiv_pdf()
-            
-            print("Extracting text from PDF...")
-            raw_text = self.extract_text_from_pdf(pdf_file)
+            if pdf_file is None:
+                print(f"Downloading arXiv paper: {self.arxiv_id}")
+                pdf_file = self.download_arxiv_pdf()
+
+            with pdf_file:
+                print("Extracting text from PDF...")
+                raw_text = self.extract_text_from_pdf(pdf_file)
             
-            return self.process_text(raw_text)
+            text = self.process_text(raw_text)
+        except Exception as e:
+            raise ArxivProcessingError(f"Failed to download/extract PDF: {e}") from e
+
+        self.cache_text(text)
+        return text
+
+    def cache_text(self, text: str) -> None:
+        """Store cleaned text in the paper cache once the version is known."""
+        if self._paper_cache is not None and self.version is not None:
+            self._paper_cache.put_text(
+                self.arxiv_id, self.version, self._extractor_version(), text
+            )
+
+    def _metadata_stage(self, version_known: bool) -> Dict[str, str]:
+        """
+        Retrieve the metadata while the PDF is being downloaded.
+
+        Without a version in the ID, the download of the latest version is
+        cancelled once the metadata resolves a version whose text is cached,
+        or if the lookup fails.
+
+        Args:
+            version_known: Whether the ID carried a version before the metadata
+                lookup started
+
+        Returns:
+            Paper metadata, see get_paper_metadata
+        """
+        try:
+            metadata = self.get_paper_metadata()
+        except Exception:
+            self._download_cancel.set()
+            raise
+        if not version_known and self.get_cached_text() is not None:
+            self._download_cancel.set()
+        return metadata
+
+    def _download_stage(self, version_known: bool) -> Optional[BinaryIO]:
+        """
+        Download the PDF while the metadata is being retrieved.
+
+        Args:
+            version_known: Whether the ID carried a version before the metadata
+                lookup started
+
+        Returns:
+            The PDF, or None if the text of this version is cached or the
+            metadata stage cancelled the download
+
+        Raises:
+            ArxivProcessingError: If the download fails
+        """
+        try:
+            if version_known:
+                if self.get_cached_text() is not None:
+                    return None
+                self._downloaded_pdf = self.download_arxiv_pdf()
+                return self._downloaded_pdf
+
+            # The version is resolved concurrently by the metadata stage, and
+            # the unversioned URL serves the latest version
+            print(f"Downloading arXiv paper: {self.arxiv_id}")
+            self._downloaded_pdf = downloader.shared_downloader().download_pdf(
+                self.arxiv_id, cancel=self._download_cancel
+            )
+            return self._downloaded_pdf
+        except downloader.DownloadCancelledError:
+            logger.info(f"Download of {self.arxiv_id} cancelled, PDF not needed")
+            return None
         except Exception as e:
             raise ArxivProcessingError(f"Failed to download/extract PDF: {e}") from e
 
+    def _close_downloaded_pdf(self) -> None:
+        """Close a downloaded PDF the extract stage never took over."""
+        if self._downloaded_pdf is not None:
+            self._downloaded_pdf.close()
+            self._downloaded_pdf = None
+
+    def _extract_stage(self, pdf_file: Optional[BinaryIO], version_known: bool) -> str:
+        """Extract the text of the PDF from the download stage."""
+        # extract_from_arxiv closes the PDF from here on
+        self._downloaded_pdf = None
+        if (
+            pdf_file is not None
+            and not version_known
+            and self._paper_cache is not None
+            and self.version is not None
+        ):
+            self._paper_cache.put_pdf(self.arxiv_id, self.version, pdf_file)
+            pdf_file.seek(0)
+        return self.extract_from_arxiv(pdf_file)
+
+    def prepare_article(
+        self, text_content: str, metadata: Dict[str, str]
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Clean the abstract and combine it with the title and text.
+
+        Args:
+            text_content: Cleaned text extracted from the PDF
+            metadata: Paper metadata, its abstract is cleaned in place
+
+        Returns:
+            Tuple of the full text and the metadata
+        """
+        metadata["abstract"] = self.clean_text(metadata["abstract"])
+        return self._prepare_full_text(text_content, metadata), metadata
+
     def _prepare_full_text(self, text_content: str, metadata: Dict[str, str]) -> str:
         """
         Prepare the full text by combining metadata and content.
@@ -319,6 +442,9 @@ class ArxivProcessPipeline:
         """
         Process and chunk the text content.
 
+        Sections excluded by the sections config, such as the reference list,
+        are not chunked, and near-duplicate chunks are dropped.
+
         Args:
             full_text: Complete text content to be chunked
             metadata: Paper metadata to be added to each chunk
@@ -326,13 +452,18 @@ class ArxivProcessPipeline:
         Returns:
             List of text chunks with metadata
         """
-        chunks = utils.chunk_text(full_text, 1500, 300)
+        chunks, self.chunks_saved = sections.chunk_paper_text(full_text, 1500, 300)
+        chunks, self.chunks_deduplicated = dedup.deduplicate_paper(chunks)
 
         # Add metadata to each chunk
         for chunk in chunks:
             chunk.update(metadata)
 
-        logger.info(f"Created {len(chunks)} chunks")
+        logger.info(
+            f"Created {len(chunks)} chunks, "
+            f"saved {sections.describe_saved(self.chunks_saved)}, "
+            f"dropped {self.chunks_deduplicated} near-duplicates"
+        )
         return chunks
 
     def _store_in_postgres(self, full_text: str, metadata: Dict[str, str]) -> None:
@@ -373,23 +504,35 @@ class ArxivProcessPipeline:
         if config.kb_storage.enable_pg_vector:
             self._knowledge_base.create_index(self.kb_name)
 
+    def _populate_paper_kb(self, chunks: List[Dict[str, Any]]) -> None:
+        """Create, populate and index the paper-specific knowledge base."""
+        self.create_paper_knowledge_base()
+        self._store_in_paper_kb(chunks)
+        self.create_index_on_kb()
+
     def process(self, create_paper_kb: bool, add_to_main_kb: bool) -> None:
         """
         Execute the complete ArXiv paper processing pipeline.
 
-        This method orchestrates the entire process:
-        1. Downloads and extracts text from the PDF
-        2. Retrieves paper metadata
-        3. Processes and chunks the text
-        4. Stores data in the main knowledge base
-        5. Stores data in PostgreSQL
-        6. Creates and populates a paper-specific knowledge base
+        The steps form a dependency graph whose independent stages run
+        concurrently:
+        1. Retrieves paper metadata, while the PDF is downloaded; without a
+           version in the ID, the download is cancelled once the metadata
+           resolves a version whose text is cached
+        2. Extracts text from the PDF, or reads it from the cache
+        3. Prepares the full text from the metadata and text
+        4. Stores data in PostgreSQL, while the text is chunked
+        5. Stores the chunks in the main knowledge base, while a paper-specific
+           knowledge base is created and populated
+
+        A per-stage timing breakdown is logged and kept in stage_timings.
 
         Raises:
             ArxivProcessingError: If any step in the pipeline fails
         """
         try:
             existing_paper_data = self._postgres_client.get_paper_from_psql(self.arxiv_id)
+            graph = stage_graph.StageGraph(f"pipeline-{self.arxiv_id}")
 
             if existing_paper_data:
                 logger.info(f"Using existing data for {self.arxiv_id}")
@@ -398,38 +541,72 @@ class ArxivProcessPipeline:
                 del existing_paper_data["text"]
 
                 metadata = dict(existing_paper_data)
+                graph.add("prepare", lambda results: (full_text, metadata))
             else:
                 logger.info(
                     f"Starting processing pipeline for ArXiv ID: {self.arxiv_id}"
                 )
+                # Read before the metadata stage may resolve the version
+                version_known = self.version is not None
 
-                # Step 1: Download and extract text
-                text_content = self.extract_from_arxiv()
-
-                # Step 2: Get metadata
-                metadata = self.get_paper_metadata()
-
-                metadata["abstract"] = self.clean_text(metadata["abstract"])
-
-                # Step 3: Prepare full text
-                full_text = self._prepare_full_text(text_content, metadata)
-
-                # Step 6: Store in PostgreSQL
-                self._store_in_postgres(full_text, metadata)
+                self._download_cancel.clear()
+                graph.add(
+                    "metadata", lambda results: self._metadata_stage(version_known)
+                )
+                graph.add(
+                    "download", lambda results: self._download_stage(version_known)
+                )
+                graph.add(
+                    "extract",
+                    lambda results: self._extract_stage(
+                        results["download"], version_known
+                    ),
+                    # Without a version the text cache is keyed on the metadata
+                    depends_on=(
+                        ["download"] if version_known else ["download", "metadata"]
+                    ),
+                )
+                graph.add(
+                    "prepare",
+                    lambda results: self.prepare_article(
+                        results["extract"], results["metadata"]
+                    ),
+                    depends_on=["metadata", "extract"],
+                )
+                graph.add(
+                    "postgres",
+                    lambda results: self._store_in_postgres(*results["prepare"]),
+                    depends_on=["prepare"],
+                )
 
             if create_paper_kb or add_to_main_kb:
-                # Step 4: Process and chunk text
-                chunks = self._process_and_chunk_text(full_text, metadata)
+                graph.add(
+                    "chunk",
+                    lambda results: self._process_and_chunk_text(*results["prepare"]),
+                    depends_on=["prepare"],
+                )
 
             if not existing_paper_data and add_to_main_kb:
-                # Step 5: Store in main knowledge base
-                self.add_to_main_knowledge_base(chunks)
+                graph.add(
+                    "main_kb",
+                    lambda results: self.add_to_main_knowledge_base(results["chunk"]),
+                    depends_on=["chunk"],
+                )
 
-            # Step 7: Create and populate paper-specific knowledge base
             if create_paper_kb:
-                self.create_paper_knowledge_base()
-                self._store_in_paper_kb(chunks)
-                self.create_index_on_kb()
+                graph.add(
+                    "paper_kb",
+                    lambda results: self._populate_paper_kb(results["chunk"]),
+                    depends_on=["chunk"],
+                )
+
+            try:
+                graph.run()
+            finally:
+                # Left over when a stage failed before extraction
+                self._close_downloaded_pdf()
+                self.stage_timings = graph.timings
+                graph.log_timings()
 
             logger.info(
                 f"Successfully completed processing for ArXiv ID: {self.arxiv_id}"
@@ -0,0 +1,149 @@
+"""
+Reading PDFs straight out of arXiv bulk tar archives.
+
+arXiv distributes its PDFs in bulk as tar archives of a few GB each, for
+example arXiv_pdf_2301_001.tar holding 2301/2301.00001v1.pdf and so on.
+Instead of unpacking them to disk first, the bulk processor lists the PDF
+members of an archive from its headers and reads each member's bytes only
+when it is handed to an extraction worker.
+
+Member and file names are mapped to ArXiv IDs by parse_pdf_name, which knows
+both identifier schemes:
+
+- new style, since 2007: 2301.12345v2.pdf, 0704.0001.pdf
+- old style, archive and number: hep-th9901001v1.pdf as in the bulk
+  archives, hep-th_9901001v1.pdf, or with the subject class as in
+  math.AG0001001v1.pdf; all become "hep-th/9901001" or "math/0001001"
+"""
+
+import logging
+import re
+import tarfile
+from pathlib import Path, PurePosixPath
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+_NEW_STYLE = re.compile(r"^(?P<id>\d{4}\.\d{4,5})(?P<version>v\d+)?$")
+_OLD_STYLE = re.compile(
+    r"^(?P<archive>[a-z]+(?:-[a-z]+)?)(?:\.[A-Z]{2})?[_/]?(?P<number>\d{7})"
+    r"(?P<version>v\d+)?$"
+)
+
+
+class TarPdf(NamedTuple):
+    """A PDF member of a tar archive."""
+
+    name: str
+    arxiv_id: Optional[str]
+    version: Optional[str]
+    size: int
+    mtime_ns: int
+
+
+def parse_pdf_name(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Derive the ArXiv ID and version from a PDF file or member name.
+
+    Args:
+        name: File name or tar member path, e.g. "2301/2301.12345v2.pdf"
+
+    Returns:
+        Tuple of the ArXiv ID without version ("2301.12345", "hep-th/9901001")
+        and the version ("v2") or None; the ID is None if the name is not an
+        ArXiv ID
+    """
+    stem = PurePosixPath(name).name
+    if stem.lower().endswith(".pdf"):
+        stem = stem[:-4]
+
+    match = _NEW_STYLE.match(stem)
+    if match:
+        return match.group("id"), match.group("version")
+    match = _OLD_STYLE.match(stem)
+    if match:
+        arxiv_id = f"{match.group('archive')}/{match.group('number')}"
+        return arxiv_id, match.group("version")
+    return None, None
+
+
+def is_tar_path(path: Union[str, Path]) -> bool:
+    """Whether a path names a tar archive, judging by its suffix."""
+    return str(path).lower().endswith(TAR_SUFFIXES)
+
+
+class TarPdfArchive:
+    """Lists and reads the PDF members of a tar archive."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open an archive, compressed archives are decompressed transparently.
+
+        Uncompressed archives are read with seeks, so listing the members only
+        reads their headers; compressed ones have to be decompressed up to
+        every member that is read.
+
+        Args:
+            path: Path of the tar archive
+
+        Raises:
+            tarfile.TarError: If the file is not a readable tar archive
+        """
+        self.path = Path(path)
+        self._tar = tarfile.open(self.path, "r:*")
+        self._infos = {}
+
+    def __enter__(self) -> "TarPdfArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the archive."""
+        self._tar.close()
+
+    def members(self) -> List[TarPdf]:
+        """
+        List the PDF members in archive order.
+
+        Returns:
+            Every regular member with a .pdf name; arxiv_id is None for names
+            that are not ArXiv IDs
+        """
+        pdfs = []
+        for info in self._tar.getmembers():
+            if not info.isfile() or not info.name.lower().endswith(".pdf"):
+                continue
+            self._infos[info.name] = info
+            arxiv_id, version = parse_pdf_name(info.name)
+            pdfs.append(
+                TarPdf(
+                    info.name, arxiv_id, version, info.size, int(info.mtime * 1e9)
+                )
+            )
+        return pdfs
+
+    def member_path(self, member: TarPdf) -> str:
+        """Return the path identifying a member, "<archive>/<member name>"."""
+        return str(self.path.resolve() / member.name)
+
+    def read(self, member: TarPdf) -> bytes:
+        """
+        Read the bytes of a member.
+
+        Args:
+            member: Member returned by members
+
+        Returns:
+            Content of the member
+
+        Raises:
+            KeyError: If the archive has no such member
+        """
+        if not self._infos:
+            self.members()
+        with self._tar.extractfile(self._infos[member.name]) as f:
+            return f.read()
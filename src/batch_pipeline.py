@@ -0,0 +1,468 @@
+"""
+Pipelined batch ingestion of many ArXiv papers.
+
+Papers flow through four stages connected by bounded queues, so network,
+CPU and database work of different papers overlap:
+
+1. Metadata: pre-supplied metadata, e.g. from a paperscraper dump, is
+   completed with batched ArXiv API lookups of many IDs each.
+2. Download: a pool of threads downloads PDFs through the shared,
+   rate-limited downloader.
+3. Extraction: PDF text is extracted and cleaned in a process pool whose
+   workers enforce the time and memory limits per PDF of the extraction
+   config; PDFs exceeding them are counted as over_limit and skipped. A
+   worker dying, e.g. allocating past the memory limit in native code, breaks
+   the pool; a new pool takes over, the papers in flight are extracted once
+   more and a paper breaking the pool again is counted as over_limit.
+4. Storage: a single thread writes the articles to PostgreSQL in multi-row
+   batches.
+
+A full queue blocks the stage feeding it, which bounds the number of PDFs
+held in memory and keeps a slow database from being flooded. Failures are
+counted per paper and never stop the batch.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import (
+    arxiv_metadata,
+    config_loader as config,
+    pdf_extraction,
+    psql,
+    text_normalizer,
+)
+from .run_stats import RunStats
+from .arxiv_pipeline import ArxivProcessPipeline
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output on a queue
+_DONE = object()
+
+
+class BatchStats(RunStats):
+    """Counters and stage busy times of a batch run."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.total = 0
+        self.skipped = 0
+        self.processed = 0
+        self.failed = 0
+        self.over_limit = 0
+        self.cached = 0
+        self.batches = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters and timings as a dictionary."""
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "processed": self.processed,
+            "failed": self.failed,
+            "over_limit": self.over_limit,
+            "cached": self.cached,
+            "batches": self.batches,
+            **self.timings(),
+        }
+
+
+class _PaperJob:
+    """A paper moving through the stages."""
+
+    def __init__(self, pipeline: ArxivProcessPipeline) -> None:
+        self.pipeline = pipeline
+        self.metadata: Dict[str, str] = {}
+        self.pdf_bytes: Optional[bytes] = None
+        self.text: Optional[str] = None
+
+
+def _extract_and_clean(
+    pdf_bytes: bytes,
+    backend: str,
+    min_parallel_pages: int,
+    page_timeout_seconds: int,
+    file_timeout_seconds: int,
+) -> str:
+    """Process pool task: extract the text of a PDF and clean it."""
+    # Pool workers extract serially, they cannot start a pool of their own.
+    # They run tasks in their main thread, so the time limit is enforced here;
+    # the memory limit is set once per worker by the pool initializer.
+    with pdf_extraction.time_limit(
+        file_timeout_seconds,
+        lambda: pdf_extraction.ExtractionTimeoutError(
+            f"Extraction exceeded {file_timeout_seconds}s"
+        ),
+    ):
+        raw_text = pdf_extraction.extract_text(
+            pdf_bytes,
+            backend=backend,
+            workers=1,
+            min_parallel_pages=min_parallel_pages,
+            page_timeout_seconds=page_timeout_seconds,
+        )
+        return text_normalizer.normalize_text(raw_text)
+
+
+class BatchIngestPipeline:
+    """Ingests many papers into PostgreSQL with overlapping stages."""
+
+    def __init__(
+        self,
+        knowledge_base,
+        postgres_client: psql.PostgresHandler,
+        download_workers: int = 4,
+        extract_workers: int = 0,
+        queue_size: int = 16,
+        insert_batch_size: int = 50,
+    ) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            knowledge_base: Knowledge base instance passed to the per-paper pipelines
+            postgres_client: PostgreSQL client the articles are written to
+            download_workers: Threads downloading PDFs concurrently
+            extract_workers: Extraction processes, 0 for one per CPU
+            queue_size: Papers buffered between two stages
+            insert_batch_size: Articles written per multi-row INSERT
+        """
+        self._knowledge_base = knowledge_base
+        self._postgres_client = postgres_client
+        self.download_workers = max(1, download_workers)
+        self.extract_workers = extract_workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self.insert_batch_size = max(1, insert_batch_size)
+        self.stats = BatchStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, knowledge_base, postgres_client: psql.PostgresHandler
+    ) -> "BatchIngestPipeline":
+        """Create a pipeline configured by the ingest config section."""
+        return cls(
+            knowledge_base,
+            postgres_client,
+            download_workers=config.ingest.download_workers,
+            extract_workers=config.ingest.extract_workers,
+            queue_size=config.ingest.queue_size,
+            insert_batch_size=config.ingest.insert_batch_size,
+        )
+
+    def _new_ids(self, arxiv_ids: List[str]) -> List[str]:
+        """Drop duplicates and papers that are already stored."""
+        unique_ids = list(dict.fromkeys(arxiv_ids))
+        try:
+            existing = set(self._postgres_client.find_existing_article_ids(unique_ids))
+        except Exception as e:
+            logger.error(f"Failed to look up existing papers, processing all: {e}")
+            existing = set()
+
+        self.stats.add("skipped", len(arxiv_ids) - len(unique_ids) + len(existing))
+        return [arxiv_id for arxiv_id in unique_ids if arxiv_id not in existing]
+
+    def _metadata_worker(
+        self,
+        papers: Dict[str, Dict[str, str]],
+        id_queue: queue.Queue,
+    ) -> None:
+        """Metadata stage: complete metadata batch by batch and queue the papers."""
+        try:
+            start = time.perf_counter()
+            for paper in arxiv_metadata.complete_metadata(papers):
+                self.stats.add_time("metadata", time.perf_counter() - start)
+                id_queue.put(paper)
+                start = time.perf_counter()
+        except Exception as e:
+            logger.error(f"Metadata stage failed: {e}")
+        finally:
+            for _ in range(self.download_workers):
+                id_queue.put(_DONE)
+
+    def _prepare_job(
+        self, arxiv_id: str, metadata: Dict[str, str], version: Optional[str]
+    ) -> _PaperJob:
+        """Complete the metadata and retrieve the PDF, or cached text, of a paper."""
+        job = _PaperJob(
+            ArxivProcessPipeline(
+                arxiv_id,
+                self._knowledge_base,
+                self._postgres_client,
+                metadata=metadata,
+                version=version,
+            )
+        )
+        # Only looks the paper up if the batched lookup could not complete it
+        job.metadata = job.pipeline.get_paper_metadata()
+
+        job.text = job.pipeline.get_cached_text()
+        if job.text is None:
+            with job.pipeline.download_arxiv_pdf() as pdf_file:
+                job.pdf_bytes = pdf_file.read()
+        return job
+
+    def _download_worker(
+        self, id_queue: queue.Queue, download_queue: queue.Queue
+    ) -> None:
+        """Download stage: turn queued papers into jobs until metadata is done."""
+        try:
+            while True:
+                paper = id_queue.get()
+                if paper is _DONE:
+                    return
+
+                arxiv_id, metadata, version = paper
+                start = time.perf_counter()
+                try:
+                    job = self._prepare_job(arxiv_id, metadata, version)
+                except Exception as e:
+                    self.stats.add("failed")
+                    logger.error(f"Failed to fetch paper {arxiv_id}: {e}")
+                    continue
+                finally:
+                    self.stats.add_time("download", time.perf_counter() - start)
+
+                download_queue.put(job)
+        finally:
+            download_queue.put(_DONE)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        """Create an extraction pool whose workers enforce the memory limit."""
+        return ProcessPoolExecutor(
+            max_workers=self.extract_workers,
+            initializer=pdf_extraction.limit_memory,
+            initargs=(config.extraction.max_memory_mb,),
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken extraction pool, unless another thread already did."""
+        with self._executor_lock:
+            if self._executor is broken:
+                logger.warning("Extraction pool broke, starting a new one")
+                self._executor = self._new_executor()
+        broken.shutdown(wait=False)
+
+    def _submit(self, pdf_bytes: bytes) -> Tuple[Future, ProcessPoolExecutor]:
+        """Submit a PDF to the extraction pool, replacing the pool if it broke."""
+        task = (
+            _extract_and_clean,
+            pdf_bytes,
+            config.extraction.backend,
+            config.extraction.min_parallel_pages,
+            config.extraction.page_timeout_seconds,
+            config.extraction.file_timeout_seconds,
+        )
+        executor = self._executor
+        try:
+            return executor.submit(*task), executor
+        except BrokenProcessPool:
+            # Broken by an earlier paper, this one gets a fresh pool
+            self._replace_executor(executor)
+            executor = self._executor
+            return executor.submit(*task), executor
+
+    def _dispatch(self, download_queue: queue.Queue, store_queue: queue.Queue) -> None:
+        """Extraction stage: submit downloaded PDFs to the process pool in order."""
+        finished_workers = 0
+        while finished_workers < self.download_workers:
+            job = download_queue.get()
+            if job is _DONE:
+                finished_workers += 1
+                continue
+
+            future: Optional[Future] = None
+            executor: Optional[ProcessPoolExecutor] = None
+            if job.text is None:
+                try:
+                    future, executor = self._submit(job.pdf_bytes)
+                except Exception as e:
+                    # Keep draining the download queue so no thread blocks
+                    self.stats.add("failed")
+                    logger.error(
+                        f"Failed to extract paper {job.pipeline.arxiv_id}: {e}"
+                    )
+                    job.pdf_bytes = None
+                    continue
+            # Blocks while the storage stage is behind, bounding in-flight papers
+            store_queue.put((job, future, executor))
+
+        store_queue.put(_DONE)
+
+    def _extraction_result(
+        self, job: _PaperJob, future: Future, executor: ProcessPoolExecutor
+    ) -> str:
+        """Wait for the text of a paper, extracting it again if its pool broke."""
+        try:
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # Maybe broken by another paper in flight, so retry once
+                self._replace_executor(executor)
+                future, executor = self._submit(job.pdf_bytes)
+                try:
+                    return future.result()
+                except BrokenProcessPool:
+                    self._replace_executor(executor)
+                    raise
+        finally:
+            # Kept until now for the retry
+            job.pdf_bytes = None
+
+    def _store_worker(self, store_queue: queue.Queue) -> None:
+        """Storage stage: collect extracted papers and write them in batches."""
+        batch: List[Dict[str, Any]] = []
+        while True:
+            item = store_queue.get()
+            if item is _DONE:
+                break
+
+            job, future, executor = item
+            pipeline = job.pipeline
+            try:
+                if future is None:
+                    self.stats.add("cached")
+                    text = job.text
+                else:
+                    wait_start = time.perf_counter()
+                    text = self._extraction_result(job, future, executor)
+                    self.stats.add_time(
+                        "extract_wait", time.perf_counter() - wait_start
+                    )
+                    pipeline.processed_text = text
+                    pipeline.cache_text(text)
+
+                full_text, metadata = pipeline.prepare_article(text, job.metadata)
+                batch.append({"text": full_text, **metadata})
+            except BrokenProcessPool:
+                self.stats.add("over_limit")
+                logger.warning(
+                    f"Skipping paper {pipeline.arxiv_id}: extraction process died"
+                )
+                continue
+            except pdf_extraction.ExtractionLimitError as e:
+                self.stats.add("over_limit")
+                logger.warning(f"Skipping paper {pipeline.arxiv_id}: {e}")
+                continue
+            except Exception as e:
+                self.stats.add("failed")
+                logger.error(f"Failed to extract paper {pipeline.arxiv_id}: {e}")
+                continue
+
+            if len(batch) >= self.insert_batch_size:
+                self._write_batch(batch)
+                batch = []
+
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, falling back to single rows to isolate a bad article."""
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            self._postgres_client.insert_articles(batch, self.insert_batch_size)
+            self.stats.add("processed", len(batch))
+        except Exception as e:
+            logger.warning(f"Batch insert failed, inserting one by one: {e}")
+            for article_data in batch:
+                try:
+                    self._postgres_client.insert_article(article_data)
+                    self.stats.add("processed")
+                except Exception as row_error:
+                    self.stats.add("failed")
+                    logger.error(
+                        f"Failed to store paper {article_data['article_id']}: "
+                        f"{row_error}"
+                    )
+        finally:
+            self.stats.add("batches")
+            self.stats.add_time("store", time.perf_counter() - start)
+            logger.info(f"Stored batch of {len(batch)} papers")
+
+    def run(
+        self,
+        arxiv_ids: Iterable[str],
+        metadata: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> BatchStats:
+        """
+        Ingest papers into PostgreSQL.
+
+        Args:
+            arxiv_ids: ArXiv IDs to ingest; already stored papers are skipped
+            metadata: Pre-supplied, possibly partial metadata keyed by ArXiv ID;
+                missing fields are looked up in batches
+
+        Returns:
+            Statistics of the run
+        """
+        arxiv_ids = list(arxiv_ids)
+        metadata = metadata or {}
+        self.stats = BatchStats()
+        self.stats.total = len(arxiv_ids)
+        start = time.perf_counter()
+
+        papers = {
+            arxiv_id: metadata.get(arxiv_id, {})
+            for arxiv_id in self._new_ids(arxiv_ids)
+        }
+        id_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        download_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        store_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        logger.info(
+            f"Ingesting {len(papers)} papers with {self.download_workers} "
+            f"download threads and {self.extract_workers} extraction processes"
+        )
+
+        metadata_thread = threading.Thread(
+            target=self._metadata_worker,
+            args=(papers, id_queue),
+            name="batch-metadata",
+            daemon=True,
+        )
+        download_threads = [
+            threading.Thread(
+                target=self._download_worker,
+                args=(id_queue, download_queue),
+                name=f"batch-download-{i}",
+                daemon=True,
+            )
+            for i in range(self.download_workers)
+        ]
+        store_thread = threading.Thread(
+            target=self._store_worker,
+            args=(store_queue,),
+            name="batch-store",
+            daemon=True,
+        )
+
+        self._executor = self._new_executor()
+        try:
+            metadata_thread.start()
+            for thread in download_threads:
+                thread.start()
+            store_thread.start()
+
+            self._dispatch(download_queue, store_queue)
+
+            metadata_thread.join()
+            for thread in download_threads:
+                thread.join()
+            store_thread.join()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        self.stats.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"Batch ingestion finished: {self.stats.as_dict()}")
+        return self.stats
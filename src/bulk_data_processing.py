@@ -8,12 +8,14 @@ Enhanced with Rich module for beautiful console output.
 """
 
 import argparse
+import multiprocessing
+import os
 import re
-import PyPDF2
-import string
+import signal
+import sys
+import time
 from pathlib import Path
-import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, List, NamedTuple, Tuple
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn, TimeRemainingColumn
@@ -24,6 +26,32 @@ from rich.traceback import install
 from rich.logging import RichHandler
 import logging
 
+try:
+    from src import (
+        arxiv_tar,
+        columnar,
+        latex_source,
+        metadata_store,
+        paper_cache,
+        pdf_backends,
+        pdf_extraction,
+        progress_manifest,
+        shards,
+        text_normalizer,
+    )
+except ImportError:
+    # Run as a script from the src folder
+    import arxiv_tar
+    import columnar
+    import latex_source
+    import metadata_store
+    import paper_cache
+    import pdf_backends
+    import pdf_extraction
+    import progress_manifest
+    import shards
+    import text_normalizer
+
 # Install rich traceback handler
 install(show_locals=True)
 
@@ -37,114 +65,248 @@ logging.basicConfig(
 
 logger = logging.getLogger("arxiv_extractor")
 
+# Extractor and time budget per file of the current worker process, set by _init_worker
+_worker_extractor: Optional["ArxivTextExtractor"] = None
+_worker_file_timeout = 0
+
+
+class PdfTask(NamedTuple):
+    """
+    A PDF to extract, a file or a member of a tar archive.
+
+    Files are read by whoever extracts them. Tar members are read in the main
+    process by _read_members and handed to the workers as data, so archives
+    are read front to back and never unpacked to disk.
+    """
+
+    path: str
+    arxiv_id: Optional[str]
+    version: Optional[str] = None
+    size: int = 0
+    mtime_ns: int = 0
+    archive: Optional[str] = None
+    member: Optional["arxiv_tar.TarPdf"] = None
+    data: Optional[bytes] = None
+
+
+def _list_folder(pdf_folder: str) -> List[PdfTask]:
+    """List the PDF files of a folder as tasks."""
+    tasks = []
+    for file in Path(pdf_folder).iterdir():
+        if file.is_file() and file.suffix.lower() == '.pdf':
+            arxiv_id, version = arxiv_tar.parse_pdf_name(file.name)
+            tasks.append(PdfTask(str(file.resolve()), arxiv_id, version))
+    return tasks
+
+
+def _list_archives(tar_files: List[str]) -> List[PdfTask]:
+    """List the PDF members of tar archives as tasks, in archive order."""
+    tasks = []
+    for tar_file in tar_files:
+        with arxiv_tar.TarPdfArchive(tar_file) as archive:
+            for member in archive.members():
+                tasks.append(
+                    PdfTask(
+                        archive.member_path(member),
+                        member.arxiv_id,
+                        member.version,
+                        member.size,
+                        member.mtime_ns,
+                        str(archive.path),
+                        member,
+                    )
+                )
+    return tasks
+
+
+def _read_member(task: PdfTask) -> bytes:
+    """Read the bytes of a tar member task, opening its archive."""
+    with arxiv_tar.TarPdfArchive(task.archive) as archive:
+        return archive.read(task.member)
+
+
+def _read_members(tasks: Iterable[PdfTask]) -> Iterator[PdfTask]:
+    """
+    Attach the bytes of tar member tasks as they are consumed.
+
+    Consecutive tasks of the same archive share one open archive. With a
+    process pool this runs in the pool's task thread, which blocks once the
+    workers' task pipe is full, so only a few members are in memory at a time.
+    A member that cannot be read is passed on without data and fails in
+    _run_task.
+    """
+    archive = None
+    try:
+        for task in tasks:
+            if task.member is None:
+                yield task
+                continue
+            if archive is None or str(archive.path) != task.archive:
+                if archive is not None:
+                    archive.close()
+                archive = arxiv_tar.TarPdfArchive(task.archive)
+            try:
+                yield task._replace(data=archive.read(task.member))
+            except Exception as e:
+                logger.error(f"Failed to read {task.member.name} from {task.archive}: {e}")
+                yield task
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def _init_worker(
+    pdf_backend: str,
+    cache_args: Optional[Tuple[str, int, int]],
+    source_dir: Optional[str],
+    file_timeout_seconds: int = 0,
+    max_memory_mb: int = 0,
+) -> None:
+    """
+    Set up a bulk processing worker.
+
+    Workers ignore SIGINT, so Ctrl-C only reaches the main process, which then
+    terminates the pool. Each worker extracts a PDF's pages serially, the pool
+    already uses every core, and opens its own handle on the shared cache.
+
+    Workers enforce the limits per file themselves: their address space is
+    capped, so a PDF allocating too much fails with a MemoryError, and every
+    file runs under a SIGALRM time limit in _run_task.
+    """
+    global _worker_extractor, _worker_file_timeout
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pdf_extraction.limit_memory(max_memory_mb)
+    _worker_file_timeout = file_timeout_seconds
+    cache = paper_cache.PaperCache(*cache_args) if cache_args else None
+    _worker_extractor = ArxivTextExtractor(
+        Console(stderr=True),
+        extract_workers=1,
+        pdf_backend=pdf_backend,
+        cache=cache,
+        source_dir=source_dir,
+    )
+
+
+def _run_task(
+    extractor: "ArxivTextExtractor", task: PdfTask, file_timeout_seconds: int = 0
+) -> Dict[str, Any]:
+    """
+    Extract one task, giving up after file_timeout_seconds.
+
+    Returns:
+        Progress entry of the file (path, arxiv_id, size, mtime_ns and
+        content_hash) with the extracted "result", or the "error" message and
+        the progress database "status" of the failure; "seconds" is the time
+        the file took
+    """
+    entry = {
+        "path": task.path,
+        "arxiv_id": task.arxiv_id,
+        "size": task.size,
+        "mtime_ns": task.mtime_ns,
+        "content_hash": None,
+        "result": None,
+        "error": None,
+        "status": None,
+        "seconds": 0.0,
+    }
+    start = time.perf_counter()
+    try:
+        with pdf_extraction.time_limit(
+            file_timeout_seconds,
+            lambda: pdf_extraction.ExtractionTimeoutError(
+                f"Extraction exceeded {file_timeout_seconds}s"
+            ),
+        ):
+            _extract_task(extractor, task, entry)
+    except pdf_extraction.ExtractionTimeoutError as e:
+        logger.warning(f"Skipping file {task.path}: {e}")
+        entry["error"] = str(e)
+        entry["status"] = progress_manifest.STATUS_TIMED_OUT
+    except (pdf_extraction.ExtractionMemoryError, MemoryError) as e:
+        logger.warning(f"Skipping file {task.path}: {e or 'out of memory'}")
+        entry["error"] = str(e) or "Extraction ran out of memory"
+        entry["status"] = progress_manifest.STATUS_OVER_MEMORY
+    except Exception as e:
+        logger.error(f"Error processing file {task.path}: {e}")
+        entry["error"] = str(e) or type(e).__name__
+        entry["status"] = progress_manifest.STATUS_FAILED
+    entry["seconds"] = time.perf_counter() - start
+    return entry
+
+
+def _extract_task(
+    extractor: "ArxivTextExtractor", task: PdfTask, entry: Dict[str, Any]
+) -> None:
+    """Fill in a task's progress entry and extract it, raising on failure."""
+    if task.member is None:
+        stat = os.stat(task.path)
+        entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        entry["content_hash"] = progress_manifest.file_hash(task.path)
+        source = Path(task.path)
+    elif task.data is None:
+        raise Exception(f"Could not read {task.member.name} from {task.archive}")
+    else:
+        entry["content_hash"] = progress_manifest.content_hash(task.data)
+        source = task.data
+    entry["result"] = extractor._extract_file(
+        source, task.arxiv_id, task.version, name=task.path
+    )
+
+
+def _process_file_in_worker(task: PdfTask) -> Dict[str, Any]:
+    """Extract one task in a worker process."""
+    return _run_task(_worker_extractor, task, _worker_file_timeout)
+
+
 class ArxivTextExtractor:
-    def __init__(self, console: Console = None):
+    def __init__(
+        self,
+        console: Console = None,
+        extract_workers: int = 0,
+        pdf_backend: str = "pypdf2",
+        cache: Optional["paper_cache.PaperCache"] = None,
+        source_dir: Optional[str] = None,
+        file_timeout_seconds: int = 0,
+        max_memory_mb: int = 0,
+    ):
         self.console = console or Console()
-        
-        # Patterns for different types of equations and LaTeX commands
-        self.equation_patterns = [
-            # Display equations ($$...$$, \[...\], \begin{equation}...\end{equation})
-            r'\$\$.*?\$\$',
-            r'\\\[.*?\\\]',
-            r'\\begin\{equation\*?\}.*?\\end\{equation\*?\}',
-            r'\\begin\{align\*?\}.*?\\end\{align\*?\}',
-            r'\\begin\{eqnarray\*?\}.*?\\end\{eqnarray\*?\}',
-            r'\\begin\{gather\*?\}.*?\\end\{gather\*?\}',
-            r'\\begin\{multline\*?\}.*?\\end\{multline\*?\}',
-            r'\\begin\{split\}.*?\\end\{split\}',
-            
-            # Inline equations ($...$)
-            r'\$[^$\n]+\$',
-            
-            # LaTeX math environments
-            r'\\begin\{math\}.*?\\end\{math\}',
-            r'\\begin\{displaymath\}.*?\\end\{displaymath\}',
-            
-            # Numbered equations
-            r'\\begin\{equation\}.*?\\end\{equation\}',
-            r'\\begin\{align\}.*?\\end\{align\}',
-        ]
-        
-        # LaTeX commands to remove
-        self.latex_commands = [
-            r'\\[a-zA-Z]+\*?(\[[^\]]*\])?(\{[^}]*\})*',  # General LaTeX commands
-            r'\\\\',  # Line breaks
-            r'\\&',   # Alignment characters
-            r'\{|\}', # Braces
-            r'\\textbf\{([^}]+)\}',  # Bold text
-            r'\\textit\{([^}]+)\}',  # Italic text
-            r'\\emph\{([^}]+)\}',    # Emphasized text
-            r'\\cite\{[^}]+\}',      # Citations
-            r'\\ref\{[^}]+\}',       # References
-            r'\\label\{[^}]+\}',     # Labels
-        ]
-        
-        # Patterns for cleaning up formatting
-        self.cleanup_patterns = [
-            r'\n\s*\n\s*\n+',  # Multiple newlines
-            r'^\s+|\s+$',       # Leading/trailing whitespace
-            r'[ \t]+',          # Multiple spaces/tabs
-            r'[^\x00-\x7F]+',   # Non-ASCII characters (optional)
-        ]
+        self.extract_workers = extract_workers
+        self.pdf_backend = pdf_backend
+        self.cache = cache
+        self.source_dir = source_dir
+        # Limits per PDF, enforced by isolating each PDF in the extraction
+        # pool; bulk workers enforce them on themselves instead
+        self.file_timeout_seconds = file_timeout_seconds
+        self.max_memory_mb = max_memory_mb
 
-    def extract_text_from_pdf(self, pdf_file) -> str:
-        """Extract raw text from PDF file."""
-        text = ""
+    def extract_text_from_pdf(self, pdf_file, name: Optional[str] = None) -> str:
+        """Extract raw text from a PDF file, or its bytes named by name."""
         try:
-            if isinstance(pdf_file, (str, Path)):
-                with open(pdf_file, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-            else:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            return pdf_extraction.extract_text(
+                pdf_file,
+                backend=self.pdf_backend,
+                workers=self.extract_workers,
+                timeout_seconds=self.file_timeout_seconds,
+                max_memory_mb=self.max_memory_mb,
+            )
+        except pdf_extraction.ExtractionLimitError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to extract text from PDF {pdf_file}: {e}")
+            logger.error(f"Failed to extract text from PDF {name or pdf_file}: {e}")
             raise Exception(f"Failed to extract text from PDF: {e}")
-        
-        return text
 
     def remove_equations(self, text: str) -> str:
         """Remove mathematical equations from text."""
-        # Remove equations (use DOTALL flag to match across newlines)
-        for pattern in self.equation_patterns:
-            text = re.sub(pattern, ' ', text, flags=re.DOTALL)
-        
-        return text
+        return text_normalizer.remove_equations(text)
 
     def remove_latex_commands(self, text: str) -> str:
         """Remove LaTeX formatting commands."""
-        for pattern in self.latex_commands:
-            # For text formatting commands, keep the content
-            if r'\{([^}]+)\}' in pattern:
-                text = re.sub(pattern, r'\1', text)
-            else:
-                text = re.sub(pattern, ' ', text)
-        
-        return text
+        return text_normalizer.remove_latex_commands(text)
 
     def clean_text(self, text: str) -> str:
         """Clean up the text formatting."""
-        # Remove extra whitespace and newlines
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Multiple newlines
-        text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces
-        text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)  # Leading/trailing whitespace
-        
-        # Remove common LaTeX artifacts
-        text = re.sub(r'\\[a-zA-Z]+\*?', '', text)  # Remaining LaTeX commands
-        text = re.sub(r'[{}]', '', text)  # Remaining braces
-        text = re.sub(r'\\\\', '', text)  # Remaining line breaks
-        
-        # Clean up punctuation spacing
-        text = re.sub(r'\s+([.,;:])', r'\1', text)  # Space before punctuation
-        text = re.sub(r'([.,;:])\s*\n', r'\1\n', text)  # Punctuation at line end
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)  # Remove control chars
-        translator = str.maketrans("", "", string.punctuation)
-        text = text.strip().translate(translator)
-
-        return text.strip()
+        return text_normalizer.clean_text(text)
 
     def escape_for_sql(self, text: str) -> str:
         """
@@ -206,27 +368,208 @@ class ArxivTextExtractor:
         """Extract text from a single PDF file."""
         if not hasattr(self, 'metadata') or arxiv_id not in self.metadata:
             return None
-            
+        return self.extract_file(pdf_file, arxiv_id)
+
+    def extract_file(self, pdf_file: Path, arxiv_id: str) -> Optional[Dict[str, Any]]:
+        """Extract text from a single PDF file, without checking its metadata."""
         try:
-            raw_text = self.extract_text_from_pdf(pdf_file)
-            full_text = self.process_text(raw_text)
-            return {"text": full_text}
+            return self._extract_file(pdf_file, arxiv_id)
         except Exception as e:
             logger.error(f"Error processing file {pdf_file}: {e}")
             return None
 
-    def load_metadata(self, metadata_path: str) -> None:
-        """Load metadata from JSON file."""
+    def _extract_file(
+        self,
+        pdf_file,
+        arxiv_id: str,
+        version: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract text from a single PDF, raising on failure.
+
+        pdf_file is a path or the PDF's bytes. Without a version, a path's
+        version is taken from its name, e.g. 2301.12345v2.pdf; papers are only
+        cached with a known version.
+
+        With a source_dir, the text is taken from the paper's LaTeX e-print if
+        it has a usable one, see latex_source, and the result says which
+        "text_source" was used; text from LaTeX also carries its "sections".
+        """
+        if version is None and isinstance(pdf_file, (str, Path)):
+            version = paper_cache.split_version(Path(pdf_file).stem)[1]
+        if self.source_dir is not None:
+            result = self._extract_source(arxiv_id, version)
+            if result is not None:
+                return result
+
+        extractor = f"{self.pdf_backend}-{text_normalizer.VERSION}"
+        use_cache = self.cache is not None and version is not None
+        cached_text = None
+        if use_cache:
+            cached_text = self.cache.get_text(arxiv_id, version, extractor)
+
+        if cached_text is not None:
+            full_text = cached_text
+        else:
+            raw_text = self.extract_text_from_pdf(pdf_file, name)
+            full_text = self.process_text(raw_text)
+            if use_cache:
+                self.cache.put_text(arxiv_id, version, extractor, full_text)
+        if self.source_dir is not None:
+            return {"text": full_text, "text_source": "pdf"}
+        return {"text": full_text}
+
+    def _extract_source(self, arxiv_id: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Extract a paper from its e-print in source_dir, None to use the PDF."""
+        source = latex_source.find_source(self.source_dir, arxiv_id, version)
+        if source is None:
+            return None
+        try:
+            document = latex_source.extract_document(source)
+        except latex_source.LatexSourceError as e:
+            logger.info(f"Using the PDF of {arxiv_id}: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Using the PDF of {arxiv_id}, its LaTeX source failed: {e}")
+            return None
+        return {
+            "text": document.text(),
+            "text_source": "latex",
+            "sections": document.section_tags(),
+        }
+
+    def load_metadata(self, metadata_path: str, metadata_db: Optional[str] = None) -> None:
+        """
+        Open the indexed store of a metadata file, see metadata_store.
+
+        The store is built on first use and whenever the file changes; papers
+        are then looked up lazily instead of loading the whole file.
+        """
         try:
-            with open(metadata_path, 'r') as f:
-                self.metadata = json.load(f)
-            self.console.print(f"[green]✓[/green] Loaded metadata for {len(self.metadata)} papers")
+            self.metadata = metadata_store.open_store(metadata_path, metadata_db)
+            self.console.print(f"[green]✓[/green] Indexed metadata for {len(self.metadata)} papers")
         except Exception as e:
             logger.error(f"Failed to load metadata: {e}")
             raise
 
-    def process_bulk_files(self, pdf_folder: str, metadata_file_path: str) -> None:
-        """Process all PDF files in the folder with Rich progress tracking."""
+    def _iter_results(
+        self,
+        tasks: Iterable[PdfTask],
+        workers: int,
+        chunksize: int,
+        max_tasks_per_child: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Extract the tasks, yielding results as they finish.
+
+        Results are the progress entries returned by _run_task.
+
+        With more than one worker the tasks are spread over a process pool in
+        chunks of chunksize tasks, and results arrive in completion order. A
+        worker is replaced by a fresh process after max_tasks_per_child chunks,
+        0 keeps it, which returns memory a large PDF left fragmented. On Ctrl-C
+        or any other error the pool is terminated before re-raising.
+        """
+        if workers <= 1:
+            for task in tasks:
+                yield _run_task(self, task)
+            return
+
+        cache_args = None
+        if self.cache is not None:
+            cache_args = (
+                str(self.cache.cache_dir),
+                self.cache.max_size_bytes // (1024 * 1024),
+                self.cache.compression_level,
+            )
+        pool = multiprocessing.Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(
+                self.pdf_backend,
+                cache_args,
+                self.source_dir,
+                self.file_timeout_seconds,
+                self.max_memory_mb,
+            ),
+            maxtasksperchild=max_tasks_per_child or None,
+        )
+        try:
+            yield from pool.imap_unordered(_process_file_in_worker, tasks, chunksize)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def process_bulk_files(
+        self,
+        pdf_folder: Optional[str],
+        metadata_file_path: str,
+        workers: int = 1,
+        chunksize: int = 0,
+        output_dir: str = "processed_data",
+        shard_records: int = 10000,
+        shard_max_mb: int = 256,
+        compress: bool = False,
+        output_format: str = "jsonl",
+        progress_db: Optional[str] = None,
+        resume: bool = False,
+        retry_failed: bool = False,
+        max_attempts: int = 3,
+        sink: Optional[Any] = None,
+        tar_files: Optional[List[str]] = None,
+        metadata_db: Optional[str] = None,
+        slow_seconds: float = 30,
+        max_tasks_per_child: int = 0,
+    ) -> None:
+        """
+        Process all PDF files in the folder or tar archives with Rich progress tracking.
+
+        Processed papers are streamed to JSONL, Parquet or Arrow IPC shards in
+        output_dir as they finish, see shards.ShardWriter. The status of every file is recorded in
+        a progress database, see progress_manifest.ProgressManifest. A resumed
+        run appends to the existing shards and skips files that are done and
+        unchanged; a changed file is processed again and its paper written a
+        second time. With a sink, every processed paper is also streamed into
+        the databases, see bulk_ingest.BulkIngestSink.
+
+        PDFs are named by their ArXiv ID, optionally versioned, e.g.
+        2301.12345v2.pdf or old style hep-th9901001v1.pdf, see
+        arxiv_tar.parse_pdf_name. Members of tar archives are read straight
+        from the archives and recorded in the progress database as
+        <archive>/<member name>.
+
+        Files exceeding the extractor's time or memory limit are recorded as
+        timed out or over memory and skipped by resumed runs. The summary
+        separates them and slow files, taking slow_seconds or longer, from
+        failures, with the extraction time of each group.
+
+        Args:
+            pdf_folder: Folder with the PDFs, ignored if tar_files are given
+            metadata_file_path: JSON file with the metadata keyed by ArXiv ID, a JSON
+                lines file, or its metadata store (.sqlite)
+            workers: Processes extracting files in parallel, 1 extracts in this process
+            chunksize: Files handed to a worker at a time, 0 picks one from the file count
+            output_dir: Directory of the output shards and their manifest
+            shard_records: Papers per shard
+            shard_max_mb: Uncompressed size per shard in MB
+            compress: Whether JSONL shards are zstd compressed
+            output_format: Format of the shards, one of shards.FORMATS
+            progress_db: SQLite progress database, output_dir/progress.sqlite if None
+            resume: Skip files done in an earlier run, retry failed ones
+            retry_failed: Only process the files that failed in earlier runs
+            max_attempts: Attempts after which a resumed run stops retrying a file
+            sink: BulkIngestSink receiving every processed paper, closed when
+                processing ends
+            tar_files: Tar archives of PDFs to process instead of pdf_folder
+            metadata_db: Metadata store of metadata_file_path, next to it if None
+            slow_seconds: Files taking this long or longer are reported as slow
+            max_tasks_per_child: Chunks after which a worker process is
+                replaced, 0 keeps workers for the whole run
+        """
         
         # Display header
         self.console.print()
@@ -238,35 +581,112 @@ class ArxivTextExtractor:
         self.console.print()
 
         # Load metadata
-        with self.console.status("[bold green]Loading metadata..."):
-            self.load_metadata(metadata_file_path)
+        with self.console.status("[bold green]Indexing metadata..."):
+            self.load_metadata(metadata_file_path, metadata_db)
 
         # Get list of files
-        path = Path(pdf_folder)
-        files = [f for f in path.iterdir() if f.is_file() and f.suffix.lower() == '.pdf']
+        if tar_files:
+            with self.console.status("[bold green]Listing tar archives..."):
+                files = _list_archives(tar_files)
+        else:
+            files = _list_folder(pdf_folder)
         
         if not files:
-            self.console.print("[red]No PDF files found in the specified folder![/red]")
+            self.console.print("[red]No PDF files found in the specified input![/red]")
             return
 
         # Display processing information
         info_table = Table(box=box.ROUNDED)
         info_table.add_column("Setting", style="cyan")
         info_table.add_column("Value", style="green")
-        info_table.add_row("PDF Folder", str(path))
+        if tar_files:
+            info_table.add_row("Tar Archives", f"{len(tar_files)} ({tar_files[0]}{', ...' if len(tar_files) > 1 else ''})")
+        else:
+            info_table.add_row("PDF Folder", str(Path(pdf_folder)))
         info_table.add_row("Metadata File", metadata_file_path)
+        # Files without an ArXiv ID in their name or without metadata are skipped
+        tasks = [task for task in files if task.arxiv_id in self.metadata]
+        skipped_count = len(files) - len(tasks)
+
+        progress_db = progress_db or str(Path(output_dir) / "progress.sqlite")
+        manifest = progress_manifest.ProgressManifest(progress_db)
+        given_up_count = 0
+        if retry_failed:
+            failed = {entry["path"] for entry in manifest.failed_files()}
+            tasks = [task for task in tasks if task.path in failed]
+        elif resume:
+            remaining = [task for task in tasks if self._needs_processing(manifest, task, max_attempts)]
+            remaining_paths = {task.path for task in remaining}
+            given_up_count = sum(
+                1
+                for task in tasks
+                if task.path not in remaining_paths
+                and manifest.get(task.path)["status"] != progress_manifest.STATUS_DONE
+            )
+            tasks = remaining
+        else:
+            manifest.reset()
+        done_count = len(files) - skipped_count - given_up_count - len(tasks)
+
+        workers = max(1, workers)
+        if chunksize <= 0:
+            # A few chunks per worker balance the load without a round trip per file
+            chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+
         info_table.add_row("Total Files", str(len(files)))
-        info_table.add_row("Save Interval", "Every 1000 files")
+        if resume or retry_failed:
+            info_table.add_row("Already Done", str(done_count))
+        if given_up_count:
+            info_table.add_row("Failed Too Often / Over Limits", f"{given_up_count} (retry with --retry-failed)")
+        info_table.add_row("Progress Database", progress_db)
+        if self.source_dir is not None:
+            info_table.add_row("LaTeX Sources", f"{self.source_dir} (PDF if a paper has none)")
+        timeout = f"{self.file_timeout_seconds}s" if self.file_timeout_seconds else "none"
+        memory = f"{self.max_memory_mb} MB" if self.max_memory_mb else "none"
+        info_table.add_row("Limits per File", f"time {timeout}, memory {memory}")
+        info_table.add_row("Workers", str(workers))
+        if workers > 1:
+            info_table.add_row("Chunk Size", str(chunksize))
+        if output_format == shards.JSONL_FORMAT:
+            output_label = f"{'zstd ' if compress else ''}JSONL"
+        else:
+            output_label = output_format.capitalize()
+        info_table.add_row("Output", f"{output_dir} ({output_label} shards)")
+        if sink is not None:
+            info_table.add_row("Ingest Into", f"PostgreSQL and knowledge base {sink.kb_name}")
+            if sink.chunk_writer is not None:
+                info_table.add_row("Chunk Export", str(sink.chunk_writer.directory))
         
         self.console.print(info_table)
         self.console.print()
 
-        output = []
         processed_count = 0
         error_count = 0
+        latex_count = 0
+        # Files and summed extraction seconds per outcome, see _print_extraction_stats
+        outcomes = ["normal", "slow", *progress_manifest.LIMIT_STATUSES, progress_manifest.STATUS_FAILED]
+        timings = {outcome: [0, 0.0] for outcome in outcomes}
+        start = time.perf_counter()
+
+        # Files whose papers are in the unfinished shard, marked done with it
+        pending: List[Dict[str, Any]] = []
+
+        def mark_shard_done(shard: Dict[str, Any]) -> None:
+            manifest.mark_done(pending, shard["file"])
+            pending.clear()
+
+        writer = shards.ShardWriter(
+            output_dir,
+            max_records=shard_records,
+            max_bytes=shard_max_mb * 1024 * 1024,
+            compress=compress,
+            append=resume or retry_failed,
+            on_shard_closed=mark_shard_done,
+            output_format=output_format,
+        )
 
         # Main processing loop with progress bar
-        with Progress(
+        with manifest, writer, Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
@@ -281,55 +701,188 @@ class ArxivTextExtractor:
         ) as progress:
             
             main_task = progress.add_task("[green]Processing PDF files...", total=len(files))
-            
-            for i, file in enumerate(files):
-                progress.update(main_task, description=f"[green]Processing: {file.name}")
-                
-                try:
-                    arxiv_id = file.name.replace("v1.pdf", "")
-                    text_json = self.extract_from_file(file, arxiv_id)
-                    
-                    if text_json is not None:
-                        output.append(text_json | self.metadata.get(arxiv_id, {}))
+            progress.update(main_task, advance=skipped_count + done_count + given_up_count)
+
+            results = self._iter_results(_read_members(tasks), workers, chunksize, max_tasks_per_child)
+            try:
+                for entry in results:
+                    progress.update(main_task, description=f"[green]Processed: {Path(entry['path']).name}")
+
+                    if entry["result"] is not None:
+                        outcome = "slow" if entry["seconds"] >= slow_seconds else "normal"
+                    else:
+                        outcome = entry["status"]
+                    timings[outcome][0] += 1
+                    timings[outcome][1] += entry["seconds"]
+
+                    if entry["result"] is not None:
+                        shard_count = len(writer.shards)
+                        record = (
+                            {"article_id": entry["arxiv_id"]}
+                            | entry.pop("result")
+                            | self.metadata.get(entry["arxiv_id"], {})
+                        )
+                        writer.write(record)
+                        if sink is not None:
+                            sink.add(record)
+                        pending.append(entry)
                         processed_count += 1
-                    
-                    # Save intermediate results every 1000 files
-                    if (i + 1) % 1000 == 0:
-                        output_file = f"../processed_data_{i + 1}.json"
-                        self._save_results(output, output_file)
-                        progress.print(f"[yellow]💾 Saved intermediate results to {output_file}[/yellow]")
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error processing {file.name}: {e}")
-                
-                progress.update(main_task, advance=1)
-
-        # Save final results
-        final_output_file = "processed_data.json"
-        self._save_results(output, final_output_file)
+                        latex_count += record.get("text_source") == "latex"
+                        if len(writer.shards) > shard_count:
+                            progress.print(f"[yellow]💾 Finished shard {writer.shards[-1]['file']}[/yellow]")
+                    else:
+                        manifest.mark_failed(entry, entry["error"], entry["status"])
+                        if entry["status"] == progress_manifest.STATUS_FAILED:
+                            error_count += 1
+                        else:
+                            progress.print(f"[yellow]⏱ Skipped {Path(entry['path']).name}: {entry['error']}[/yellow]")
+
+                    progress.update(main_task, advance=1)
+            except KeyboardInterrupt:
+                # Workers are stopped by now, the writer keeps what was extracted
+                progress.print(
+                    f"[yellow]Interrupted after {processed_count} files, "
+                    f"partial results are in {output_dir}[/yellow]"
+                )
+                raise
+            finally:
+                if sink is not None:
+                    progress.update(main_task, description="[green]Waiting for the databases...")
+                    ingest_stats = sink.close()
 
         # Display final statistics
+        elapsed = time.perf_counter() - start
+        limited_count = sum(timings[status][0] for status in progress_manifest.LIMIT_STATUSES)
         self.console.print()
+        latex_line = ""
+        if self.source_dir is not None:
+            latex_line = f"[cyan]Text from LaTeX source:[/cyan] {latex_count}, from the PDF: {processed_count - latex_count}\n"
         stats_panel = Panel(
             f"[bold green]Processing Complete![/bold green]\n\n"
             f"[cyan]Files processed successfully:[/cyan] {processed_count}\n"
+            f"{latex_line}"
+            f"[yellow]Slow files ({slow_seconds:g}s or longer):[/yellow] {timings['slow'][0]}\n"
+            f"[yellow]Files timed out:[/yellow] {timings[progress_manifest.STATUS_TIMED_OUT][0]}\n"
+            f"[yellow]Files over the memory limit:[/yellow] {timings[progress_manifest.STATUS_OVER_MEMORY][0]}\n"
             f"[red]Files with errors:[/red] {error_count}\n"
+            f"[dim]Files without metadata:[/dim] {skipped_count}\n"
+            f"[dim]Files done in earlier runs:[/dim] {done_count}\n"
+            f"[dim]Files failed too often or over limits, not retried:[/dim] {given_up_count}\n"
             f"[yellow]Total files processed:[/yellow] {len(files)}\n"
-            f"[blue]Final output saved to:[/blue] {final_output_file}",
+            f"[blue]Output saved to:[/blue] {output_dir} ({len(writer.shards)} shards)",
             title="📊 Results Summary",
             border_style="green"
         )
         self.console.print(stats_panel)
+        self._print_extraction_stats(timings, elapsed)
+        if sink is not None:
+            self._print_ingest_stats(ingest_stats)
+        if error_count or limited_count:
+            self.console.print(
+                f"[yellow]Failed files are listed in {progress_db}, "
+                f"rerun with --retry-failed to retry them[/yellow]"
+            )
 
-    def _save_results(self, output: list, filename: str) -> None:
-        """Save results to JSON file with error handling."""
-        try:
-            with open(filename, "w", encoding="utf-16", errors="ignore") as f:
-                json.dump(output, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save results to {filename}: {e}")
-            raise
+    @staticmethod
+    def _needs_processing(
+        manifest: "progress_manifest.ProgressManifest", task: PdfTask, max_attempts: int
+    ) -> bool:
+        """Check a task against the progress database, see ProgressManifest.needs_processing."""
+        if task.member is None:
+            return manifest.needs_processing(task.path, max_attempts)
+        return manifest.needs_processing(
+            task.path,
+            max_attempts,
+            size=task.size,
+            mtime_ns=task.mtime_ns,
+            hasher=lambda: progress_manifest.content_hash(_read_member(task)),
+        )
+
+    def _print_extraction_stats(self, timings: Dict[str, List], elapsed: float) -> None:
+        """
+        Display the extraction time of the files by outcome.
+
+        Slow files, time-outs and failures are listed apart from the normal
+        files, so a few pathological PDFs do not hide the regular throughput.
+        Seconds are summed over the workers.
+        """
+        labels = {
+            "normal": "Normal",
+            "slow": "Slow",
+            progress_manifest.STATUS_TIMED_OUT: "Timed out",
+            progress_manifest.STATUS_OVER_MEMORY: "Over memory limit",
+            progress_manifest.STATUS_FAILED: "Failed",
+        }
+        table = Table(title="Extraction Time", box=box.ROUNDED)
+        table.add_column("Files", style="cyan")
+        table.add_column("Count", justify="right")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Share", justify="right")
+        table.add_column("Files/s per worker", justify="right", style="green")
+        total_seconds = sum(seconds for _, seconds in timings.values())
+        for outcome, (count, seconds) in timings.items():
+            if not count:
+                continue
+            table.add_row(
+                labels[outcome],
+                str(count),
+                f"{seconds:.1f}",
+                f"{seconds / total_seconds:.0%}" if total_seconds else "-",
+                f"{count / seconds:.2f}" if seconds else "-",
+            )
+        self.console.print(table)
+        processed = timings["normal"][0] + timings["slow"][0]
+        if elapsed > 0:
+            self.console.print(f"[cyan]Papers/s (wall clock):[/cyan] {processed / elapsed:.2f}")
+
+    def _print_ingest_stats(self, stats) -> None:
+        """Display the throughput of the database ingestion."""
+        stats = stats.as_dict()
+        table = Table(title="Ingestion", box=box.ROUNDED)
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green", justify="right")
+        table.add_row("Articles stored", str(stats["articles_stored"]))
+        table.add_row("Articles already stored", str(stats["skipped"]))
+        table.add_row("Articles failed", str(stats["articles_failed"]))
+        table.add_row("Chunks queued", str(stats["chunks"]))
+        table.add_row("Chunks left out (sections)", str(stats["chunks_saved"]))
+        table.add_row("Chunks left out (duplicates)", str(stats["chunks_deduplicated"]))
+        table.add_row("KB batches ok / failed", f"{stats['kb_batches']} / {stats['kb_batches_failed']}")
+        table.add_row("Papers/s", str(stats["papers_per_second"]))
+        table.add_row("Chunks/s", str(stats["chunks_per_second"]))
+        table.add_row("Text MB/s", str(stats["text_mb_per_second"]))
+        for stage, seconds in stats["stage_seconds"].items():
+            table.add_row(f"Busy seconds: {stage}", str(seconds))
+        self.console.print(table)
+
+
+def _create_chunk_writer(args) -> shards.ShardWriter:
+    """Create the writer of the chunks exported by --export-chunks."""
+    return shards.ShardWriter(
+        Path(args.output_dir) / "chunks",
+        prefix="chunks",
+        # Papers have tens of chunks, so chunk shards roll over by size
+        max_records=args.shard_records * 100,
+        max_bytes=args.shard_max_mb * 1024 * 1024,
+        compress=args.compress,
+        append=args.resume or args.retry_failed,
+        output_format=args.output_format,
+        kind=columnar.CHUNKS,
+    )
+
+
+def _create_ingest_sink(chunk_writer: Optional[shards.ShardWriter] = None):
+    """Connect to PostgreSQL and MindsDB and create a bulk ingestion sink."""
+    # The database modules import the application config, so they are only
+    # loaded for --ingest, and need the repository root on the path
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from src import bulk_ingest, psql
+    from src.MindsDBMiddleware import knowledge_base, manager
+
+    kb = knowledge_base.KnowledgeBase(manager.MindsDBManager())
+    return bulk_ingest.BulkIngestSink.from_config(
+        kb, psql.PostgresHandler(), chunk_writer=chunk_writer
+    )
 
 
 def main():
@@ -342,39 +895,225 @@ def main():
 Examples:
   %(prog)s --pdf-folder ./pdfs --metadata-file-path ./metadata.json
   %(prog)s --pdf-folder /path/to/arxiv/pdfs --metadata-file-path /path/to/metadata.json
+  %(prog)s --pdf-folder ./pdfs --metadata-file-path ./metadata.json --workers 8
+  %(prog)s --pdf-folder ./pdfs --metadata-file-path ./metadata.json --workers 8 --resume
+  %(prog)s --pdf-folder ./pdfs --metadata-file-path ./metadata.json --workers 8 --ingest
+  %(prog)s --tar arXiv_pdf_2301_*.tar --metadata-file-path ./metadata.json --workers 8
+  %(prog)s --pdf-folder ./pdfs --metadata-file-path ./metadata.json --source-dir ./src
         """
     )
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '--pdf-folder', 
         type=str, 
-        required=True, 
         help='Path to the folder containing raw arxiv PDFs'
     )
+    source.add_argument(
+        '--tar',
+        type=str,
+        nargs='+',
+        help='arXiv bulk tar archives to read the PDFs from, without unpacking them'
+    )
     parser.add_argument(
         '--metadata-file-path', 
         type=str, 
         required=True, 
         help='Path to the metadata file. A sample is attached in this repo `data` folder.'
     )
+    parser.add_argument(
+        '--metadata-db',
+        type=str,
+        default=None,
+        help='SQLite index of the metadata file, built on first use (default: <metadata file>.sqlite)'
+    )
+    parser.add_argument(
+        '--extract-workers',
+        type=int,
+        default=0,
+        help='Processes extracting the pages of one PDF in parallel (0 = one per CPU, 1 = serial)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Processes extracting files in parallel, each extracting its PDFs serially (1 = in this process)'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=0,
+        help='Files handed to a worker at a time (0 = chosen from the number of files)'
+    )
+    parser.add_argument(
+        '--max-tasks-per-child',
+        type=int,
+        default=100,
+        help='Chunks after which a worker process is replaced by a fresh one (0 = never)'
+    )
+    parser.add_argument(
+        '--file-timeout',
+        type=int,
+        default=300,
+        help='Seconds a PDF may take before it is skipped and recorded as timed out (0 = no limit)'
+    )
+    parser.add_argument(
+        '--max-memory-mb',
+        type=int,
+        default=2048,
+        help='Memory an extraction process may allocate, PDFs exceeding it are skipped (0 = no limit)'
+    )
+    parser.add_argument(
+        '--slow-seconds',
+        type=float,
+        default=30,
+        help='PDFs taking this long or longer are reported as slow in the summary'
+    )
+    parser.add_argument(
+        '--pdf-backend',
+        type=str,
+        default='pypdf2',
+        choices=sorted(pdf_backends.BACKENDS),
+        help='Text extraction backend (pypdf, pdfminer and pdfium must be installed separately)'
+    )
+    parser.add_argument(
+        '--source-dir',
+        type=str,
+        default=None,
+        help='Directory of LaTeX e-prints (e.g. 2301.12345.gz); papers with usable source are extracted from it instead of the PDF'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Directory caching cleaned text per paper version, skips re-extraction on reruns'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=2048,
+        help='Size limit of the cache directory in MB'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default='processed_data',
+        help='Directory the processed papers are written to as shards with a manifest'
+    )
+    parser.add_argument(
+        '--shard-records',
+        type=int,
+        default=10000,
+        help='Papers per output shard'
+    )
+    parser.add_argument(
+        '--shard-max-mb',
+        type=int,
+        default=256,
+        help='Uncompressed size of an output shard in MB'
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='zstd compress the output shards'
+    )
+    parser.add_argument(
+        '--output-format',
+        type=str,
+        default=shards.JSONL_FORMAT,
+        choices=shards.FORMATS,
+        help='Format of the output shards; parquet and arrow need pyarrow and can be read by column'
+    )
+    parser.add_argument(
+        '--export-chunks',
+        action='store_true',
+        help='With --ingest, also write the chunks sent to the knowledge base to <output-dir>/chunks in the output format'
+    )
+    parser.add_argument(
+        '--ingest',
+        action='store_true',
+        help='Also stream the papers into PostgreSQL and the main knowledge base (uses the app config)'
+    )
+    parser.add_argument(
+        '--progress-db',
+        type=str,
+        default=None,
+        help='SQLite database recording the status of every file (default: <output-dir>/progress.sqlite)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an earlier run: skip files done and unchanged, retry failed ones'
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Only process the files that failed in earlier runs'
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=3,
+        help='Attempts after which --resume stops retrying a failed file'
+    )
     
     args = parser.parse_args()
 
     # Validate arguments
-    pdf_path = Path(args.pdf_folder)
     metadata_path = Path(args.metadata_file_path)
     
-    if not pdf_path.exists():
-        console.print(f"[red]Error: PDF folder '{pdf_path}' does not exist![/red]")
+    if args.pdf_folder and not Path(args.pdf_folder).exists():
+        console.print(f"[red]Error: PDF folder '{args.pdf_folder}' does not exist![/red]")
+        return 1
+
+    if args.source_dir and not Path(args.source_dir).is_dir():
+        console.print(f"[red]Error: Source folder '{args.source_dir}' does not exist![/red]")
         return 1
+
+    for tar_file in args.tar or []:
+        if not Path(tar_file).is_file():
+            console.print(f"[red]Error: Tar archive '{tar_file}' does not exist![/red]")
+            return 1
     
     if not metadata_path.exists():
         console.print(f"[red]Error: Metadata file '{metadata_path}' does not exist![/red]")
         return 1
 
+    if args.export_chunks and not args.ingest:
+        console.print("[red]Error: --export-chunks requires --ingest![/red]")
+        return 1
+
     # Create extractor and process files
     try:
-        arxiv_extractor = ArxivTextExtractor(console)
-        arxiv_extractor.process_bulk_files(args.pdf_folder, args.metadata_file_path)
+        cache = paper_cache.PaperCache(args.cache_dir, args.cache_max_mb) if args.cache_dir else None
+        arxiv_extractor = ArxivTextExtractor(
+            console,
+            extract_workers=args.extract_workers,
+            pdf_backend=args.pdf_backend,
+            cache=cache,
+            source_dir=args.source_dir,
+            file_timeout_seconds=args.file_timeout,
+            max_memory_mb=args.max_memory_mb,
+        )
+        arxiv_extractor.process_bulk_files(
+            args.pdf_folder,
+            args.metadata_file_path,
+            args.workers,
+            args.chunksize,
+            output_dir=args.output_dir,
+            shard_records=args.shard_records,
+            shard_max_mb=args.shard_max_mb,
+            compress=args.compress,
+            output_format=args.output_format,
+            progress_db=args.progress_db,
+            resume=args.resume,
+            retry_failed=args.retry_failed,
+            max_attempts=args.max_attempts,
+            sink=_create_ingest_sink(_create_chunk_writer(args) if args.export_chunks else None) if args.ingest else None,
+            tar_files=args.tar,
+            metadata_db=args.metadata_db,
+            slow_seconds=args.slow_seconds,
+            max_tasks_per_child=args.max_tasks_per_child,
+        )
         return 0
     except KeyboardInterrupt:
         console.print("\n[yellow]Processing interrupted by user.[/yellow]")
@@ -0,0 +1,445 @@
+"""
+Streaming bulk ingestion of processed papers into PostgreSQL and the main
+knowledge base.
+
+Papers handed to BulkIngestSink.add flow through two bounded queues:
+
+1. Postgres: a thread collects papers into batches, drops the papers already
+   stored, e.g. by an interrupted run that is resumed, and loads every batch
+   with COPY, falling back to row-by-row inserts for a batch COPY rejects.
+   The new papers are passed on to the knowledge base queue.
+2. Knowledge base: a thread chunks every paper (section-aware, with
+   near-duplicate chunks dropped) and hands fixed-size chunk batches to a
+   pool of threads inserting them into the main knowledge base concurrently.
+   Chunks of batches in flight are reserved in the near-duplicate filter and
+   only remembered once their batch is inserted.
+   With a chunk writer, the chunks are also exported with their offsets into
+   the paper's text, e.g. to Parquet, see columnar.py.
+
+A full queue, or too many knowledge base batches in flight, blocks add, so a
+fast producer such as the multiprocess bulk extractor is slowed down to the
+pace of the databases instead of buffering the corpus in memory. Failures
+are counted and never stop the run. Throughput of the whole run is reported
+in IngestStats when the sink is closed.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import columnar, config_loader as config, dedup, psql, sections, shards
+from .MindsDBMiddleware import knowledge_base
+from .run_stats import RunStats
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input on a queue
+_DONE = object()
+
+# Seconds a consumer waits for more papers before writing a partial batch
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class BulkIngestError(Exception):
+    """Raised when the sink cannot accept papers anymore."""
+
+    pass
+
+
+class IngestStats(RunStats):
+    """Counters and stage busy times of a bulk ingestion run."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.papers = 0
+        self.skipped = 0
+        self.text_bytes = 0
+        self.articles_stored = 0
+        self.articles_failed = 0
+        self.chunks = 0
+        self.chunks_saved = 0
+        self.chunks_deduplicated = 0
+        self.kb_batches = 0
+        self.kb_batches_failed = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters, timings and throughput as a dictionary."""
+        elapsed = self.elapsed_seconds or float("inf")
+        return {
+            "papers": self.papers,
+            "skipped": self.skipped,
+            "articles_stored": self.articles_stored,
+            "articles_failed": self.articles_failed,
+            "chunks": self.chunks,
+            "chunks_saved": self.chunks_saved,
+            "chunks_deduplicated": self.chunks_deduplicated,
+            "kb_batches": self.kb_batches,
+            "kb_batches_failed": self.kb_batches_failed,
+            "papers_per_second": round(self.papers / elapsed, 2),
+            "chunks_per_second": round(self.chunks / elapsed, 2),
+            "text_mb_per_second": round(self.text_bytes / (1024 * 1024) / elapsed, 2),
+            **self.timings(),
+        }
+
+
+def to_article(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a processed paper record to an article row.
+
+    Bulk metadata may lack columns or name the ID arxiv_id; missing columns
+    are stored empty, and the primary category defaults to the first category.
+    NUL characters, which PostgreSQL text cannot hold, are removed.
+
+    Args:
+        record: Processed paper with its text and metadata
+
+    Returns:
+        Dictionary with exactly the article columns
+    """
+    article = {
+        column: str(record.get(column) or "").replace("\x00", "")
+        for column in psql.ARTICLE_INSERT_COLUMNS
+    }
+    if not article["article_id"]:
+        article["article_id"] = record.get("arxiv_id") or ""
+    if not article["primary_category"] and article["categories"]:
+        article["primary_category"] = article["categories"].replace(",", " ").split()[0]
+    return article
+
+
+def to_kb_metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a processed paper record to the metadata of its knowledge base chunks.
+
+    Knowledge base inserts need every configured metadata column, which bulk
+    metadata may lack, so the article columns are taken from to_article and
+    any other missing metadata column is stored empty. The record's other
+    fields are kept.
+
+    Args:
+        record: Processed paper with its text and metadata
+
+    Returns:
+        Metadata dictionary without the text
+    """
+    metadata = {key: value for key, value in record.items() if key != "text"}
+    metadata.update(
+        (column, value)
+        for column, value in to_article(record).items()
+        if column != "text"
+    )
+    for column in config.kb.metadata_columns:
+        metadata.setdefault(column, "")
+    return metadata
+
+
+class BulkIngestSink:
+    """Streams processed papers into PostgreSQL and the main knowledge base."""
+
+    def __init__(
+        self,
+        kb: knowledge_base.KnowledgeBase,
+        postgres_client: psql.PostgresHandler,
+        kb_name: Optional[str] = None,
+        postgres_batch_size: int = 500,
+        kb_batch_size: int = 25,
+        kb_workers: int = 4,
+        queue_size: int = 64,
+        chunk_writer: Optional[shards.ShardWriter] = None,
+    ) -> None:
+        """
+        Initialize the sink; its threads start on the first paper.
+
+        Args:
+            kb: Knowledge base handler
+            postgres_client: PostgreSQL handler
+            kb_name: Knowledge base to fill, the main knowledge base if None
+            postgres_batch_size: Articles loaded per COPY
+            kb_batch_size: Chunks per knowledge base insert
+            kb_workers: Knowledge base inserts in flight at a time
+            queue_size: Papers buffered per consumer before add blocks
+            chunk_writer: Writer of chunk rows receiving every chunk sent to
+                the knowledge base, closed with the sink
+        """
+        self._kb = kb
+        self._postgres_client = postgres_client
+        self.kb_name = kb_name or config.kb.name
+        self.postgres_batch_size = max(1, postgres_batch_size)
+        self.kb_batch_size = max(1, kb_batch_size)
+        self.kb_workers = max(1, kb_workers)
+        self.chunk_writer = chunk_writer
+        self.stats = IngestStats()
+
+        self._postgres_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._kb_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._kb_slots = threading.BoundedSemaphore(self.kb_workers * 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._corpus_filter = dedup.shared_filter()
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._started_at: Optional[float] = None
+        self._closed = False
+
+    @classmethod
+    def from_config(
+        cls,
+        kb: knowledge_base.KnowledgeBase,
+        postgres_client: psql.PostgresHandler,
+        chunk_writer: Optional[shards.ShardWriter] = None,
+    ) -> "BulkIngestSink":
+        """Create a sink with the bulk_ingest config section's settings."""
+        return cls(
+            kb,
+            postgres_client,
+            postgres_batch_size=config.bulk_ingest.postgres_batch_size,
+            kb_batch_size=config.bulk_ingest.kb_batch_size,
+            kb_workers=config.bulk_ingest.kb_workers,
+            queue_size=config.bulk_ingest.queue_size,
+            chunk_writer=chunk_writer,
+        )
+
+    def __enter__(self) -> "BulkIngestSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start(self) -> None:
+        """Start the consumer threads."""
+        self._started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.kb_workers, thread_name_prefix="bulk-kb"
+        )
+        for name, target in (
+            ("bulk-postgres", self._postgres_loop),
+            ("bulk-chunk", self._kb_loop),
+        ):
+            thread = threading.Thread(
+                target=self._guard(target), name=name, daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _guard(self, target):
+        """Wrap a consumer so an unexpected error is kept for add to raise."""
+
+        def run() -> None:
+            try:
+                target()
+            except BaseException as e:
+                logger.exception(f"Bulk ingestion thread failed: {e}")
+                self._error = e
+
+        return run
+
+    def _put(self, q: queue.Queue, item: Any) -> None:
+        """Put an item on a queue, blocking while it is full."""
+        while True:
+            if self._error is not None:
+                raise BulkIngestError(f"Bulk ingestion failed: {self._error}")
+            try:
+                q.put(item, timeout=FLUSH_INTERVAL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a processed paper for ingestion, blocking while the sink is busy.
+
+        Args:
+            record: Processed paper with its text and metadata
+
+        Raises:
+            BulkIngestError: If the sink is closed or a consumer thread failed
+        """
+        if self._closed:
+            raise BulkIngestError("Sink is closed")
+        if self._started_at is None:
+            self._start()
+
+        self.stats.add("papers")
+        self.stats.add("text_bytes", len((record.get("text") or "").encode("utf-8")))
+        self._put(self._postgres_queue, record)
+
+    def _drain(self, q: queue.Queue, batch_size: int):
+        """Yield batches from a queue, flushing partial batches when it idles."""
+        batch = []
+        while True:
+            try:
+                item = q.get(timeout=FLUSH_INTERVAL_SECONDS)
+            except queue.Empty:
+                if batch:
+                    yield batch
+                    batch = []
+                continue
+            if item is _DONE:
+                if batch:
+                    yield batch
+                return
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    def _postgres_loop(self) -> None:
+        """Load new queued papers into PostgreSQL in COPY batches."""
+        for batch in self._drain(self._postgres_queue, self.postgres_batch_size):
+            start = time.perf_counter()
+            articles = [to_article(record) for record in batch]
+            new_articles = self._drop_stored(articles)
+            new_ids = {article["article_id"] for article in new_articles}
+            for record, article in zip(batch, articles):
+                if article["article_id"] in new_ids:
+                    new_ids.discard(article["article_id"])
+                    self._put(self._kb_queue, record)
+            if new_articles:
+                self._write_articles(new_articles)
+            self.stats.add_time("postgres", time.perf_counter() - start)
+
+    def _drop_stored(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop duplicates and articles that are already stored."""
+        unique: Dict[str, Dict[str, Any]] = {}
+        for article in articles:
+            unique.setdefault(article["article_id"], article)
+        try:
+            existing = set(
+                self._postgres_client.find_existing_article_ids(list(unique))
+            )
+        except Exception as e:
+            logger.error(f"Failed to look up existing articles, storing all: {e}")
+            existing = set()
+
+        self.stats.add("skipped", len(articles) - len(unique) + len(existing))
+        return [
+            article
+            for article_id, article in unique.items()
+            if article_id not in existing
+        ]
+
+    def _write_articles(self, articles: List[Dict[str, Any]]) -> None:
+        """COPY a batch, retrying row by row if it is rejected."""
+        try:
+            self.stats.add(
+                "articles_stored", self._postgres_client.copy_articles(articles)
+            )
+            return
+        except Exception as e:
+            logger.warning(
+                f"COPY of {len(articles)} articles failed, inserting one by one: {e}"
+            )
+
+        for article in articles:
+            try:
+                self._postgres_client.insert_article(article)
+                self.stats.add("articles_stored")
+            except Exception as e:
+                logger.error(f"Failed to store article {article['article_id']}: {e}")
+                self.stats.add("articles_failed")
+
+    def _kb_loop(self) -> None:
+        """Chunk queued papers and submit chunk batches to the insert threads."""
+        corpus_filter = self._corpus_filter
+        # Chunks waiting for a full batch, with their near-duplicate signatures
+        pending: List[Tuple[Dict[str, Any], Any]] = []
+
+        for batch in self._drain(self._kb_queue, 1):
+            record = batch[0]
+            text = record.get("text")
+            if not text or not text.strip():
+                continue
+
+            start = time.perf_counter()
+            metadata = to_kb_metadata(record)
+            chunks, saved = sections.chunk_paper_text(text, 1500, 300)
+            chunks, duplicates = dedup.deduplicate_paper(chunks)
+            signatures = [None] * len(chunks)
+            if corpus_filter is not None:
+                total = len(chunks)
+                # Reserved right away, so concurrent batches of other papers
+                # see them; remembered or released once their batch is done
+                chunks, signatures = corpus_filter.filter(chunks)
+                corpus_filter.reserve(signatures)
+                duplicates += total - len(chunks)
+            if self.chunk_writer is not None:
+                article_id = metadata["article_id"]
+                for row in columnar.chunk_rows(article_id, text, chunks):
+                    self.chunk_writer.write(row)
+            pending.extend(
+                (chunk | metadata, signature)
+                for chunk, signature in zip(chunks, signatures)
+            )
+            self.stats.add("chunks", len(chunks))
+            self.stats.add("chunks_saved", sum(saved.values()))
+            self.stats.add("chunks_deduplicated", duplicates)
+            self.stats.add_time("chunk", time.perf_counter() - start)
+
+            while len(pending) >= self.kb_batch_size:
+                self._submit_kb_batch(pending[: self.kb_batch_size])
+                pending = pending[self.kb_batch_size :]
+
+        if pending:
+            self._submit_kb_batch(pending)
+
+    def _submit_kb_batch(self, entries: List[Tuple[Dict[str, Any], Any]]) -> None:
+        """Hand a chunk batch to the insert threads, blocking if all are busy."""
+        self._kb_slots.acquire()
+        future = self._executor.submit(self._insert_kb_batch, entries)
+        future.add_done_callback(lambda _: self._kb_slots.release())
+
+    def _insert_kb_batch(self, entries: List[Tuple[Dict[str, Any], Any]]) -> None:
+        """Insert one chunk batch into the knowledge base."""
+        start = time.perf_counter()
+        chunks = [chunk for chunk, _ in entries]
+        try:
+            inserted = self._kb.insert_batch(self.kb_name, chunks)
+        except Exception as e:
+            logger.error(f"Failed to insert {len(chunks)} chunks: {e}")
+            inserted = False
+        if self._corpus_filter is not None:
+            signatures = [signature for _, signature in entries]
+            if inserted:
+                self._corpus_filter.add(signatures)
+            else:
+                # Not stored, so a later ingestion must not drop them
+                self._corpus_filter.release(signatures)
+        self.stats.add("kb_batches" if inserted else "kb_batches_failed")
+        self.stats.add_time("knowledge_base", time.perf_counter() - start)
+
+    def close(self) -> IngestStats:
+        """
+        Wait until every queued paper is stored, then stop the threads.
+
+        Returns:
+            Statistics of the run
+
+        Raises:
+            BulkIngestError: If a consumer thread failed
+        """
+        if self._closed:
+            return self.stats
+        self._closed = True
+
+        if self._started_at is not None:
+            queues = (self._postgres_queue, self._kb_queue)
+            for q, thread in zip(queues, self._threads):
+                # A failed consumer no longer drains its queue
+                while thread.is_alive():
+                    try:
+                        q.put(_DONE, timeout=FLUSH_INTERVAL_SECONDS)
+                        break
+                    except queue.Full:
+                        continue
+                thread.join()
+            self._executor.shutdown(wait=True)
+            self.stats.elapsed_seconds = time.perf_counter() - self._started_at
+        if self.chunk_writer is not None:
+            self.chunk_writer.close()
+
+        logger.info(f"Bulk ingestion finished: {self.stats.as_dict()}")
+        if self._error is not None:
+            raise BulkIngestError(f"Bulk ingestion failed: {self._error}")
+        return self.stats
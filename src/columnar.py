@@ -0,0 +1,510 @@
+"""
+Columnar Parquet and Arrow IPC files of processed papers and chunks.
+
+JSON has to be parsed as a whole record even when only a few fields are
+needed, and stores every paper's text escaped. The columnar formats store
+each field as its own column instead, so readers can load only the columns
+they need, e.g. the metadata without the text:
+
+- Parquet (.parquet): zstd compressed, the smallest files
+- Arrow IPC (.arrow): uncompressed, memory-mapped and read without copying
+
+Two kinds of rows are supported:
+
+- papers: the string fields in PAPER_COLUMNS get their own columns; every
+  other field, and fields whose value is not a string, are kept as JSON in
+  the "extra" column, so records read back equal the records written
+- chunks: the article_id, position, character offsets into the paper's text
+  and text of each chunk, plus an optional embedding, see CHUNK_COLUMNS
+
+Both formats need the optional pyarrow package. The writers are used by
+shards.ShardWriter for columnar shards, and shards.iter_records reads them.
+
+Usage (from the repository root):
+    python src/columnar.py processed_data papers.parquet
+"""
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PARQUET_FORMAT = "parquet"
+ARROW_FORMAT = "arrow"
+SUFFIXES = {PARQUET_FORMAT: ".parquet", ARROW_FORMAT: ".arrow"}
+
+PAPERS = "papers"
+CHUNKS = "chunks"
+
+# String fields of papers stored as columns, the rest is in EXTRA_COLUMN
+PAPER_COLUMNS = (
+    "article_id",
+    "arxiv_id",
+    "title",
+    "authors",
+    "abstract",
+    "categories",
+    "primary_category",
+    "published_year",
+    "text_source",
+    "text",
+)
+EXTRA_COLUMN = "extra"
+CHUNK_COLUMNS = ("article_id", "chunk_index", "start", "end", "text", "embedding")
+
+# Rows per record batch, and per Parquet row group, when writing
+BATCH_RECORDS = {PAPERS: 1024, CHUNKS: 16384}
+# Rows per record batch when reading Parquet files
+READ_BATCH_SIZE = 1024
+
+
+class ColumnarError(Exception):
+    """Raised when a columnar file cannot be written or read."""
+
+    pass
+
+
+def require_pyarrow() -> Any:
+    """
+    Import pyarrow with its Parquet and IPC modules.
+
+    Returns:
+        The pyarrow module
+
+    Raises:
+        ColumnarError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ColumnarError(
+            "The Parquet and Arrow formats require the 'pyarrow' package"
+        ) from e
+    return pyarrow
+
+
+def format_of(path: Union[str, Path]) -> Optional[str]:
+    """Return the columnar format of a path by its suffix, None if not columnar."""
+    name = str(path).lower()
+    for output_format, suffix in SUFFIXES.items():
+        if name.endswith(suffix):
+            return output_format
+    return None
+
+
+def is_columnar_path(path: Union[str, Path]) -> bool:
+    """Whether a path names a Parquet or Arrow IPC file."""
+    return format_of(path) is not None
+
+
+def schema(kind: str = PAPERS) -> Any:
+    """
+    Return the Arrow schema of a kind of rows.
+
+    Args:
+        kind: PAPERS or CHUNKS
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    pa = require_pyarrow()
+    if kind == PAPERS:
+        fields = [
+            pa.field(name, pa.large_string() if name == "text" else pa.string())
+            for name in PAPER_COLUMNS
+        ]
+        return pa.schema(fields + [pa.field(EXTRA_COLUMN, pa.large_string())])
+    if kind == CHUNKS:
+        return pa.schema(
+            [
+                pa.field("article_id", pa.string()),
+                pa.field("chunk_index", pa.int32()),
+                pa.field("start", pa.int64()),
+                pa.field("end", pa.int64()),
+                pa.field("text", pa.large_string()),
+                pa.field("embedding", pa.list_(pa.float32())),
+            ]
+        )
+    raise ValueError(f"Unknown row kind '{kind}', expected {PAPERS} or {CHUNKS}")
+
+
+def record_bytes(record: Dict[str, Any]) -> int:
+    """Approximate the uncompressed size of a row by its string lengths."""
+    return sum(len(value) if isinstance(value, str) else 8 for value in record.values())
+
+
+def _paper_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Split paper records into the column lists of the papers schema."""
+    columns: Dict[str, List[Any]] = {name: [] for name in PAPER_COLUMNS}
+    extras = []
+    for record in records:
+        extra = {}
+        for name, values in columns.items():
+            value = record.get(name)
+            values.append(value if isinstance(value, str) else None)
+        for key, value in record.items():
+            # Missing columns are null, so None values are kept in extra
+            if key not in columns or not isinstance(value, str):
+                extra[key] = value
+        extras.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+    columns[EXTRA_COLUMN] = extras
+    return columns
+
+
+def to_table(records: List[Dict[str, Any]], kind: str = PAPERS) -> Any:
+    """
+    Convert rows to an Arrow table.
+
+    Args:
+        records: Paper records, or chunk rows as returned by chunk_rows
+        kind: PAPERS or CHUNKS
+
+    Returns:
+        pyarrow.Table with the schema of the kind
+    """
+    pa = require_pyarrow()
+    if kind == PAPERS:
+        columns = _paper_columns(records)
+    else:
+        columns = {
+            name: [record.get(name) for record in records] for name in CHUNK_COLUMNS
+        }
+    return pa.table(columns, schema=schema(kind))
+
+
+def chunk_rows(
+    article_id: str, text: str, chunks: Iterable[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Turn the chunks of a paper into chunk rows with character offsets.
+
+    The offsets are the "start" and "end" spans the chunker records, see
+    sections.chunk_sections. A chunk without a matching span is searched in
+    the text from the start of the previous chunk, as chunks are slices of the
+    text in order, possibly overlapping; one that is not a slice of the text
+    gets null offsets.
+
+    Args:
+        article_id: ArXiv ID of the paper
+        text: Text the chunks were cut from
+        chunks: Chunk dictionaries with "text" and optional "start", "end"
+            and "embedding"
+
+    Returns:
+        Rows with the CHUNK_COLUMNS
+    """
+    rows = []
+    position = 0
+    for index, chunk in enumerate(chunks):
+        chunk_text = chunk["text"]
+        start, end = chunk.get("start"), chunk.get("end")
+        if start is None or end is None or text[start:end] != chunk_text:
+            start = text.find(chunk_text, position)
+            if start < 0:
+                start = text.find(chunk_text)
+        if start >= 0:
+            position = start
+        rows.append(
+            {
+                "article_id": article_id,
+                "chunk_index": index,
+                "start": start if start >= 0 else None,
+                "end": start + len(chunk_text) if start >= 0 else None,
+                "text": chunk_text,
+                "embedding": chunk.get("embedding"),
+            }
+        )
+    return rows
+
+
+class ColumnarWriter:
+    """Writes rows to one Parquet or Arrow IPC file in record batches."""
+
+    def __init__(
+        self,
+        sink: Union[str, Path, BinaryIO],
+        output_format: Optional[str] = None,
+        kind: str = PAPERS,
+        batch_records: Optional[int] = None,
+    ) -> None:
+        """
+        Open the file for writing.
+
+        Args:
+            sink: Path or binary file; a file given by the caller stays open
+                when the writer is closed
+            output_format: PARQUET_FORMAT or ARROW_FORMAT, from the path's
+                suffix if None
+            kind: PAPERS or CHUNKS
+            batch_records: Rows buffered per record batch, see BATCH_RECORDS
+
+        Raises:
+            ColumnarError: If pyarrow is missing or the format is unknown
+        """
+        pa = require_pyarrow()
+        output_format = output_format or format_of(sink)
+        if output_format not in SUFFIXES:
+            raise ColumnarError(
+                f"Unknown columnar format of {sink}, expected "
+                f"{' or '.join(SUFFIXES.values())}"
+            )
+        self.output_format = output_format
+        self.kind = kind
+        self.batch_records = batch_records or BATCH_RECORDS[kind]
+        self.rows_written = 0
+        self._schema = schema(kind)
+        self._rows: List[Dict[str, Any]] = []
+
+        if isinstance(sink, (str, Path)):
+            sink = str(sink)
+        if output_format == PARQUET_FORMAT:
+            self._writer = pa.parquet.ParquetWriter(
+                sink, self._schema, compression="zstd"
+            )
+        else:
+            # Uncompressed, so readers can use the memory-mapped buffers as is
+            self._writer = pa.ipc.new_file(sink, self._schema)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffer a row, writing a record batch once batch_records are buffered."""
+        self._rows.append(record)
+        if len(self._rows) >= self.batch_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as a record batch."""
+        if not self._rows:
+            return
+        self._writer.write_table(to_table(self._rows, self.kind))
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def close(self) -> None:
+        """Write the buffered rows and the file footer."""
+        self.flush()
+        self._writer.close()
+
+
+def write_file(
+    records: Iterable[Dict[str, Any]], path: Union[str, Path], kind: str = PAPERS
+) -> int:
+    """
+    Write rows to a Parquet or Arrow IPC file, chosen by the path's suffix.
+
+    The file is written next to path and renamed once complete.
+
+    Args:
+        records: Paper records or chunk rows
+        path: Output file, .parquet or .arrow
+        kind: PAPERS or CHUNKS
+
+    Returns:
+        Number of rows written
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            with ColumnarWriter(f, format_of(path), kind) as writer:
+                for record in records:
+                    writer.write(record)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return writer.rows_written
+
+
+def _column_names(path: Path) -> List[str]:
+    """Return the column names stored in a file."""
+    pa = require_pyarrow()
+    if format_of(path) == PARQUET_FORMAT:
+        return pa.parquet.read_schema(path, memory_map=True).names
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def _physical_columns(path: Path, columns: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Map requested fields to the stored columns that hold them.
+
+    A paper field that is not a column, or whose value was not a string, is
+    in the extra column, so it is read whenever a projection is requested.
+    """
+    if columns is None:
+        return None
+    names = _column_names(path)
+    physical = [name for name in names if name in columns]
+    if EXTRA_COLUMN in names and EXTRA_COLUMN not in physical:
+        physical.append(EXTRA_COLUMN)
+    return physical
+
+
+def read_table(path: Union[str, Path], columns: Optional[List[str]] = None) -> Any:
+    """
+    Read the stored columns of a file into an Arrow table, memory-mapped.
+
+    Arrow IPC tables reference the mapped file without copying it; Parquet
+    columns are decompressed. Paper fields kept in the extra column are not
+    decoded, see iter_records for complete records.
+
+    Args:
+        path: Parquet or Arrow IPC file
+        columns: Stored columns to read, all if None
+
+    Returns:
+        pyarrow.Table
+
+    Raises:
+        ColumnarError: If pyarrow is missing or the file is not columnar
+        FileNotFoundError: If the file does not exist
+    """
+    pa = require_pyarrow()
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+    output_format = format_of(path)
+    if output_format == PARQUET_FORMAT:
+        return pa.parquet.read_table(path, columns=columns, memory_map=True)
+    if output_format == ARROW_FORMAT:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return table.select(columns) if columns is not None else table
+    raise ColumnarError(f"Not a Parquet or Arrow IPC file: {path}")
+
+
+def iter_batches(
+    path: Union[str, Path], columns: Optional[List[str]] = None
+) -> Iterator[Any]:
+    """
+    Lazily iterate over the record batches of a file, memory-mapped.
+
+    Args:
+        path: Parquet or Arrow IPC file
+        columns: Stored columns to read, all if None
+
+    Yields:
+        pyarrow.RecordBatch objects in file order
+    """
+    pa = require_pyarrow()
+    path = Path(path)
+    if format_of(path) == PARQUET_FORMAT:
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        yield from parquet_file.iter_batches(
+            batch_size=READ_BATCH_SIZE, columns=columns
+        )
+        return
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield batch.select(columns) if columns is not None else batch
+
+
+def iter_records(
+    path: Union[str, Path], columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate over the rows of a file as dictionaries.
+
+    Papers are restored from their columns and the extra column, so they equal
+    the records written; null columns are left out.
+
+    Args:
+        path: Parquet or Arrow IPC file of papers or chunks
+        columns: Fields to return, all if None; only the columns holding them
+            are read
+
+    Yields:
+        Rows in file order
+
+    Raises:
+        ColumnarError: If pyarrow is missing or the file is not columnar
+        FileNotFoundError: If the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+    if not is_columnar_path(path):
+        raise ColumnarError(f"Not a Parquet or Arrow IPC file: {path}")
+
+    wanted = set(columns) if columns is not None else None
+    for batch in iter_batches(path, _physical_columns(path, columns)):
+        data = batch.to_pydict()
+        extras = data.pop(EXTRA_COLUMN, None)
+        names = list(data)
+        for i, values in enumerate(zip(*data.values()) if names else []):
+            record = {
+                name: value
+                for name, value in zip(names, values)
+                if value is not None or name not in PAPER_COLUMNS
+            }
+            if extras is not None and extras[i] is not None:
+                record.update(json.loads(extras[i]))
+            if wanted is not None:
+                record = {key: value for key, value in record.items() if key in wanted}
+            yield record
+        if not names and extras is not None:
+            # Only the extra column was needed
+            for extra in extras:
+                record = json.loads(extra) if extra is not None else {}
+                yield {key: value for key, value in record.items() if key in wanted}
+
+
+def count_rows(path: Union[str, Path]) -> int:
+    """Return the number of rows of a file from its metadata, without reading it."""
+    pa = require_pyarrow()
+    path = Path(path)
+    if format_of(path) == PARQUET_FORMAT:
+        return pa.parquet.ParquetFile(path, memory_map=True).metadata.num_rows
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        batches = range(reader.num_record_batches)
+        return sum(reader.get_batch(i).num_rows for i in batches)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert processed papers or chunks to Parquet or Arrow IPC"
+    )
+    parser.add_argument(
+        "source",
+        type=str,
+        help="Shard directory, JSONL shard, columnar file or legacy UTF-16 JSON list",
+    )
+    parser.add_argument("target", type=str, help="Output file, .parquet or .arrow")
+    parser.add_argument(
+        "--kind",
+        type=str,
+        default=PAPERS,
+        choices=(PAPERS, CHUNKS),
+        help="Kind of rows in the source",
+    )
+    args = parser.parse_args()
+
+    try:
+        from . import shards
+    except ImportError:
+        # Run as a script from the src folder
+        import shards
+
+    if not is_columnar_path(args.target):
+        parser.error("target must end in .parquet or .arrow")
+    rows = write_file(shards.iter_records(args.source), args.target, args.kind)
+    print(f"Wrote {rows} {args.kind} to {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
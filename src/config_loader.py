@@ -182,12 +182,20 @@ def set_config(config_path: Optional[Path] = None):
     global _config
     _config = create_config_with_env_overrides(config_path)
 
-    global mdb_infra, kb, psql, agent, app, kb_storage
+    global mdb_infra, kb, psql, agent, app, kb_storage, search, extraction, download, ingest, cache, sections, dedup, bulk_ingest
 
     mdb_infra = _config.mindsdb_infra
     kb = _config.knowledge_base
     psql = _config.postgres
     agent = _config.agent
+    search = _config.search
+    extraction = _config.extraction
+    download = _config.download
+    ingest = _config.ingest
+    cache = _config.cache
+    sections = _config.sections
+    dedup = _config.dedup
+    bulk_ingest = _config.bulk_ingest
     app = _config.app
     kb_storage = kb.storage
     logger.info("Configuration updated successfully")
@@ -200,6 +208,14 @@ try:
     kb = config.knowledge_base
     psql = config.postgres
     agent = config.agent
+    search = config.search
+    extraction = config.extraction
+    download = config.download
+    ingest = config.ingest
+    cache = config.cache
+    sections = config.sections
+    dedup = config.dedup
+    bulk_ingest = config.bulk_ingest
     app = config.app
     kb_storage = kb.storage
     logger.info("Configuration module initialized successfully")
@@ -0,0 +1,339 @@
+"""
+Near-duplicate chunk filtering with MinHash and locality-sensitive hashing.
+
+Running headers and footers, license boilerplate and repeated tables make
+PDF extraction produce many near-identical chunks, each of which would be
+embedded and stored. Chunks are compared by the Jaccard similarity of their
+word shingles, estimated with MinHash signatures: every shingle is hashed
+with crc32 and num_perm universal hash functions, and a signature keeps the
+minimum of each function over the shingles. The fraction of equal signature
+entries estimates the Jaccard similarity of two chunks.
+
+To avoid comparing every pair, signatures are split into bands of rows and
+every band is hashed into a bucket; only chunks sharing a bucket are compared.
+The band layout is chosen so that pairs at the configured threshold are
+almost always candidates, and candidates are then checked against the
+threshold with their full signatures.
+
+Chunks are deduplicated within each paper, and optionally against the chunks
+already added to the main knowledge base by this process (shared_filter).
+"""
+
+import logging
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest prime below 2**32: hash values fit in uint32, and a * x + b never
+# overflows uint64 for a, b < P and 32-bit crc32 values x
+_PRIME = np.uint64(4294967291)
+
+_shared_filter: Optional["NearDuplicateFilter"] = None
+_shared_filter_lock = threading.Lock()
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose the LSH band layout for a similarity threshold.
+
+    Pairs with similarity s share a bucket with probability
+    1 - (1 - s**rows)**bands, which rises steeply around (1 / bands)**(1 / rows).
+    The layout whose steep point is closest below the threshold is chosen, so
+    that pairs at the threshold are rarely missed.
+
+    Args:
+        num_perm: Length of the signatures
+        threshold: Jaccard similarity from which chunks are duplicates
+
+    Returns:
+        Tuple of the number of bands and rows per band
+    """
+    best = (num_perm, 1)
+    best_point = -1.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        point = (1 / bands) ** (1 / rows)
+        if best_point < point <= threshold:
+            best, best_point = (bands, rows), point
+    return best
+
+
+class _Buckets:
+    """Signatures and their LSH band buckets."""
+
+    def __init__(self, bands: int, rows: int) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.signatures: List[Optional[np.ndarray]] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        # id() of a stored signature -> its position in signatures
+        self._positions: Dict[int, int] = {}
+
+    def _keys(self, signature: np.ndarray) -> Iterator[Tuple[int, bytes]]:
+        """Yield the bucket key of every band of a signature."""
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows].tobytes()
+
+    def add(self, signature: np.ndarray) -> None:
+        """Store a signature in the buckets of its bands."""
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        self._positions[id(signature)] = index
+        for key in self._keys(signature):
+            self._buckets.setdefault(key, []).append(index)
+
+    def remove(self, signature: np.ndarray) -> None:
+        """Remove a signature, given as the stored array object, if present."""
+        index = self._positions.pop(id(signature), None)
+        if index is None:
+            return
+        self.signatures[index] = None
+        for key in self._keys(signature):
+            bucket = self._buckets[key]
+            bucket.remove(index)
+            if not bucket:
+                del self._buckets[key]
+        if not self._positions:
+            self.clear()
+
+    def has_match(self, signature: np.ndarray, threshold: float) -> bool:
+        """Whether a stored signature is at least threshold similar."""
+        checked = set()
+        for key in self._keys(signature):
+            for index in self._buckets.get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if np.mean(self.signatures[index] == signature) >= threshold:
+                    return True
+        return False
+
+    def clear(self) -> None:
+        """Remove all signatures."""
+        self.signatures = []
+        self._buckets = {}
+        self._positions = {}
+
+
+class NearDuplicateFilter:
+    """Drops chunks that are near-duplicates of earlier or indexed chunks."""
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        max_entries: Optional[int] = None,
+        seed: int = 1,
+    ) -> None:
+        """
+        Initialize the filter with an empty index.
+
+        Args:
+            threshold: Estimated Jaccard similarity from which chunks are
+                duplicates, between 0 and 1
+            num_perm: Number of hash functions per signature
+            shingle_size: Words per shingle
+            max_entries: Indexed signatures above which the index is cleared,
+                unbounded if None
+            seed: Seed of the hash functions; filters compare equal only with
+                the same seed and num_perm
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if num_perm <= 0 or shingle_size <= 0:
+            raise ValueError("num_perm and shingle_size must be positive")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._index = _Buckets(self.bands, self.rows)
+        # Reserved signatures of chunks whose insert is still in flight
+        self._pending = _Buckets(self.bands, self.rows)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index.signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            uint32 signature of num_perm entries, or None if text has no words
+        """
+        words = text.lower().split()
+        if not words:
+            return None
+
+        size = self.shingle_size
+        shingles = {
+            " ".join(words[i : i + size])
+            for i in range(max(1, len(words) - size + 1))
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def filter(
+        self, chunks: List[Dict[str, Any]], text_key: str = "text"
+    ) -> Tuple[List[Dict[str, Any]], List[np.ndarray]]:
+        """
+        Drop near-duplicate chunks.
+
+        A chunk is dropped if it is a near-duplicate of an indexed or reserved
+        chunk, or of a chunk kept earlier in the list. The index is not
+        changed; call add with the returned signatures once the kept chunks
+        are stored, optionally after reserve while they are being stored.
+        Chunks without words are kept.
+
+        Args:
+            chunks: Chunk dictionaries
+            text_key: Key of the chunk text
+
+        Returns:
+            Tuple of the kept chunks and their signatures, one per kept chunk
+            and None for chunks without words
+        """
+        computed = [self.signature(chunk.get(text_key) or "") for chunk in chunks]
+
+        kept = []
+        signatures = []
+        batch = _Buckets(self.bands, self.rows)
+        with self._lock:
+            for chunk, signature in zip(chunks, computed):
+                if signature is None:
+                    kept.append(chunk)
+                    signatures.append(None)
+                    continue
+                if batch.has_match(signature, self.threshold):
+                    continue
+                if self._index.has_match(signature, self.threshold):
+                    continue
+                if self._pending.has_match(signature, self.threshold):
+                    continue
+                batch.add(signature)
+                kept.append(chunk)
+                signatures.append(signature)
+
+        return kept, signatures
+
+    def reserve(self, signatures: List[Optional[np.ndarray]]) -> None:
+        """
+        Reserve signatures of chunks that are being stored.
+
+        Until add commits them or release drops them, filter treats reserved
+        signatures like indexed ones, so concurrently stored batches do not
+        store the same chunks.
+
+        Args:
+            signatures: Signatures returned by filter
+        """
+        with self._lock:
+            for signature in signatures:
+                if signature is not None:
+                    self._pending.add(signature)
+
+    def release(self, signatures: List[Optional[np.ndarray]]) -> None:
+        """
+        Drop reserved signatures whose chunks failed to be stored.
+
+        Args:
+            signatures: Signatures passed to reserve
+        """
+        with self._lock:
+            for signature in signatures:
+                if signature is not None:
+                    self._pending.remove(signature)
+
+    def add(self, signatures: List[Optional[np.ndarray]]) -> None:
+        """
+        Add the signatures of stored chunks to the index.
+
+        Args:
+            signatures: Signatures returned by filter, reserved or not
+        """
+        signatures = [signature for signature in signatures if signature is not None]
+        with self._lock:
+            if self.max_entries and len(self) + len(signatures) > self.max_entries:
+                logger.info(
+                    f"Near-duplicate index reached {len(self)} chunks, clearing it"
+                )
+                self._index.clear()
+            for signature in signatures:
+                self._pending.remove(signature)
+                self._index.add(signature)
+
+
+def filter_from_config(max_entries: Optional[int] = None) -> NearDuplicateFilter:
+    """Create a filter with the dedup config section's settings."""
+    from . import config_loader as config
+
+    return NearDuplicateFilter(
+        threshold=config.dedup.threshold,
+        num_perm=config.dedup.num_perm,
+        shingle_size=config.dedup.shingle_size,
+        max_entries=max_entries,
+    )
+
+
+def deduplicate_paper(
+    chunks: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Drop near-duplicate chunks within one paper, if enabled in the config.
+
+    Args:
+        chunks: Chunk dictionaries of the paper
+
+    Returns:
+        Tuple of the kept chunks and the number of chunks dropped
+    """
+    from . import config_loader as config
+
+    if not config.dedup.enabled:
+        return chunks, 0
+    kept, _ = filter_from_config().filter(chunks)
+    return kept, len(chunks) - len(kept)
+
+
+def shared_filter() -> Optional[NearDuplicateFilter]:
+    """
+    Return the process-wide filter of chunks added to the main knowledge base.
+
+    Returns:
+        NearDuplicateFilter instance, or None if deduplication across papers
+        is disabled
+    """
+    global _shared_filter
+
+    from . import config_loader as config
+
+    if not (config.dedup.enabled and config.dedup.across_papers):
+        return None
+
+    with _shared_filter_lock:
+        if _shared_filter is None:
+            _shared_filter = filter_from_config(config.dedup.max_corpus_entries)
+        return _shared_filter
@@ -0,0 +1,322 @@
+"""
+Streaming PDF downloads from ArXiv.
+
+All downloads in a process share one keep-alive requests.Session, so repeated
+downloads reuse pooled connections instead of opening a new TLS connection per
+paper. Responses are streamed in chunks into a SpooledTemporaryFile, which
+stays in memory for small PDFs and rolls over to disk for large ones, so a
+download never holds the whole PDF in memory twice.
+
+A transfer that is interrupted mid-stream is resumed with an HTTP Range
+request from the last received byte. Downloads larger than the configured
+limit are aborted as soon as the limit is crossed, and every request, resumed
+or not, passes through a process-wide rate limiter so concurrent ingestions
+stay within ArXiv's request rate. The base URL is configurable, which lets
+the downloader run against a mirror or a local HTTP server. A download can
+be cancelled from another thread with a threading.Event, e.g. once it turns
+out to be unnecessary.
+"""
+
+import logging
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import paper_cache
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Errors after which a partially received body can be resumed
+_RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+_shared_downloader: Optional["PdfDownloader"] = None
+_shared_downloader_lock = threading.Lock()
+
+
+class DownloadError(Exception):
+    """Custom exception for failed PDF downloads."""
+
+    pass
+
+
+class DownloadTooLargeError(DownloadError):
+    """Raised when a download exceeds the configured size limit."""
+
+    pass
+
+
+class DownloadCancelledError(DownloadError):
+    """Raised when a download is cancelled before it finished."""
+
+    pass
+
+
+class RateLimiter:
+    """Thread-safe limiter enforcing a minimum interval between requests."""
+
+    def __init__(self, min_interval_seconds: float) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            min_interval_seconds: Minimum time between two requests, 0 disables it
+        """
+        self.min_interval_seconds = min_interval_seconds
+        self._next_request = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next request may be sent."""
+        if self.min_interval_seconds <= 0:
+            return
+
+        # Reserve a slot under the lock, sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request)
+            self._next_request = slot + self.min_interval_seconds
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PdfDownloader:
+    """Streams PDFs over a shared HTTP session with resume and a size limit."""
+
+    def __init__(
+        self,
+        base_url: str = "https://arxiv.org",
+        timeout_seconds: int = 30,
+        max_size_mb: int = 100,
+        spool_max_mb: int = 8,
+        max_resume_attempts: int = 3,
+        min_interval_seconds: float = 1.0,
+        pool_size: int = 10,
+        user_agent: str = "PaperSense",
+    ) -> None:
+        """
+        Initialize the downloader and its HTTP session.
+
+        Args:
+            base_url: Server PDFs are downloaded from, e.g. "https://arxiv.org"
+            timeout_seconds: Connect and read timeout of each request
+            max_size_mb: Downloads larger than this are aborted
+            spool_max_mb: Downloads larger than this are spooled to disk
+            max_resume_attempts: Range requests sent after interrupted transfers
+            min_interval_seconds: Minimum time between requests of this process
+            pool_size: Keep-alive connections kept open per host
+            user_agent: User-Agent header sent with every request
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.spool_max_bytes = spool_max_mb * 1024 * 1024
+        self.max_resume_attempts = max_resume_attempts
+        self.rate_limiter = RateLimiter(min_interval_seconds)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+        # Range offsets count raw bytes, so bodies must not be content-encoded
+        self.session.headers["Accept-Encoding"] = "identity"
+
+    def pdf_url(self, arxiv_id: str, version: Optional[str] = None) -> str:
+        """
+        Build the PDF URL of a paper.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Version to download, e.g. "v2"; None keeps the ID's own
+
+        Returns:
+            URL of the PDF below the base URL
+        """
+        base_id, id_version = paper_cache.split_version(arxiv_id)
+        return f"{self.base_url}/pdf/{base_id}{version or id_version or ''}"
+
+    def _check_size(self, size: int, url: str) -> None:
+        if size > self.max_size_bytes:
+            raise DownloadTooLargeError(
+                f"Download of {url} exceeds the limit of "
+                f"{self.max_size_bytes // (1024 * 1024)} MB"
+            )
+
+    @staticmethod
+    def _check_cancelled(cancel: Optional[threading.Event], url: str) -> None:
+        if cancel is not None and cancel.is_set():
+            raise DownloadCancelledError(f"Download of {url} cancelled")
+
+    def _receive(
+        self,
+        url: str,
+        target: BinaryIO,
+        received: int,
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[int]:
+        """
+        Send one request and append the body to target.
+
+        Args:
+            url: URL to download
+            target: File the body is written to
+            received: Bytes already in target, requested with a Range header
+            cancel: Event that aborts the transfer once set
+
+        Returns:
+            Total size announced by the server, or None if unknown
+        """
+        headers = {"Range": f"bytes={received}-"} if received else {}
+        self.rate_limiter.wait()
+
+        with self.session.get(
+            url, headers=headers, stream=True, timeout=self.timeout_seconds
+        ) as response:
+            if received and response.status_code == 416:
+                # Nothing left after the received bytes
+                return received
+            response.raise_for_status()
+
+            if received and response.status_code != 206:
+                logger.info(f"Server ignored range request for {url}, restarting")
+                target.seek(0)
+                target.truncate()
+                received = 0
+
+            content_length = response.headers.get("Content-Length")
+            total_size = (
+                received + int(content_length) if content_length is not None else None
+            )
+            if total_size is not None:
+                self._check_size(total_size, url)
+
+            for chunk in response.iter_content(CHUNK_SIZE):
+                self._check_cancelled(cancel, url)
+                received += len(chunk)
+                self._check_size(received, url)
+                target.write(chunk)
+
+            return total_size
+
+    def download(
+        self, url: str, cancel: Optional[threading.Event] = None
+    ) -> BinaryIO:
+        """
+        Download a URL into a spooled temporary file.
+
+        Args:
+            url: URL to download
+            cancel: Event that aborts the download once set
+
+        Returns:
+            Temporary file positioned at the start; the caller closes it
+
+        Raises:
+            DownloadTooLargeError: If the body exceeds the size limit
+            DownloadCancelledError: If cancel was set before the download finished
+            DownloadError: If the download fails or cannot be resumed
+        """
+        target = tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes)
+        attempt = 0
+
+        try:
+            while True:
+                self._check_cancelled(cancel, url)
+                try:
+                    total_size = self._receive(url, target, target.tell(), cancel)
+                    received = target.tell()
+                    if total_size is None or received >= total_size:
+                        break
+                    error = f"received {received} of {total_size} bytes"
+                except _RESUMABLE_ERRORS as e:
+                    error = str(e)
+
+                attempt += 1
+                if attempt > self.max_resume_attempts:
+                    raise DownloadError(f"Failed to download {url}: {error}")
+                logger.warning(
+                    f"Download of {url} interrupted after {target.tell()} bytes "
+                    f"({error}), resuming ({attempt}/{self.max_resume_attempts})"
+                )
+        except DownloadError:
+            target.close()
+            raise
+        except requests.exceptions.RequestException as e:
+            target.close()
+            raise DownloadError(f"Failed to download {url}: {e}") from e
+
+        logger.info(f"Downloaded {url}: {target.tell()} bytes")
+        target.seek(0)
+        return target
+
+    def download_pdf(
+        self,
+        arxiv_id: str,
+        version: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> BinaryIO:
+        """
+        Download the PDF of an ArXiv paper.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Version to download, e.g. "v2"; None keeps the ID's own
+            cancel: Event that aborts the download once set
+
+        Returns:
+            Temporary file with the PDF, positioned at the start
+
+        Raises:
+            DownloadError: If the download fails
+        """
+        return self.download(self.pdf_url(arxiv_id, version), cancel)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+
+def shared_downloader() -> PdfDownloader:
+    """
+    Return the process-wide downloader configured in the download config section.
+
+    Returns:
+        PdfDownloader instance shared by all pipelines of the process
+    """
+    global _shared_downloader
+
+    from . import config_loader as config
+
+    with _shared_downloader_lock:
+        if _shared_downloader is None:
+            _shared_downloader = PdfDownloader(
+                base_url=config.download.base_url,
+                timeout_seconds=config.download.timeout_seconds,
+                max_size_mb=config.download.max_size_mb,
+                spool_max_mb=config.download.spool_max_mb,
+                max_resume_attempts=config.download.max_resume_attempts,
+                min_interval_seconds=config.download.min_interval_seconds,
+                pool_size=config.download.pool_size,
+            )
+        return _shared_downloader
+
+
+def close_shared_downloader() -> None:
+    """Close the process-wide downloader, if it was created."""
+    global _shared_downloader
+
+    with _shared_downloader_lock:
+        if _shared_downloader is not None:
+            _shared_downloader.close()
+            _shared_downloader = None
@@ -0,0 +1,113 @@
+"""Category and year facet counts for the search filters.
+
+Counts are maintained by Postgres in a materialized view that is refreshed
+after ingestion. This module keeps the aggregated view contents in memory for
+a short time, so serving facets costs a dictionary lookup rather than a query.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from . import psql
+
+logger = logging.getLogger(__name__)
+
+
+def aggregate_facets(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate facet view rows into per-category, per-year and combined counts.
+
+    Args:
+        rows: Rows from PostgresHandler.fetch_facet_counts
+
+    Returns:
+        Dictionary with "categories", "years" and "counts" lists, ordered by
+        descending count for categories and by descending year for years
+    """
+    category_totals: Dict[str, int] = defaultdict(int)
+    year_totals: Dict[str, int] = defaultdict(int)
+    counts = []
+
+    for row in rows:
+        category, year, count = row["category"], row["year"], int(row["paper_count"])
+        if category:
+            category_totals[category] += count
+        if year:
+            year_totals[year] += count
+        counts.append({"category": category, "year": year, "count": count})
+
+    return {
+        "categories": [
+            {"value": category, "count": count}
+            for category, count in sorted(
+                category_totals.items(), key=lambda item: (-item[1], item[0])
+            )
+        ],
+        "years": [
+            {"value": year, "count": count}
+            for year, count in sorted(year_totals.items(), reverse=True)
+        ],
+        "counts": counts,
+    }
+
+
+class FacetCache:
+    """Thread-safe in-memory copy of the facet counts with a TTL."""
+
+    def __init__(self, postgres_client: psql.PostgresHandler, ttl_seconds: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            postgres_client: PostgreSQL client the counts are read from
+            ttl_seconds: Seconds the counts are served before being reloaded
+        """
+        self._postgres_client = postgres_client
+        self.ttl_seconds = ttl_seconds
+        self._facets: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Return the facet counts, reloading them from Postgres when expired.
+
+        If the reload fails, the previously loaded counts are served until the
+        next attempt.
+
+        Returns:
+            Aggregated facets as produced by aggregate_facets
+
+        Raises:
+            PostgresQueryError: If the counts were never loaded and the query fails
+        """
+        facets = self._facets
+        if facets is not None and time.monotonic() < self._expires_at:
+            return facets
+
+        with self._lock:
+            if self._facets is not None and time.monotonic() < self._expires_at:
+                return self._facets
+
+            try:
+                self._facets = aggregate_facets(
+                    self._postgres_client.fetch_facet_counts()
+                )
+                logger.info(
+                    f"Loaded facet counts for {len(self._facets['categories'])} "
+                    f"categories and {len(self._facets['years'])} years"
+                )
+            except Exception as e:
+                if self._facets is None:
+                    raise
+                logger.warning(f"Failed to reload facet counts, serving stale: {e}")
+
+            self._expires_at = time.monotonic() + self.ttl_seconds
+            return self._facets
+
+    def invalidate(self) -> None:
+        """Force a reload on the next get."""
+        self._expires_at = 0.0
@@ -0,0 +1,995 @@
+"""
+Text extraction from the LaTeX source of ArXiv papers.
+
+Most ArXiv papers are submitted as LaTeX, and their source e-print holds far
+cleaner text than the typeset PDF: no hyphenation, columns, running headers
+or glyph soup from equations. An e-print is a gzipped tar archive, a single
+gzipped .tex file, or a directory it was unpacked to. This module finds the
+main file, inlines \\input and \\include (and the .bbl of \\bibliography),
+tokenizes the LaTeX and renders the document body as text:
+
+- comments, the preamble and math (inline, display and math environments)
+  are dropped, as are tables, pictures and verbatim code; figures and tables
+  only keep their captions
+- sectioning commands, the abstract and the bibliography start a new
+  Section, tagged with its kind (abstract, body, acknowledgements, appendix
+  or references)
+- commands that refer to something else (\\cite, \\ref, \\label, ...) are
+  dropped with their arguments, front matter such as \\author is left to the
+  metadata, and any other command is dropped while the text of its arguments
+  is kept, so \\emph{word} becomes "word"
+- macros without parameters defined with \\newcommand or \\def are expanded
+
+The rendered text is cleaned with text_normalizer.clean_text like PDF text,
+with every section heading on its own line. Callers fall back to the PDF when
+extract_document raises LatexSourceError, e.g. for PDF-only submissions.
+"""
+
+import gzip
+import logging
+import posixpath
+import re
+import tarfile
+import unicodedata
+import zlib
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    from . import text_normalizer
+except ImportError:
+    # Imported by the bulk processor run as a script from the src folder
+    import text_normalizer
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change alters the extracted text
+VERSION = "1"
+
+SOURCE_SUFFIXES = ("", ".gz", ".tar.gz", ".tgz", ".tar", ".tex")
+TEX_SUFFIXES = (".tex", ".ltx")
+
+# Source files above this size are generated data, not prose
+MAX_FILE_BYTES = 8 * 1024 * 1024
+# Documents with less text are treated as having no usable source
+MIN_TEXT_CHARS = 200
+MAX_INPUT_DEPTH = 16
+MAX_MACRO_DEPTH = 16
+
+MAIN_FILE_NAMES = ("main", "ms", "paper", "article", "manuscript")
+
+SECTION_LEVELS = {
+    "part": 0,
+    "chapter": 0,
+    "section": 1,
+    "subsection": 2,
+    "subsubsection": 3,
+    "paragraph": 4,
+    "subparagraph": 5,
+}
+
+MATH_ENVIRONMENTS = {
+    "math",
+    "displaymath",
+    "equation",
+    "eqnarray",
+    "align",
+    "alignat",
+    "flalign",
+    "gather",
+    "multline",
+    "split",
+    "dmath",
+    "dgroup",
+    "IEEEeqnarray",
+}
+SKIPPED_ENVIRONMENTS = {
+    "tabular",
+    "tabularx",
+    "tabulary",
+    "longtable",
+    "tikzpicture",
+    "pgfpicture",
+    "picture",
+    "verbatim",
+    "lstlisting",
+    "minted",
+    "comment",
+    "algorithmic",
+}
+# Environments of which only the captions are kept
+FLOAT_ENVIRONMENTS = {
+    "figure",
+    "table",
+    "wrapfigure",
+    "wraptable",
+    "subfigure",
+    "sidewaysfigure",
+    "sidewaystable",
+    "SCfigure",
+    "algorithm",
+}
+# Mandatory arguments of \begin{...} that are not text
+ENVIRONMENT_ARGUMENTS = {
+    "minipage": 1,
+    "multicols": 1,
+    "thebibliography": 1,
+    "adjustbox": 1,
+    "tabular": 1,
+}
+
+# Commands dropped with their mandatory arguments, by argument count
+DROPPED_COMMANDS = {
+    # References to other parts and other works
+    "cite": 1,
+    "citep": 1,
+    "citet": 1,
+    "citealp": 1,
+    "citealt": 1,
+    "citeauthor": 1,
+    "citeyear": 1,
+    "citenum": 1,
+    "parencite": 1,
+    "textcite": 1,
+    "autocite": 1,
+    "nocite": 1,
+    "ref": 1,
+    "eqref": 1,
+    "autoref": 1,
+    "cref": 1,
+    "Cref": 1,
+    "pageref": 1,
+    "nameref": 1,
+    "label": 1,
+    "url": 1,
+    # Front matter, which the metadata provides
+    "author": 1,
+    "affiliation": 1,
+    "affil": 1,
+    "address": 1,
+    "institute": 1,
+    "email": 1,
+    "thanks": 1,
+    "date": 1,
+    "keywords": 1,
+    # Setup and layout
+    "documentclass": 1,
+    "usepackage": 1,
+    "RequirePackage": 1,
+    "input": 1,
+    "include": 1,
+    "includegraphics": 1,
+    "graphicspath": 1,
+    "bibliography": 1,
+    "bibliographystyle": 1,
+    "vspace": 1,
+    "hspace": 1,
+    "newlength": 1,
+    "setlength": 2,
+    "addtolength": 2,
+    "setcounter": 2,
+    "addtocounter": 2,
+    "pagestyle": 1,
+    "thispagestyle": 1,
+    "color": 1,
+    "fontsize": 2,
+    "hypersetup": 1,
+    "captionsetup": 1,
+    "ensuremath": 1,
+}
+# Commands of which only the last argument is text, by argument count
+LAST_ARGUMENT_COMMANDS = {
+    "href": 2,
+    "textcolor": 2,
+    "colorbox": 2,
+    "foreignlanguage": 2,
+    "raisebox": 2,
+    "scalebox": 2,
+    "resizebox": 3,
+    "texorpdfstring": 2,
+}
+# Commands whose argument is text set apart from the surrounding words
+SPACED_COMMANDS = {"footnote", "footnotetext", "marginpar", "caption"}
+DEFINITION_COMMANDS = {
+    "newcommand",
+    "renewcommand",
+    "providecommand",
+    "DeclareRobustCommand",
+    "def",
+    "gdef",
+    "edef",
+    "xdef",
+    "let",
+    "newenvironment",
+    "renewenvironment",
+    "newtheorem",
+    "DeclareMathOperator",
+}
+
+_SYMBOLS = {
+    "\\": "\n",
+    "\n": " ",
+    " ": " ",
+    ",": " ",
+    ";": " ",
+    ":": " ",
+    "!": "",
+    "-": "",
+    "/": "",
+    "@": "",
+    "%": "%",
+    "&": "&",
+    "$": "$",
+    "#": "#",
+    "_": "_",
+    "{": "{",
+    "}": "}",
+    "newline": "\n",
+    "linebreak": "\n",
+    "par": "\n\n",
+    "quad": " ",
+    "qquad": " ",
+    "ldots": "...",
+    "dots": "...",
+    "textbackslash": "\\",
+    "LaTeX": "LaTeX",
+    "TeX": "TeX",
+}
+_LETTERS = {
+    "i": "i",
+    "j": "j",
+    "ss": "\u00df",
+    "o": "\u00f8",
+    "O": "\u00d8",
+    "ae": "\u00e6",
+    "AE": "\u00c6",
+    "oe": "\u0153",
+    "OE": "\u0152",
+    "aa": "\u00e5",
+    "AA": "\u00c5",
+    "l": "\u0142",
+    "L": "\u0141",
+}
+# Accent commands and the combining character they add
+_ACCENTS = {
+    "'": "\u0301",
+    "`": "\u0300",
+    "^": "\u0302",
+    '"': "\u0308",
+    "~": "\u0303",
+    "=": "\u0304",
+    ".": "\u0307",
+    "c": "\u0327",
+    "v": "\u030c",
+    "u": "\u0306",
+    "H": "\u030b",
+    "k": "\u0328",
+    "r": "\u030a",
+}
+
+# A comment eats its line break and the next line's indentation, unless the
+# next line is empty and ends a paragraph
+_COMMENT = re.compile(r"(?<!\\)((?:\\\\)*)%[^\n]*(?:\n[ \t]*(?=[^\n]))?")
+_DOCUMENTCLASS = re.compile(r"\\documentclass\b")
+_BEGIN_DOCUMENT = re.compile(r"\\begin\s*\{document\}")
+_INPUT = re.compile(
+    r"\\(?:input|include|subfile)\b\s*(?:\{([^{}]+)\}|([^\s{}\\]+))"
+)
+_BIBLIOGRAPHY = re.compile(r"\\bibliography\s*\{[^{}]*\}")
+_TOKEN = re.compile(
+    r"(?P<cmd>\\(?:[A-Za-z@]+\*?|[^A-Za-z@]))"
+    r"|(?P<par>\n[ \t]*\n\s*)"
+    r"|(?P<math>\$\$?)"
+    r"|(?P<special>[{}\[\]~&^_#])"
+    r"|(?P<text>[^\\${}\[\]~&^_#\n]+|\n)"
+)
+_SPACES = re.compile(r"[ \t]+")
+_LINE_EDGES = re.compile(r"[ \t]*\n[ \t]*")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*")
+
+Token = Tuple[str, str]
+
+
+class LatexSourceError(Exception):
+    """Raised when a paper has no usable LaTeX source."""
+
+    pass
+
+
+class Section(NamedTuple):
+    """A section of a rendered document, its text one paragraph per line."""
+
+    title: str
+    level: int
+    kind: str
+    text: str
+
+
+class LatexDocument(NamedTuple):
+    """Text of a LaTeX document, split into sections."""
+
+    title: Optional[str]
+    main_file: str
+    sections: List[Section]
+
+    def _pieces(self) -> List[Tuple[Section, str]]:
+        """Return every non-empty section with its cleaned heading and text."""
+        pieces = []
+        for section in self.sections:
+            text = text_normalizer.clean_text(section.text)
+            if not text:
+                continue
+            title = text_normalizer.clean_text(section.title)
+            pieces.append((section, f"{title}\n{text}" if title else text))
+        return pieces
+
+    def text(self) -> str:
+        """
+        Return the cleaned text, each section heading on its own line.
+
+        Lines are not separated by blank lines, which clean_text would join.
+
+        Returns:
+            Text cleaned like PDF text, see text_normalizer.clean_text
+        """
+        return "\n".join(piece for _, piece in self._pieces())
+
+    def section_tags(self) -> List[Dict[str, Any]]:
+        """
+        Tag the sections in the text returned by text.
+
+        Returns:
+            Title, level, kind and character offset of every section
+        """
+        tags = []
+        offset = 0
+        for section, piece in self._pieces():
+            tags.append(
+                {
+                    "title": section.title,
+                    "level": section.level,
+                    "kind": section.kind,
+                    "offset": offset,
+                }
+            )
+            offset += len(piece) + 1
+        return tags
+
+
+def _decode(data: bytes) -> str:
+    """Decode a source file, which is not always UTF-8."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _is_source_file(name: str) -> bool:
+    return name.lower().endswith(TEX_SUFFIXES + (".bbl",))
+
+
+def read_source(source: Union[str, Path, bytes]) -> Dict[str, str]:
+    """
+    Read the LaTeX files of an e-print.
+
+    Args:
+        source: Path of the e-print (gzipped tar, gzipped .tex, tar or .tex)
+            or of the directory it was unpacked to, or the e-print's bytes
+
+    Returns:
+        Content of every .tex, .ltx and .bbl file by path in the e-print
+
+    Raises:
+        LatexSourceError: If the e-print is a PDF or holds no LaTeX file
+    """
+    files: Dict[str, str] = {}
+    if isinstance(source, (str, Path)) and Path(source).is_dir():
+        root = Path(source)
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and _is_source_file(path.name):
+                if path.stat().st_size <= MAX_FILE_BYTES:
+                    files[path.relative_to(root).as_posix()] = _decode(
+                        path.read_bytes()
+                    )
+    else:
+        data = source if isinstance(source, bytes) else Path(source).read_bytes()
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        if data.startswith(b"%PDF"):
+            raise LatexSourceError("The e-print is a PDF, not LaTeX source")
+        try:
+            with tarfile.open(fileobj=BytesIO(data), mode="r:*") as tar:
+                for member in tar:
+                    if (
+                        member.isfile()
+                        and _is_source_file(member.name)
+                        and member.size <= MAX_FILE_BYTES
+                    ):
+                        name = posixpath.normpath(member.name)
+                        files[name] = _decode(tar.extractfile(member).read())
+        except tarfile.TarError:
+            # A single file submission
+            files["main.tex"] = _decode(data)
+
+    if not any(name.lower().endswith(TEX_SUFFIXES) for name in files):
+        raise LatexSourceError("The e-print holds no LaTeX files")
+    return files
+
+
+def strip_comments(text: str) -> str:
+    """Remove LaTeX comments, keeping escaped percent signs."""
+    if "%" not in text:
+        return text
+    return _COMMENT.sub(r"\1", text)
+
+
+def find_main_file(files: Dict[str, str]) -> str:
+    """
+    Find the main file of an e-print.
+
+    The main file declares the document class; if several do, files with a
+    document body, a conventional name and more text are preferred.
+
+    Args:
+        files: Comment-free file contents by path
+
+    Returns:
+        Path of the main file
+
+    Raises:
+        LatexSourceError: If no file is a complete document
+    """
+    candidates = [
+        name
+        for name, text in files.items()
+        if name.lower().endswith(TEX_SUFFIXES) and _DOCUMENTCLASS.search(text)
+    ]
+    if not candidates:
+        tex_files = [name for name in files if name.lower().endswith(TEX_SUFFIXES)]
+        if len(tex_files) == 1:
+            return tex_files[0]
+        raise LatexSourceError("No main file with \\documentclass in the e-print")
+
+    def preference(name: str) -> Tuple[bool, bool, int]:
+        stem = posixpath.splitext(posixpath.basename(name))[0].lower()
+        has_body = bool(_BEGIN_DOCUMENT.search(files[name]))
+        return has_body, stem in MAIN_FILE_NAMES, len(files[name])
+
+    return max(candidates, key=preference)
+
+
+def _find_file(files: Dict[str, str], directory: str, name: str) -> Optional[str]:
+    """Look up an \\input name relative to the main file's directory."""
+    name = name.strip().strip('"')
+    for base in (directory, ""):
+        path = posixpath.normpath(posixpath.join(base, name))
+        for candidate in (path, path + ".tex"):
+            if candidate in files:
+                return candidate
+    return None
+
+
+def resolve_inputs(files: Dict[str, str], main_file: str) -> str:
+    """
+    Inline the files a document includes.
+
+    \\input, \\include and \\subfile are replaced with the included file,
+    recursively, and \\bibliography with the main file's .bbl if the e-print
+    has one. Missing files are left out.
+
+    Args:
+        files: Comment-free file contents by path
+        main_file: Path of the main file
+
+    Returns:
+        Text of the whole document
+    """
+    directory = posixpath.dirname(main_file)
+
+    def inline(name: str, stack: Tuple[str, ...]) -> str:
+        def replace(match: re.Match) -> str:
+            path = _find_file(files, directory, match.group(1) or match.group(2))
+            if path is None:
+                logger.debug(f"Included file {match.group(0)} not in the e-print")
+                return " "
+            if path in stack or len(stack) >= MAX_INPUT_DEPTH:
+                logger.debug(f"Not including {path} again in {name}")
+                return " "
+            return inline(path, stack + (path,))
+
+        text = files[name]
+        if "\\input" in text or "\\include" in text or "\\subfile" in text:
+            text = _INPUT.sub(replace, text)
+        return text
+
+    text = inline(main_file, (main_file,))
+
+    bbl_files = [name for name in files if name.lower().endswith(".bbl")]
+    main_bbl = posixpath.splitext(main_file)[0] + ".bbl"
+    bbl = main_bbl if main_bbl in files else (bbl_files[0] if bbl_files else None)
+    if bbl is not None and "\\bibliography" in text:
+        text = _BIBLIOGRAPHY.sub(lambda _: files[bbl], text, count=1)
+    return text
+
+
+def tokenize(text: str) -> List[Token]:
+    """
+    Split comment-free LaTeX into tokens.
+
+    Returns:
+        (kind, value) pairs: ("cmd", name) for control words and symbols,
+        with a trailing star kept, ("par", "") for paragraph breaks,
+        ("math", "$" or "$$"), (char, char) for the special characters
+        {}[]~&^_# and ("text", text) for everything else; a single line
+        break is a text token of one space
+    """
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "cmd":
+            tokens.append(("cmd", value[1:]))
+        elif kind == "par":
+            tokens.append(("par", ""))
+        elif kind == "special":
+            tokens.append((value, value))
+        elif kind == "text" and value == "\n":
+            tokens.append(("text", " "))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+def _plain(tokens: List[Token]) -> str:
+    """Join the text tokens of an argument, e.g. an environment name."""
+    return "".join(value for kind, value in tokens if kind == "text").strip()
+
+
+class _Reader:
+    """Cursor over a token list with TeX argument parsing."""
+
+    def __init__(self, tokens: List[Token]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def done(self) -> bool:
+        return self.pos >= len(self.tokens)
+
+    def next(self) -> Token:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def peek(self) -> Optional[Token]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def skip_spaces(self) -> None:
+        while not self.done():
+            kind, value = self.tokens[self.pos]
+            if kind != "text" or value.strip():
+                return
+            self.pos += 1
+
+    def _group(self, open_kind: str, close_kind: str) -> List[Token]:
+        """Read up to the token closing an opened group, at the same depth."""
+        start = self.pos
+        depth = 1
+        while not self.done():
+            kind, _ = self.next()
+            if kind == open_kind:
+                depth += 1
+            elif kind == close_kind:
+                depth -= 1
+                if depth == 0:
+                    return self.tokens[start : self.pos - 1]
+        return self.tokens[start:]
+
+    def argument(self) -> List[Token]:
+        """Read a mandatory argument: a brace group or a single character."""
+        self.skip_spaces()
+        if self.done():
+            return []
+        kind, value = self.next()
+        if kind == "{":
+            return self._group("{", "}")
+        if kind == "text":
+            value = value.lstrip()
+            if len(value) > 1:
+                # The argument is the first character, the rest stays text
+                self.pos -= 1
+                self.tokens[self.pos] = ("text", value[1:])
+            return [("text", value[:1])]
+        return [(kind, value)]
+
+    def optional(self, skip_spaces: bool = True) -> Optional[List[Token]]:
+        """Read an optional [argument] if one follows, else return None."""
+        start = self.pos
+        if skip_spaces:
+            self.skip_spaces()
+        if self.peek() != ("[", "["):
+            self.pos = start
+            return None
+        self.pos += 1
+        tokens = []
+        depth = 0
+        while not self.done():
+            token = self.next()
+            if token[0] == "{":
+                depth += 1
+            elif token[0] == "}":
+                depth -= 1
+            elif token[0] == "]" and depth <= 0:
+                return tokens
+            tokens.append(token)
+        return tokens
+
+    def skip_math(self, closing: Token) -> None:
+        """Skip inline or display math up to its closing token."""
+        while not self.done():
+            token = self.next()
+            # Math never spans paragraphs, so an unbalanced $ ends there
+            if token == closing or token[0] == "par":
+                return
+
+    def environment(self, name: str) -> List[Token]:
+        """Read the body of an environment up to its matching \\end."""
+        start = self.pos
+        depth = 1
+        while not self.done():
+            token = self.next()
+            if token[0] == "cmd" and token[1] in ("begin", "end"):
+                end = self.pos - 1
+                if _plain(self.argument()) == name:
+                    depth += 1 if token[1] == "begin" else -1
+                    if depth == 0:
+                        return self.tokens[start:end]
+        return self.tokens[start:]
+
+
+def _section_kind(title: str, appendix: bool) -> str:
+    """Tag a section by its title."""
+    title = title.strip().lower()
+    if title.startswith("acknowledg") or title == "funding":
+        return "acknowledgements"
+    if title in ("references", "bibliography"):
+        return "references"
+    if title == "abstract":
+        return "abstract"
+    return "appendix" if appendix else "body"
+
+
+def _accent(text: str, mark: str) -> str:
+    """Put a combining accent on the first character of text."""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFC", text[0] + mark + text[1:])
+
+
+class _Converter:
+    """Renders LaTeX tokens as text, collecting sections."""
+
+    def __init__(self) -> None:
+        self.title: Optional[str] = None
+        self.macros: Dict[str, List[Token]] = {}
+        self.sections: List[List[Any]] = [["", 0, "body", []]]
+        self.appendix = False
+        self._depth = 0
+
+    def _start_section(
+        self, title: str, level: int, kind: Optional[str] = None
+    ) -> None:
+        kind = kind or _section_kind(title, self.appendix)
+        self.sections.append([title, level, kind, []])
+
+    def inline(self, tokens: List[Token]) -> str:
+        """Render an argument as text, outside of the section structure."""
+        parts: List[str] = []
+        self.convert(_Reader(list(tokens)), parts.append, top=False)
+        return _SPACES.sub(" ", "".join(parts)).strip()
+
+    def preamble(self, reader: _Reader) -> bool:
+        """
+        Collect the macro definitions of the preamble.
+
+        Returns:
+            True with reader after \\begin{document}, False if there is none
+        """
+        while not reader.done():
+            kind, name = reader.next()
+            if kind != "cmd":
+                continue
+            base = name.rstrip("*")
+            if base in DEFINITION_COMMANDS:
+                self._define(reader, base)
+            elif base == "title":
+                reader.optional()
+                self.title = self.inline(reader.argument())
+            elif base == "begin" and _plain(reader.argument()) == "document":
+                return True
+        return False
+
+    def convert(
+        self, reader: _Reader, emit: Optional[Callable[[str], None]], top: bool
+    ) -> None:
+        """
+        Render tokens.
+
+        Args:
+            reader: Tokens to render
+            emit: Receives the text, or None to append to the current section
+            top: Whether sectioning commands start sections
+        """
+        while not reader.done():
+            out = emit or self.sections[-1][3].append
+            kind, value = reader.next()
+            if kind == "text":
+                out(value)
+            elif kind == "par":
+                out("\n\n")
+            elif kind in ("~", "&"):
+                out(" ")
+            elif kind in ("[", "]"):
+                out(kind)
+            elif kind == "math":
+                reader.skip_math(("math", value))
+            elif kind == "cmd":
+                self._command(reader, value, emit, top)
+
+    def _command(
+        self,
+        reader: _Reader,
+        name: str,
+        emit: Optional[Callable[[str], None]],
+        top: bool,
+    ) -> None:
+        out = emit or self.sections[-1][3].append
+        base = name.rstrip("*")
+
+        if name in _SYMBOLS:
+            out(_SYMBOLS[name])
+        elif name in _ACCENTS:
+            out(_accent(self.inline(reader.argument()), _ACCENTS[name]))
+        elif name in _LETTERS:
+            out(_LETTERS[name])
+        elif name == "(":
+            reader.skip_math(("cmd", ")"))
+        elif name == "[":
+            reader.skip_math(("cmd", "]"))
+        elif base == "begin":
+            self._begin(reader, emit, top)
+        elif base == "end":
+            env = _plain(reader.argument()).rstrip("*")
+            if top and env in ("abstract", "acknowledgments", "acknowledgements"):
+                self._start_section("", 1, "appendix" if self.appendix else "body")
+        elif base in SECTION_LEVELS:
+            reader.optional()
+            title = self.inline(reader.argument())
+            if top:
+                self._start_section(title, SECTION_LEVELS[base])
+            else:
+                out(title)
+        elif base in ("acknowledgments", "acknowledgements", "acks") and top:
+            self._start_section("Acknowledgements", 1, "acknowledgements")
+        elif base == "appendix":
+            self.appendix = True
+        elif base == "title":
+            reader.optional()
+            self.title = self.inline(reader.argument())
+        elif base in DEFINITION_COMMANDS:
+            self._define(reader, base)
+        elif base == "item":
+            label = reader.optional(skip_spaces=False)
+            out("\n")
+            if label:
+                out(self.inline(label) + " ")
+        elif base == "bibitem":
+            reader.optional()
+            reader.argument()
+            out("\n")
+        elif base in DROPPED_COMMANDS:
+            for _ in range(DROPPED_COMMANDS[base]):
+                while reader.optional() is not None:
+                    pass
+                reader.argument()
+        elif base in SPACED_COMMANDS:
+            reader.optional()
+            out(f" {self.inline(reader.argument())} ")
+        elif base in LAST_ARGUMENT_COMMANDS:
+            for _ in range(LAST_ARGUMENT_COMMANDS[base] - 1):
+                reader.optional()
+                reader.argument()
+            reader.optional()
+            out(self.inline(reader.argument()))
+        elif base in self.macros and self._depth < MAX_MACRO_DEPTH:
+            self._depth += 1
+            self.convert(_Reader(list(self.macros[base])), emit, top)
+            self._depth -= 1
+        else:
+            # Unknown command: drop it and keep the text of its arguments
+            reader.optional(skip_spaces=False)
+
+    def _begin(
+        self, reader: _Reader, emit: Optional[Callable[[str], None]], top: bool
+    ) -> None:
+        out = emit or self.sections[-1][3].append
+        env = _plain(reader.argument())
+        base = env.rstrip("*")
+
+        if base in MATH_ENVIRONMENTS or base in SKIPPED_ENVIRONMENTS:
+            reader.environment(env)
+            return
+        if base in FLOAT_ENVIRONMENTS:
+            self._captions(reader.environment(env), out)
+            return
+
+        reader.optional(skip_spaces=False)
+        for _ in range(ENVIRONMENT_ARGUMENTS.get(base, 0)):
+            reader.argument()
+        if not top:
+            return
+        if base == "abstract":
+            self._start_section("Abstract", 1, "abstract")
+        elif base == "thebibliography":
+            self._start_section("References", 1, "references")
+        elif base in ("acknowledgments", "acknowledgements"):
+            self._start_section("Acknowledgements", 1, "acknowledgements")
+
+    def _captions(self, tokens: List[Token], out: Callable[[str], None]) -> None:
+        """Render only the captions of a float."""
+        reader = _Reader(list(tokens))
+        while not reader.done():
+            if reader.next() == ("cmd", "caption"):
+                reader.optional()
+                out("\n\n" + self.inline(reader.argument()) + "\n\n")
+
+    def _define(self, reader: _Reader, base: str) -> None:
+        """Read a definition, remembering macros without parameters."""
+        if base in (
+            "newcommand",
+            "renewcommand",
+            "providecommand",
+            "DeclareRobustCommand",
+        ):
+            name = reader.argument()
+            params = _plain(reader.optional() or [])
+            reader.optional()
+            body = reader.argument()
+            if name and name[0][0] == "cmd" and params in ("", "0"):
+                self.macros[name[0][1]] = body
+        elif base in ("def", "gdef", "edef", "xdef"):
+            name = reader.argument()
+            # Parameter text such as #1#2 runs up to the body's brace
+            params = []
+            while not reader.done() and reader.peek()[0] != "{":
+                params.append(reader.next())
+            body = reader.argument()
+            if name and name[0][0] == "cmd" and not params:
+                self.macros[name[0][1]] = body
+        elif base == "let":
+            name = reader.argument()
+            reader.skip_spaces()
+            if reader.peek() == ("text", "="):
+                reader.next()
+            target = reader.argument()
+            if name and name[0][0] == "cmd" and target and target[0][0] == "cmd":
+                if target[0][1] in self.macros:
+                    self.macros[name[0][1]] = self.macros[target[0][1]]
+        elif base in ("newenvironment", "renewenvironment"):
+            reader.argument()
+            reader.optional()
+            reader.optional()
+            reader.argument()
+            reader.argument()
+        elif base == "newtheorem":
+            reader.argument()
+            reader.optional()
+            reader.argument()
+            reader.optional()
+        else:
+            reader.argument()
+            reader.argument()
+
+    def document(self, main_file: str) -> LatexDocument:
+        """Return the rendered sections."""
+        sections = []
+        for title, level, kind, parts in self.sections:
+            text = _SPACES.sub(" ", "".join(parts))
+            text = _LINE_EDGES.sub("\n", text)
+            text = _BLANK_LINES.sub("\n", text).strip()
+            sections.append(Section(title, level, kind, text))
+        return LatexDocument(self.title, main_file, sections)
+
+
+def parse_document(text: str, main_file: str = "main.tex") -> LatexDocument:
+    """
+    Render comment-free LaTeX as a document of sections.
+
+    Args:
+        text: LaTeX with inputs resolved, see resolve_inputs
+        main_file: Name of the main file, kept on the document
+
+    Returns:
+        LatexDocument; text outside \\begin{document} is only searched for
+        the title and macros
+    """
+    converter = _Converter()
+    reader = _Reader(tokenize(text))
+    if not converter.preamble(reader):
+        # A fragment without preamble: render all of it
+        reader.pos = 0
+    converter.convert(reader, None, top=True)
+    return converter.document(main_file)
+
+
+def extract_document(source: Union[str, Path, bytes]) -> LatexDocument:
+    """
+    Extract the sections of a paper from its LaTeX source.
+
+    Args:
+        source: e-print path, unpacked e-print directory or e-print bytes,
+            see read_source
+
+    Returns:
+        LatexDocument of the paper
+
+    Raises:
+        LatexSourceError: If the e-print has no usable LaTeX source
+    """
+    try:
+        files = read_source(source)
+    except (OSError, EOFError, zlib.error) as e:
+        raise LatexSourceError(f"Failed to read the e-print: {e}") from e
+    files = {name: strip_comments(text) for name, text in files.items()}
+    main_file = find_main_file(files)
+    document = parse_document(resolve_inputs(files, main_file), main_file)
+
+    chars = sum(len(section.text) for section in document.sections)
+    if chars < MIN_TEXT_CHARS:
+        raise LatexSourceError(
+            f"The LaTeX source renders to only {chars} characters of text"
+        )
+    return document
+
+
+def extract_text(source: Union[str, Path, bytes]) -> str:
+    """
+    Extract the cleaned text of a paper from its LaTeX source.
+
+    Raises:
+        LatexSourceError: If the e-print has no usable LaTeX source
+    """
+    return extract_document(source).text()
+
+
+def find_source(
+    source_dir: Union[str, Path], arxiv_id: str, version: Optional[str] = None
+) -> Optional[Path]:
+    """
+    Find a paper's e-print in a directory of e-prints.
+
+    E-prints are named like the files in the ArXiv bulk source archives,
+    2301.12345.gz or hep-th9901001.gz, optionally with a version before the
+    suffix, or are directories of that name.
+
+    Args:
+        source_dir: Directory of e-prints, also searched one level deep by
+            yymm (e.g. 2301/2301.12345.gz)
+        arxiv_id: ArXiv ID without version, e.g. "2301.12345", "hep-th/9901001"
+        version: Version of the paper, e.g. "v2"; the versioned e-print is
+            preferred over the unversioned one
+
+    Returns:
+        Path of the e-print, or None if there is none
+    """
+    source_dir = Path(source_dir)
+    stem = arxiv_id.replace("/", "")
+    stems = [f"{stem}{version}", stem] if version else [stem]
+    number = stem.split(".")[0] if "." in stem else stem[-7:]
+    for directory in (source_dir, source_dir / number[:4]):
+        for name in stems:
+            for suffix in SOURCE_SUFFIXES:
+                path = directory / f"{name}{suffix}"
+                if path.exists():
+                    return path
+    return None
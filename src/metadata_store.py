@@ -0,0 +1,369 @@
+"""
+Indexed on-disk store of paper metadata for the bulk processor.
+
+The metadata of the full ArXiv corpus is several GB of JSON, and loading it
+with json.load takes minutes and keeps all of it in memory just to look up
+one paper per PDF. The metadata file is instead converted once into a SQLite
+database keyed by ArXiv ID, and papers are looked up lazily, so startup takes
+milliseconds once the index exists and memory stays flat with corpus size.
+
+The conversion streams the source file: an object keyed by ArXiv ID (the
+format of data/metadata.json), a list of objects, or JSON lines as in the
+Kaggle ArXiv snapshot; list and line entries are keyed by their "arxiv_id" or
+"id". The database records the source file's size and modification time and
+is rebuilt when the source changes.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DB_SUFFIX = ".sqlite"
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+# Papers per INSERT batch while building the store
+BUILD_BATCH_SIZE = 10000
+# Characters read from the source at a time while streaming it
+READ_BLOCK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source (
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    papers INTEGER NOT NULL,
+    built_at REAL NOT NULL
+);
+"""
+
+_WHITESPACE = " \t\r\n"
+
+
+class MetadataFormatError(Exception):
+    """Raised when a metadata file cannot be parsed."""
+
+    pass
+
+
+class _JsonStream:
+    """Incrementally decodes JSON values from a text file."""
+
+    def __init__(self, f: TextIO) -> None:
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read the next block, dropping what was consumed; False at EOF."""
+        if self._eof:
+            return False
+        block = self._file.read(READ_BLOCK_SIZE)
+        self._buffer = self._buffer[self._pos :] + block
+        self._pos = 0
+        self._eof = not block
+        return bool(block)
+
+    def peek(self) -> Optional[str]:
+        """Return the next non-whitespace character, None at EOF."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                return None
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, one of chars."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise MetadataFormatError(f"Expected one of {chars!r}, found {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise MetadataFormatError(f"Invalid JSON: {e}") from e
+                continue
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _entry_id(entry: Any) -> Optional[str]:
+    """Return the ArXiv ID of a list or line entry."""
+    if isinstance(entry, dict):
+        arxiv_id = entry.get("arxiv_id") or entry.get("id")
+        if arxiv_id:
+            return str(arxiv_id)
+    return None
+
+
+def iter_metadata(path: Union[str, Path]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the papers of a metadata file.
+
+    Args:
+        path: JSON object keyed by ArXiv ID, JSON list or JSON lines file
+
+    Yields:
+        (ArXiv ID, metadata) of every paper; list and line entries without an
+        ID are skipped
+
+    Raises:
+        MetadataFormatError: If the file is not valid JSON of these formats
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() in JSONL_SUFFIXES:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    arxiv_id = _entry_id(entry)
+                    if arxiv_id is not None:
+                        yield arxiv_id, entry
+            return
+
+        stream = _JsonStream(f)
+        opening = stream.expect("{[")
+        closing = "}" if opening == "{" else "]"
+        if stream.peek() == closing:
+            return
+        while True:
+            if opening == "{":
+                arxiv_id = stream.value()
+                stream.expect(":")
+                yield str(arxiv_id), stream.value()
+            else:
+                entry = stream.value()
+                arxiv_id = _entry_id(entry)
+                if arxiv_id is not None:
+                    yield arxiv_id, entry
+            if stream.expect("," + closing) == closing:
+                return
+
+
+def _source_stat(path: Union[str, Path]) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_store(
+    source_path: Union[str, Path], db_path: Union[str, Path]
+) -> "MetadataStore":
+    """
+    Convert a metadata file into a store.
+
+    The database is built in a temporary file that replaces db_path once
+    complete, so an interrupted build never leaves a partial store. Later
+    entries of a duplicate ArXiv ID replace earlier ones, like json.load.
+
+    Args:
+        source_path: Metadata file, see iter_metadata
+        db_path: Path of the SQLite database to create
+
+    Returns:
+        The opened store
+
+    Raises:
+        MetadataFormatError: If the metadata file cannot be parsed
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    size, mtime_ns = _source_stat(source_path)
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(_SCHEMA)
+        batch = []
+        for arxiv_id, metadata in iter_metadata(source_path):
+            batch.append((arxiv_id, json.dumps(metadata, ensure_ascii=False)))
+            if len(batch) >= BUILD_BATCH_SIZE:
+                conn.executemany("INSERT OR REPLACE INTO papers VALUES (?, ?)", batch)
+                batch = []
+        conn.executemany("INSERT OR REPLACE INTO papers VALUES (?, ?)", batch)
+        papers = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        conn.execute(
+            "INSERT INTO source VALUES (?, ?, ?, ?, ?)",
+            (str(Path(source_path).resolve()), size, mtime_ns, papers, time.time()),
+        )
+        conn.commit()
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+
+    logger.info(
+        f"Indexed metadata of {papers} papers from {source_path} in "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+    return MetadataStore(db_path)
+
+
+def default_db_path(source_path: Union[str, Path]) -> Path:
+    """Return the store path next to a metadata file, e.g. metadata.json.sqlite."""
+    source_path = Path(source_path)
+    return source_path.with_name(source_path.name + DB_SUFFIX)
+
+
+def open_store(
+    source_path: Union[str, Path],
+    db_path: Optional[Union[str, Path]] = None,
+    rebuild: bool = False,
+) -> "MetadataStore":
+    """
+    Open the store of a metadata file, building it if missing or stale.
+
+    Args:
+        source_path: Metadata file, or an existing store (.sqlite) to open as is
+        db_path: Path of the store, default_db_path(source_path) if None
+        rebuild: Rebuild the store even if it is up to date
+
+    Returns:
+        The opened store
+
+    Raises:
+        MetadataFormatError: If the metadata file cannot be parsed
+    """
+    if Path(source_path).suffix == DB_SUFFIX:
+        return MetadataStore(source_path)
+
+    db_path = Path(db_path) if db_path else default_db_path(source_path)
+    if not rebuild and db_path.exists():
+        store = MetadataStore(db_path)
+        if store.source_stat() == _source_stat(source_path):
+            return store
+        logger.info(f"{source_path} changed since it was indexed, rebuilding")
+        store.close()
+    return build_store(source_path, db_path)
+
+
+class MetadataStore:
+    """
+    Read-only, dictionary-like view of an indexed metadata store.
+
+    Supports len, "in" and get like the dictionary json.load returned, so
+    lookups work the same whether metadata is loaded or indexed.
+    """
+
+    def __init__(self, db_path: Union[str, Path]) -> None:
+        """
+        Open a store.
+
+        Args:
+            db_path: Path of a database created by build_store
+
+        Raises:
+            FileNotFoundError: If the database does not exist
+        """
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Metadata store not found: {self.db_path}")
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def __enter__(self) -> "MetadataStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def _source_row(self) -> Optional[Tuple[Any, ...]]:
+        return self._conn.execute(
+            "SELECT size, mtime_ns, papers FROM source"
+        ).fetchone()
+
+    def source_stat(self) -> Optional[Tuple[int, int]]:
+        """Return the size and modification time of the indexed source file."""
+        row = self._source_row()
+        return (row[0], row[1]) if row else None
+
+    def __len__(self) -> int:
+        row = self._source_row()
+        return row[2] if row else 0
+
+    def __contains__(self, arxiv_id: object) -> bool:
+        if not isinstance(arxiv_id, str):
+            return False
+        row = self._conn.execute(
+            "SELECT 1 FROM papers WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return row is not None
+
+    def get(
+        self, arxiv_id: str, default: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up the metadata of a paper.
+
+        Args:
+            arxiv_id: ArXiv ID without version
+            default: Returned if the paper is not in the store
+
+        Returns:
+            Metadata dictionary of the paper, or default
+        """
+        row = self._conn.execute(
+            "SELECT metadata FROM papers WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __getitem__(self, arxiv_id: str) -> Dict[str, Any]:
+        metadata = self.get(arxiv_id)
+        if metadata is None:
+            raise KeyError(arxiv_id)
+        return metadata
+
+    def get_many(self, arxiv_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up the metadata of many papers at once.
+
+        Args:
+            arxiv_ids: ArXiv IDs without version
+
+        Returns:
+            Metadata by ArXiv ID of the papers in the store
+        """
+        ids = list(arxiv_ids)
+        found = {}
+        # Stay below SQLite's limit of host parameters per statement
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT arxiv_id, metadata FROM papers "
+                f"WHERE arxiv_id IN ({placeholders})",
+                chunk,
+            )
+            found.update((arxiv_id, json.loads(text)) for arxiv_id, text in rows)
+        return found
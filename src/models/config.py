@@ -79,6 +79,176 @@ class AgentConfig(BaseModel):
 
     openai_model: str = Field(default=None, description="AI model name")
 
+
+class SearchConfig(BaseModel):
+    """Search result paging configuration."""
+
+    page_size: int = Field(default=10, description="Results returned per page")
+    max_candidates: int = Field(
+        default=50, description="Ranked results fetched from the KB per query"
+    )
+    cursor_ttl_seconds: int = Field(
+        default=300, description="Lifetime of cached result lists behind cursors"
+    )
+    cache_max_entries: int = Field(
+        default=256, description="Maximum number of cached result lists"
+    )
+    suggest_limit: int = Field(
+        default=8, description="Maximum number of autocomplete suggestions"
+    )
+    suggest_refresh_seconds: int = Field(
+        default=60, description="Interval between autocomplete index refreshes"
+    )
+    facet_cache_ttl_seconds: int = Field(
+        default=300, description="Seconds facet counts are served from memory"
+    )
+
+
+class ExtractionConfig(BaseModel):
+    """PDF text extraction configuration."""
+
+    backend: str = Field(
+        default="pypdf2",
+        description="Extraction backend: pypdf2, pypdf, pdfminer or pdfium",
+    )
+    workers: int = Field(
+        default=0, description="Extraction processes, 0 for one per CPU, 1 for serial"
+    )
+    min_parallel_pages: int = Field(
+        default=16, description="PDFs with fewer pages are extracted serially"
+    )
+    page_timeout_seconds: int = Field(
+        default=30, description="Time budget per page before it is skipped"
+    )
+    file_timeout_seconds: int = Field(
+        default=300, description="Time budget per PDF before it fails, 0 disables it"
+    )
+    max_memory_mb: int = Field(
+        default=2048,
+        description="Memory an extraction process may allocate, 0 for no limit",
+    )
+
+
+class IngestConfig(BaseModel):
+    """Batch ingestion pipeline configuration used by the cron job."""
+
+    download_workers: int = Field(
+        default=4, description="Threads downloading PDFs concurrently"
+    )
+    extract_workers: int = Field(
+        default=0, description="Extraction processes, 0 for one per CPU"
+    )
+    queue_size: int = Field(
+        default=16, description="Papers buffered between two pipeline stages"
+    )
+    insert_batch_size: int = Field(
+        default=50, description="Articles written to PostgreSQL per INSERT"
+    )
+
+
+class DownloadConfig(BaseModel):
+    """PDF download configuration."""
+
+    base_url: str = Field(
+        default="https://arxiv.org", description="Server PDFs are downloaded from"
+    )
+    timeout_seconds: int = Field(default=30, description="Timeout of each request")
+    max_size_mb: int = Field(
+        default=100, description="Downloads larger than this are aborted"
+    )
+    spool_max_mb: int = Field(
+        default=8, description="Downloads larger than this are buffered on disk"
+    )
+    max_resume_attempts: int = Field(
+        default=3, description="Range requests sent after interrupted transfers"
+    )
+    min_interval_seconds: float = Field(
+        default=1.0, description="Minimum time between requests of one process"
+    )
+    pool_size: int = Field(
+        default=10, description="Keep-alive connections kept open per host"
+    )
+
+
+class CacheConfig(BaseModel):
+    """Local PDF and extracted text cache configuration."""
+
+    enabled: bool = Field(default=True, description="Cache PDFs and cleaned text")
+    directory: str = Field(
+        default="./paper_cache", description="Directory holding the cache"
+    )
+    max_size_mb: int = Field(
+        default=2048, description="Cache size above which old entries are evicted"
+    )
+    compression_level: int = Field(
+        default=3, description="zstd compression level for cached text"
+    )
+
+
+class SectionsConfig(BaseModel):
+    """Section-aware chunking configuration."""
+
+    enabled: bool = Field(default=True, description="Leave out excluded sections")
+    exclude: List[str] = Field(
+        default=["references", "acknowledgements"],
+        description="Section kinds not chunked for embedding",
+    )
+    min_heading_position: float = Field(
+        default=0.3,
+        description="Leading fraction of the text where excluded headings are ignored",
+    )
+    max_excluded_fraction: float = Field(
+        default=0.5, description="Largest fraction of the text that may be excluded"
+    )
+
+    @validator("exclude", each_item=True)
+    def validate_exclude(cls, v):
+        """Validate excluded sections are known section kinds."""
+        kinds = ("references", "acknowledgements", "appendix")
+        if v not in kinds:
+            raise ValueError(f"Section kind must be one of {', '.join(kinds)}")
+        return v
+
+
+class DedupConfig(BaseModel):
+    """Near-duplicate chunk filtering configuration."""
+
+    enabled: bool = Field(default=True, description="Drop near-duplicate chunks")
+    threshold: float = Field(
+        default=0.85, description="Estimated Jaccard similarity of duplicates"
+    )
+    num_perm: int = Field(default=128, description="MinHash functions per signature")
+    shingle_size: int = Field(default=5, description="Words per shingle")
+    across_papers: bool = Field(
+        default=False, description="Also drop duplicates of other papers' chunks"
+    )
+    max_corpus_entries: int = Field(
+        default=200000, description="Chunks remembered across papers"
+    )
+
+    @validator("threshold")
+    def validate_threshold(cls, v):
+        """Validate threshold is a similarity."""
+        if not (0 < v <= 1):
+            raise ValueError("Threshold must be between 0 and 1")
+        return v
+
+
+class BulkIngestConfig(BaseModel):
+    """Streaming bulk ingestion configuration."""
+
+    postgres_batch_size: int = Field(default=500, description="Articles per COPY")
+    kb_batch_size: int = Field(
+        default=25, description="Chunks per knowledge base insert"
+    )
+    kb_workers: int = Field(
+        default=4, description="Concurrent knowledge base inserts"
+    )
+    queue_size: int = Field(
+        default=64, description="Papers buffered before the producer is blocked"
+    )
+
+
 class PaperSenseConfig(BaseSettings):
     """Main configuration model for PaperSense application."""
 
@@ -86,4 +256,12 @@ class PaperSenseConfig(BaseSettings):
     postgres: PostgresConfig = Field(default_factory=PostgresConfig)
     knowledge_base: KnowledgeBaseConfig = Field(default_factory=KnowledgeBaseConfig)
     agent: AgentConfig = Field(default_factory=AgentConfig)
+    search: SearchConfig = Field(default_factory=SearchConfig)
+    extraction: ExtractionConfig = Field(default_factory=ExtractionConfig)
+    download: DownloadConfig = Field(default_factory=DownloadConfig)
+    ingest: IngestConfig = Field(default_factory=IngestConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    sections: SectionsConfig = Field(default_factory=SectionsConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
+    bulk_ingest: BulkIngestConfig = Field(default_factory=BulkIngestConfig)
     app: AppConfig = Field(default_factory=AppConfig)
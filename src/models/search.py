@@ -76,6 +76,9 @@ class SearchResponse(BaseModel):
     results: List[PaperResult] = Field(
         default_factory=list, description="List of paper search results"
     )
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor for the next page, absent on the last page"
+    )
 
     class Config:
         """Pydantic configuration."""
@@ -92,11 +95,83 @@ class SearchResponse(BaseModel):
                         "published_year": "2017",
                         "relevance": 0.95,
                     }
-                ]
+                ],
+                "next_cursor": "eyJmIjoge30sICJvIjogMTAsICJxIjogImF0dGVudGlvbiJ9",
             }
         }
 
 
+class SearchStreamEvent(BaseModel):
+    """Event emitted by the streaming search endpoint.
+
+    Each event carries the results of one search phase. Later phases supersede
+    the results of earlier ones.
+    """
+
+    phase: str = Field(
+        ...,
+        description="Phase that produced the results: exact, cached, lexical, semantic or reranked",
+        example="semantic",
+    )
+    results: List[PaperResult] = Field(
+        default_factory=list, description="List of paper search results"
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, only set on the final phase"
+    )
+
+
+class Suggestion(BaseModel):
+    """Model for a single autocomplete suggestion."""
+
+    text: str = Field(
+        ..., description="Suggested text", example="Attention Is All You Need"
+    )
+    kind: str = Field(
+        ..., description="Suggestion type: title, author or category", example="title"
+    )
+    article_id: Optional[str] = Field(
+        None, description="ArXiv paper ID for title suggestions", example="1706.03762"
+    )
+
+
+class SuggestResponse(BaseModel):
+    """Response model for the autocomplete endpoint."""
+
+    suggestions: List[Suggestion] = Field(
+        default_factory=list, description="Suggestions matching the typed prefix"
+    )
+
+
+class FacetValue(BaseModel):
+    """Model for the paper count of a single facet value."""
+
+    value: str = Field(..., description="Facet value", example="cs")
+    count: int = Field(..., ge=0, description="Number of papers", example=1250)
+
+
+class FacetCount(BaseModel):
+    """Model for the paper count of a category and year combination."""
+
+    category: str = Field(..., description="Primary category prefix", example="cs")
+    year: str = Field(..., description="Publication year", example="2024")
+    count: int = Field(..., ge=0, description="Number of papers", example=310)
+
+
+class FacetsResponse(BaseModel):
+    """Response model for the facets endpoint."""
+
+    categories: List[FacetValue] = Field(
+        default_factory=list, description="Paper counts per primary category prefix"
+    )
+    years: List[FacetValue] = Field(
+        default_factory=list, description="Paper counts per publication year"
+    )
+    counts: List[FacetCount] = Field(
+        default_factory=list, description="Paper counts per category and year"
+    )
+
+
 class SearchRequest(BaseModel):
     """Request model for search API endpoint."""
 
@@ -0,0 +1,148 @@
+"""Cursor based pagination for knowledge base search results.
+
+The first page of a search fetches a larger ranked candidate list from the
+knowledge base and keeps it in a short-lived in-memory cache. Subsequent pages
+are addressed by opaque cursors that carry the query, filters and offset, so
+they are served from the cache without another MindsDB call. If the cached list
+has expired the cursor still holds everything needed to re-run the search.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    pass
+
+
+def build_cache_key(query: str, filters: Dict[str, str]) -> str:
+    """
+    Build a stable cache key for a query and its filters.
+
+    Args:
+        query: Cleaned search query
+        filters: Validated search filters
+
+    Returns:
+        Hex digest identifying the ranked result list
+    """
+    payload = json.dumps({"q": query, "f": filters}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(query: str, filters: Dict[str, str], offset: int) -> str:
+    """
+    Encode the search position into an opaque, URL-safe cursor.
+
+    Args:
+        query: Cleaned search query
+        filters: Validated search filters
+        offset: Index of the first result of the next page
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"q": query, "f": filters, "o": offset}, sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string received from the client
+
+    Returns:
+        Dictionary with "query", "filters" and "offset" keys
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        query, filters, offset = payload["q"], payload["f"], payload["o"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
+
+    if not isinstance(query, str) or not query.strip():
+        raise InvalidCursorError("Cursor does not contain a query")
+    if not isinstance(filters, dict):
+        raise InvalidCursorError("Cursor filters must be an object")
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursorError("Cursor offset must be a non-negative integer")
+
+    return {"query": query, "filters": filters, "offset": offset}
+
+
+class SearchResultCache:
+    """Thread-safe TTL + LRU cache of ranked search result lists."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds a result list stays valid after it is stored
+            max_entries: Maximum number of result lists kept in memory
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the cached result list for a key, if present and fresh.
+
+        Args:
+            key: Cache key from build_cache_key
+
+        Returns:
+            Cached result list or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                logger.debug(f"Search cache entry expired: {key}")
+                return None
+
+            self._entries.move_to_end(key)
+            return results
+
+    def put(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Store a ranked result list.
+
+        Args:
+            key: Cache key from build_cache_key
+            results: Ranked search results
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted search cache entry: {evicted_key}")
+
+    def clear(self) -> None:
+        """Drop all cached result lists."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,269 @@
+"""
+Local on-disk cache of paper PDFs and cleaned text.
+
+Entries are addressed by a hash of the ArXiv ID and version, plus the
+extractor version for text, so a new paper revision or a change to the
+extraction/cleaning code never serves stale text. PDFs are stored as is and
+text is zstd compressed. Writes are atomic (temp file + rename), so several
+processes can share one cache directory. When the cache grows beyond its size
+limit the least recently used entries, by modification time, are evicted;
+reads refresh the modification time. Cache I/O errors are logged and treated
+as misses, so a broken cache never fails an ingestion.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+PDF_SUFFIX = ".pdf"
+TEXT_SUFFIX = ".txt.zst"
+
+# Eviction frees space down to this fraction of the limit, so a full cache
+# does not rescan the directory on every write
+EVICTION_TARGET_RATIO = 0.9
+
+_VERSION_PATTERN = re.compile(r"^(.+?)(v\d+)?$")
+
+_shared_cache: Optional["PaperCache"] = None
+_shared_cache_lock = threading.Lock()
+
+
+def split_version(arxiv_id: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an ArXiv ID into its base ID and version suffix.
+
+    Args:
+        arxiv_id: ID like "2301.12345", "2301.12345v2" or "hep-th/9901001v1"
+
+    Returns:
+        Tuple of the base ID and the version ("v2") or None
+    """
+    match = _VERSION_PATTERN.match(arxiv_id.strip())
+    return match.group(1), match.group(2)
+
+
+class PaperCache:
+    """Size-bounded LRU cache of PDFs and cleaned text in a local directory."""
+
+    def __init__(
+        self, cache_dir: str, max_size_mb: int, compression_level: int = 3
+    ) -> None:
+        """
+        Initialize the cache, creating the directory if needed.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_size_mb: Total size above which entries are evicted
+            compression_level: zstd level used for text entries
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size_bytes = sum(size for _, _, size in self._scan())
+        logger.info(
+            f"Paper cache at {self.cache_dir}: "
+            f"{self._size_bytes / (1024 * 1024):.1f} MB of {max_size_mb} MB used"
+        )
+
+    def _path(self, key: str, suffix: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}{suffix}"
+
+    @staticmethod
+    def _pdf_key(arxiv_id: str, version: str) -> str:
+        return f"pdf:{split_version(arxiv_id)[0]}{version}"
+
+    @staticmethod
+    def _text_key(arxiv_id: str, version: str, extractor: str) -> str:
+        return f"text:{split_version(arxiv_id)[0]}{version}:{extractor}"
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read paper cache entry {path}: {e}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, path: Path, data: Union[bytes, BinaryIO]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError as e:
+            logger.warning(f"Failed to write paper cache entry {path}: {e}")
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                if isinstance(data, bytes):
+                    temp_file.write(data)
+                else:
+                    data.seek(0)
+                    shutil.copyfileobj(data, temp_file)
+                size = temp_file.tell()
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write paper cache entry {path}: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._size_bytes += size
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _scan(self) -> List[Tuple[float, Path, int]]:
+        """Return (mtime, path, size) of every cache entry."""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, Path(entry.path), stat.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until below the target size."""
+        entries = sorted(self._scan())
+        size = sum(entry_size for _, _, entry_size in entries)
+        target = self.max_size_bytes * EVICTION_TARGET_RATIO
+        evicted = 0
+
+        for _, path, entry_size in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            size -= entry_size
+            evicted += 1
+
+        self._size_bytes = size
+        logger.info(
+            f"Evicted {evicted} paper cache entries, "
+            f"{size / (1024 * 1024):.1f} MB remaining"
+        )
+
+    def get_pdf(self, arxiv_id: str, version: str) -> Optional[bytes]:
+        """
+        Return a cached PDF.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Paper version, e.g. "v2"
+
+        Returns:
+            PDF bytes or None on a cache miss
+        """
+        return self._read(self._path(self._pdf_key(arxiv_id, version), PDF_SUFFIX))
+
+    def put_pdf(
+        self, arxiv_id: str, version: str, data: Union[bytes, BinaryIO]
+    ) -> None:
+        """
+        Store a downloaded PDF.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Paper version, e.g. "v2"
+            data: PDF bytes or a seekable binary stream, read from the start
+        """
+        self._write(self._path(self._pdf_key(arxiv_id, version), PDF_SUFFIX), data)
+
+    def get_text(self, arxiv_id: str, version: str, extractor: str) -> Optional[str]:
+        """
+        Return cached cleaned text.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Paper version, e.g. "v2"
+            extractor: Version string of the extraction and cleaning code
+
+        Returns:
+            Cleaned text or None on a cache miss
+        """
+        path = self._path(self._text_key(arxiv_id, version, extractor), TEXT_SUFFIX)
+        data = self._read(path)
+        if data is None:
+            return None
+
+        try:
+            return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+        except (zstandard.ZstdError, UnicodeDecodeError) as e:
+            logger.warning(f"Dropping corrupt paper cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put_text(self, arxiv_id: str, version: str, extractor: str, text: str) -> None:
+        """
+        Store cleaned text.
+
+        Args:
+            arxiv_id: ArXiv ID, with or without version suffix
+            version: Paper version, e.g. "v2"
+            extractor: Version string of the extraction and cleaning code
+            text: Cleaned text
+        """
+        data = zstandard.ZstdCompressor(level=self.compression_level).compress(
+            text.encode("utf-8")
+        )
+        self._write(
+            self._path(self._text_key(arxiv_id, version, extractor), TEXT_SUFFIX), data
+        )
+
+
+def shared_cache() -> Optional[PaperCache]:
+    """
+    Return the process-wide cache configured in the cache config section.
+
+    Returns:
+        PaperCache instance, or None if caching is disabled
+    """
+    global _shared_cache
+
+    from . import config_loader as config
+
+    if not config.cache.enabled:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = PaperCache(
+                    config.cache.directory,
+                    config.cache.max_size_mb,
+                    config.cache.compression_level,
+                )
+            except OSError as e:
+                logger.error(f"Paper cache disabled, cannot use directory: {e}")
+                return None
+        return _shared_cache
@@ -0,0 +1,183 @@
+"""
+PDF text extraction backends.
+
+Every backend opens a document from a seekable binary stream (a BytesIO or a
+memory-mapped file) and extracts text one page at a time, which is what the
+page-parallel extraction in pdf_extraction needs. PyPDF2 is always available;
+the other backends are used only when their package is installed.
+"""
+
+import importlib.util
+from abc import ABC, abstractmethod
+from io import StringIO
+from typing import Any, BinaryIO, Dict, List, Type
+
+DEFAULT_BACKEND = "pypdf2"
+
+
+class PdfBackendError(Exception):
+    """Raised when a backend is unknown or its package is not installed."""
+
+    pass
+
+
+class PdfBackend(ABC):
+    """Interface implemented by every extraction backend."""
+
+    name = ""
+    # Package that must be importable for the backend to be available
+    module = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if the backend's package is installed."""
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def open(self, stream: BinaryIO) -> Any:
+        """
+        Open a document.
+
+        Args:
+            stream: Seekable binary stream positioned anywhere
+
+        Returns:
+            Backend specific document handle
+        """
+
+    @abstractmethod
+    def page_count(self, document: Any) -> int:
+        """Return the number of pages of an opened document."""
+
+    @abstractmethod
+    def extract_page(self, document: Any, page_number: int) -> str:
+        """Return the text of a zero-based page of an opened document."""
+
+
+class PyPDF2Backend(PdfBackend):
+    """Pure Python PyPDF2, the historical default."""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, stream: BinaryIO) -> Any:
+        import PyPDF2
+
+        return PyPDF2.PdfReader(stream)
+
+    def page_count(self, document: Any) -> int:
+        return len(document.pages)
+
+    def extract_page(self, document: Any, page_number: int) -> str:
+        return document.pages[page_number].extract_text() or ""
+
+
+class PypdfBackend(PyPDF2Backend):
+    """pypdf, the maintained successor of PyPDF2 with a faster text layer."""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def open(self, stream: BinaryIO) -> Any:
+        import pypdf
+
+        return pypdf.PdfReader(stream)
+
+
+class PdfMinerBackend(PdfBackend):
+    """pdfminer.six, slower but with layout analysis for multi-column pages."""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, stream: BinaryIO) -> Any:
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        stream.seek(0)
+        pages = list(PDFPage.create_pages(PDFDocument(PDFParser(stream))))
+        return pages, PDFResourceManager(caching=True)
+
+    def page_count(self, document: Any) -> int:
+        return len(document[0])
+
+    def extract_page(self, document: Any, page_number: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        pages, resource_manager = document
+        output = StringIO()
+        device = TextConverter(resource_manager, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(resource_manager, device).process_page(
+                pages[page_number]
+            )
+        finally:
+            device.close()
+        # The converter terminates every page with a form feed
+        return output.getvalue().rstrip("\x0c")
+
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2, bindings to the PDFium C++ library used by Chrome."""
+
+    name = "pdfium"
+    module = "pypdfium2"
+
+    def open(self, stream: BinaryIO) -> Any:
+        import pypdfium2
+
+        stream.seek(0)
+        return pypdfium2.PdfDocument(stream.read())
+
+    def page_count(self, document: Any) -> int:
+        return len(document)
+
+    def extract_page(self, document: Any, page_number: int) -> str:
+        page = document[page_number]
+        text_page = page.get_textpage()
+        try:
+            # PDFium separates lines with CRLF, the other backends with LF
+            return text_page.get_text_range().replace("\r\n", "\n")
+        finally:
+            text_page.close()
+            page.close()
+
+
+BACKENDS: Dict[str, Type[PdfBackend]] = {
+    backend.name: backend
+    for backend in (PyPDF2Backend, PypdfBackend, PdfMinerBackend, PdfiumBackend)
+}
+
+
+def available_backends() -> List[str]:
+    """Return the names of the backends whose package is installed."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_backend(name: str) -> PdfBackend:
+    """
+    Return a backend instance by name.
+
+    Args:
+        name: One of the BACKENDS keys
+
+    Returns:
+        Backend instance
+
+    Raises:
+        PdfBackendError: If the backend is unknown or not installed
+    """
+    backend = BACKENDS.get(name.lower())
+    if backend is None:
+        raise PdfBackendError(
+            f"Unknown PDF backend '{name}'. Available: {', '.join(BACKENDS)}"
+        )
+    if not backend.is_available():
+        raise PdfBackendError(
+            f"PDF backend '{name}' requires the '{backend.module}' package"
+        )
+    return backend()
@@ -0,0 +1,550 @@
+"""
+Page-parallel PDF text extraction.
+
+Large PDFs are split into contiguous page ranges that are extracted by a
+shared process pool. The PDF bytes are written once to a temporary file that
+every worker memory-maps, so the document is not pickled to each process.
+Each page is extracted under its own timeout, so a single pathological page
+is skipped instead of stalling the whole paper. Small PDFs are extracted
+serially in the calling process, where a pool round trip would cost more
+than it saves.
+
+A few malformed PDFs make the backends spin for minutes or allocate
+gigabytes in a single page or before the first one. With a timeout or memory
+limit per PDF, the PDF is extracted in the pool even if it is small and never
+parsed in the calling process: pool workers cap their address space with
+RLIMIT_AS and stop their tasks of a PDF at its deadline with time_limit, so
+the shared pool keeps serving other PDFs. Processes extracting in their own
+main thread, such as bulk processing workers, can limit themselves with
+limit_memory and time_limit in the same way.
+
+Text is extracted through one of the backends in pdf_backends. With the
+default PyPDF2 backend the result is identical to the previous serial
+extraction: the text of every page followed by a newline, joined once.
+"""
+
+import logging
+import mmap
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, memory limits are not enforced there
+    resource = None
+
+try:
+    from . import pdf_backends
+except ImportError:
+    # Imported by the bulk processor run as a script from the src folder
+    import pdf_backends
+
+logger = logging.getLogger(__name__)
+
+PdfSource = Union[str, Path, bytes, BinaryIO]
+
+# Page ranges handed to each worker per pool task
+RANGES_PER_WORKER = 2
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_memory_mb = 0
+_executor_lock = threading.Lock()
+
+# Active time limits of this process, outermost first:
+# (time.monotonic() deadline, factory of the exception raised when it passes)
+_deadlines: List[Tuple[float, Callable[[], BaseException]]] = []
+_previous_alarm_handler: Any = None
+# Interval at which an expired limit is raised again if it was swallowed
+_REPEAT_ALARM_SECONDS = 1.0
+# Time past a PDF's deadline the caller waits for workers to stop its tasks
+_DEADLINE_GRACE_SECONDS = 5.0
+
+# Per worker process: (path, backend name, file, mmap, backend, document) of
+# the last PDF a page range was extracted from
+_worker_pdf: Optional[Tuple[str, str, Any, Any, Any, Any]] = None
+
+
+class PdfExtractionError(Exception):
+    """Custom exception for PDF text extraction errors."""
+
+    pass
+
+
+class PageTimeoutError(Exception):
+    """Raised inside a worker when a page exceeds its time budget."""
+
+    pass
+
+
+class ExtractionLimitError(PdfExtractionError):
+    """Raised when a PDF exceeds its time or memory limit."""
+
+    pass
+
+
+class ExtractionTimeoutError(ExtractionLimitError):
+    """Raised when a PDF exceeds its time budget."""
+
+    pass
+
+
+class ExtractionMemoryError(ExtractionLimitError):
+    """Raised when a PDF exceeds the memory limit of its worker."""
+
+    pass
+
+
+def _read_pdf_bytes(pdf_file: PdfSource) -> bytes:
+    """Return the raw bytes of a PDF given as a path, bytes or binary stream."""
+    if isinstance(pdf_file, (str, Path)):
+        with open(pdf_file, "rb") as file:
+            return file.read()
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        return bytes(pdf_file)
+    if isinstance(pdf_file, BytesIO):
+        return pdf_file.getvalue()
+
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def can_time_limit() -> bool:
+    """Whether time_limit is enforced here: SIGALRM on the main thread."""
+    return (
+        hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+def _arm_alarm() -> None:
+    """Schedule SIGALRM for the earliest active deadline."""
+    if not _deadlines:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        return
+    remaining = min(deadline for deadline, _ in _deadlines) - time.monotonic()
+    signal.setitimer(signal.ITIMER_REAL, max(remaining, 0.001))
+
+
+def _on_alarm(signum, frame) -> None:
+    now = time.monotonic()
+    # The outermost expired limit wins, so a file timeout is not swallowed
+    # by the handler of a page timeout nested in it
+    for deadline, make_error in _deadlines:
+        if deadline <= now:
+            # Raise again shortly in case the backend catches the exception
+            signal.setitimer(signal.ITIMER_REAL, _REPEAT_ALARM_SECONDS)
+            raise make_error()
+    _arm_alarm()
+
+
+@contextmanager
+def time_limit(
+    seconds: float, make_error: Callable[[], BaseException]
+) -> Iterator[None]:
+    """
+    Raise make_error() in the block once it runs longer than seconds.
+
+    Limits nest, e.g. page timeouts inside the timeout of a whole PDF. The
+    limit relies on SIGALRM and is only enforced on the main thread of a
+    process, see can_time_limit; elsewhere, or with seconds <= 0, the block
+    runs without a limit. Code stuck inside a C extension is interrupted once
+    it returns to Python.
+
+    Args:
+        seconds: Wall-clock budget of the block
+        make_error: Returns the exception raised when the budget is exceeded
+    """
+    global _previous_alarm_handler
+
+    if seconds <= 0 or not can_time_limit():
+        yield
+        return
+
+    if not _deadlines:
+        _previous_alarm_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    limit = (time.monotonic() + seconds, make_error)
+    _deadlines.append(limit)
+    _arm_alarm()
+    try:
+        yield
+    finally:
+        # Remove by identity, equal limits may be nested
+        for i in range(len(_deadlines) - 1, -1, -1):
+            if _deadlines[i] is limit:
+                del _deadlines[i]
+                break
+        _arm_alarm()
+        if not _deadlines:
+            signal.signal(signal.SIGALRM, _previous_alarm_handler)
+
+
+def _address_space_bytes() -> int:
+    """Return the current address space size of this process, 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def limit_memory(max_memory_mb: int) -> None:
+    """
+    Cap the memory this process may allocate from now on.
+
+    Sets RLIMIT_AS to the current address space plus max_memory_mb, so a
+    process forked from a large parent is not starved at once. Allocations
+    past the limit raise MemoryError. Does nothing with max_memory_mb <= 0 or
+    where the resource module is unavailable.
+
+    Args:
+        max_memory_mb: Memory in MB the process may allocate beyond its
+            current usage
+    """
+    if max_memory_mb <= 0 or resource is None:
+        return
+    limit = _address_space_bytes() + max_memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not limit extraction memory: {e}")
+
+
+def _extract_page(
+    backend: pdf_backends.PdfBackend,
+    document: Any,
+    page_number: int,
+    page_timeout_seconds: int,
+) -> str:
+    """
+    Extract one page, giving up after page_timeout_seconds.
+
+    The timeout relies on SIGALRM and is only enforced on the main thread of
+    a process; elsewhere the page is extracted without a time limit.
+    """
+    try:
+        with time_limit(page_timeout_seconds, PageTimeoutError):
+            return backend.extract_page(document, page_number)
+    except PageTimeoutError:
+        logger.warning(
+            f"Skipping page {page_number + 1}: extraction exceeded "
+            f"{page_timeout_seconds}s"
+        )
+        return ""
+
+
+def _open_worker_pdf(pdf_path: str, backend_name: str) -> Tuple[Any, Any]:
+    """
+    Return the backend and opened document of the memory-mapped PDF at pdf_path.
+
+    The opened document is cached per worker, so consecutive tasks of the
+    same PDF parse its cross-reference table only once.
+    """
+    global _worker_pdf
+
+    if _worker_pdf is None or _worker_pdf[:2] != (pdf_path, backend_name):
+        if _worker_pdf is not None:
+            previous_file, previous_mapped = _worker_pdf[2], _worker_pdf[3]
+            _worker_pdf = None
+            previous_mapped.close()
+            previous_file.close()
+        file = open(pdf_path, "rb")
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        backend = pdf_backends.get_backend(backend_name)
+        document = backend.open(mapped)
+        _worker_pdf = (pdf_path, backend_name, file, mapped, backend, document)
+
+    return _worker_pdf[4], _worker_pdf[5]
+
+
+@contextmanager
+def _until(deadline: Optional[float]) -> Iterator[None]:
+    """Raise ExtractionTimeoutError in the block once deadline passes."""
+    if deadline is None:
+        yield
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise ExtractionTimeoutError("Extraction deadline passed")
+    with time_limit(
+        remaining, lambda: ExtractionTimeoutError("Extraction deadline passed")
+    ):
+        yield
+
+
+def _count_pages(
+    pdf_path: str, backend_name: str, deadline: Optional[float] = None
+) -> int:
+    """Pool task: return the page count of the memory-mapped PDF at pdf_path."""
+    with _until(deadline):
+        backend, document = _open_worker_pdf(pdf_path, backend_name)
+        return backend.page_count(document)
+
+
+def _extract_page_range(
+    pdf_path: str,
+    backend_name: str,
+    start: int,
+    end: int,
+    page_timeout_seconds: int,
+    deadline: Optional[float] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Pool task: extract pages [start, end) of the memory-mapped PDF at pdf_path.
+
+    Stops with ExtractionTimeoutError at deadline, a time.monotonic() value of
+    the caller; the clock is shared by the processes of a machine.
+    """
+    with _until(deadline):
+        backend, document = _open_worker_pdf(pdf_path, backend_name)
+        return start, [
+            _extract_page(backend, document, page_number, page_timeout_seconds)
+            for page_number in range(start, end)
+        ]
+
+
+def _get_executor(workers: int, max_memory_mb: int = 0) -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _executor, _executor_workers, _executor_memory_mb
+
+    with _executor_lock:
+        if (
+            _executor is None
+            or _executor_workers != workers
+            or _executor_memory_mb != max_memory_mb
+        ):
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=limit_memory,
+                initargs=(max_memory_mb,),
+            )
+            _executor_workers = workers
+            _executor_memory_mb = max_memory_mb
+            logger.info(f"Started PDF extraction pool with {workers} workers")
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next extraction starts a fresh one."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def shutdown_pool() -> None:
+    """Stop the shared extraction pool, if it was started."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _split_pages(page_count: int, range_count: int) -> List[Tuple[int, int]]:
+    """Split page indices into at most range_count contiguous [start, end) ranges."""
+    range_count = max(1, min(range_count, page_count))
+    size, remainder = divmod(page_count, range_count)
+    ranges = []
+    start = 0
+    for i in range(range_count):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _join_pages(page_texts: List[str]) -> str:
+    return "".join(f"{text}\n" for text in page_texts)
+
+
+def _wait(future: Any, deadline: Optional[float]) -> Any:
+    """Return the result of a pool task, waiting until shortly after deadline."""
+    if deadline is None:
+        return future.result()
+    remaining = deadline + _DEADLINE_GRACE_SECONDS - time.monotonic()
+    return future.result(timeout=max(0.0, remaining))
+
+
+def _extract_parallel(
+    pdf_bytes: bytes,
+    backend_name: str,
+    page_count: Optional[int],
+    workers: int,
+    page_timeout_seconds: int,
+    min_parallel_pages: int = 0,
+    timeout_seconds: int = 0,
+    max_memory_mb: int = 0,
+) -> str:
+    """
+    Extract page ranges of the PDF in the shared process pool.
+
+    Without a page_count the PDF is opened and counted by a worker as well,
+    and split into ranges only if it has at least min_parallel_pages pages.
+
+    Raises:
+        ExtractionTimeoutError: If the PDF takes longer than timeout_seconds;
+            the workers stop its tasks themselves, so the pool stays usable
+    """
+    executor = _get_executor(workers, max_memory_mb)
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+
+    # Workers cache their reader by path, so the name must never be reused
+    with tempfile.NamedTemporaryFile(
+        prefix=f"pdf-{uuid.uuid4().hex}-", suffix=".pdf", delete=False
+    ) as pdf_temp:
+        pdf_temp.write(pdf_bytes)
+        pdf_path = pdf_temp.name
+
+    try:
+        range_count = workers * RANGES_PER_WORKER
+        futures = []
+        if page_count is None:
+            futures = [executor.submit(_count_pages, pdf_path, backend_name, deadline)]
+            page_count = _wait(futures[0], deadline)
+            if workers == 1 or page_count < min_parallel_pages:
+                range_count = 1
+        page_texts: List[str] = [""] * page_count
+
+        futures = [
+            executor.submit(
+                _extract_page_range,
+                pdf_path,
+                backend_name,
+                start,
+                end,
+                page_timeout_seconds,
+                deadline,
+            )
+            for start, end in _split_pages(page_count, range_count)
+        ]
+        for future in futures:
+            start, texts = _wait(future, deadline)
+            page_texts[start : start + len(texts)] = texts
+    except (ExtractionTimeoutError, FutureTimeoutError) as e:
+        for future in futures:
+            future.cancel()
+        if isinstance(e, FutureTimeoutError):
+            # Stuck in native code the alarm cannot interrupt; the worker
+            # stays busy until the backend returns
+            logger.warning("A worker did not stop extracting past its deadline")
+        raise ExtractionTimeoutError(
+            f"Extraction exceeded {timeout_seconds}s"
+        ) from None
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+    finally:
+        os.unlink(pdf_path)
+
+    return _join_pages(page_texts)
+
+
+def extract_text(
+    pdf_file: PdfSource,
+    backend: str = pdf_backends.DEFAULT_BACKEND,
+    workers: int = 0,
+    min_parallel_pages: int = 16,
+    page_timeout_seconds: int = 30,
+    timeout_seconds: int = 0,
+    max_memory_mb: int = 0,
+) -> str:
+    """
+    Extract the text of every page of a PDF.
+
+    With a timeout or memory limit the PDF is isolated in the pool, even with
+    one worker or few pages, so a pathological PDF cannot stall or exhaust the
+    calling process.
+
+    Args:
+        pdf_file: Path, raw bytes or binary stream of the PDF
+        backend: Name of the extraction backend, see pdf_backends.BACKENDS
+        workers: Extraction processes; 0 uses one per CPU and 1 disables the pool
+        min_parallel_pages: PDFs with fewer pages are extracted serially
+        page_timeout_seconds: Time budget per page, 0 disables the timeout
+        timeout_seconds: Time budget of the whole PDF, 0 disables the timeout
+        max_memory_mb: Memory each pool worker may allocate, 0 for no limit
+
+    Returns:
+        Text of each page followed by a newline
+
+    Raises:
+        ExtractionTimeoutError: If the PDF exceeds timeout_seconds
+        ExtractionMemoryError: If the PDF exceeds the memory limit
+        PdfExtractionError: If the PDF cannot be read
+        PdfBackendError: If the backend is unknown or not installed
+    """
+    extractor = pdf_backends.get_backend(backend)
+    workers = workers or os.cpu_count() or 1
+    if timeout_seconds > 0 or max_memory_mb > 0:
+        try:
+            return _extract_parallel(
+                _read_pdf_bytes(pdf_file),
+                extractor.name,
+                None,
+                workers,
+                page_timeout_seconds,
+                min_parallel_pages,
+                timeout_seconds,
+                max_memory_mb,
+            )
+        except ExtractionLimitError:
+            raise
+        except MemoryError as e:
+            raise ExtractionMemoryError(
+                f"Extraction exceeded the memory limit of {max_memory_mb} MB"
+            ) from e
+        except Exception as e:
+            raise PdfExtractionError(f"Failed to extract text from PDF: {e}") from e
+
+    try:
+        pdf_bytes = _read_pdf_bytes(pdf_file)
+        document = extractor.open(BytesIO(pdf_bytes))
+        page_count = extractor.page_count(document)
+    except ExtractionLimitError:
+        raise
+    except MemoryError as e:
+        raise ExtractionMemoryError("Extraction ran out of memory") from e
+    except Exception as e:
+        raise PdfExtractionError(f"Failed to read PDF: {e}") from e
+
+    try:
+        if workers > 1 and page_count >= min_parallel_pages:
+            logger.debug(f"Extracting {page_count} pages with {workers} workers")
+            return _extract_parallel(
+                pdf_bytes, extractor.name, page_count, workers, page_timeout_seconds
+            )
+
+        return _join_pages(
+            [
+                _extract_page(extractor, document, page_number, page_timeout_seconds)
+                for page_number in range(page_count)
+            ]
+        )
+    except ExtractionLimitError:
+        # Raised by a time_limit of the caller around the extraction
+        raise
+    except MemoryError as e:
+        raise ExtractionMemoryError("Extraction ran out of memory") from e
+    except Exception as e:
+        raise PdfExtractionError(f"Failed to extract text from PDF: {e}") from e
@@ -0,0 +1,256 @@
+"""
+Durable per-file progress of bulk PDF processing.
+
+A SQLite database records, for every input file, its status, the output shard
+its paper was written to, and the file's size, modification time and content
+hash. A resumed run skips files that are done and unchanged: size and
+modification time are compared first, and only if they differ is the file
+hashed and compared by content. Entries need not be files on disk: members of
+tar archives are recorded under "<archive>/<member name>" with the size and
+modification time from the archive. Failed files keep their last error and number
+of attempts, so they can be listed and retried. Files that exceeded their
+time or memory limit are recorded with their own status and skipped by
+resumed runs, as they would most likely exceed it again; they are only
+retried on request, see failed_files.
+
+Files are only marked done once the shard holding their paper is finished,
+so a crash never records papers whose shard was not completely written.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed_out"
+STATUS_OVER_MEMORY = "over_memory"
+# Statuses of files skipped by resumed runs however often they were attempted
+LIMIT_STATUSES = (STATUS_TIMED_OUT, STATUS_OVER_MEMORY)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    arxiv_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    shard TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def file_hash(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(data: bytes) -> str:
+    """Return the sha256 hex digest of in-memory content, as file_hash."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ProgressManifest:
+    """SQLite record of which input files were processed."""
+
+    def __init__(self, db_path: Union[str, Path]) -> None:
+        """
+        Open the manifest, creating the database if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "ProgressManifest":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        self._conn.commit()
+        self._conn.close()
+
+    def reset(self) -> None:
+        """Forget all recorded files, for a run that starts over."""
+        self._conn.execute("DELETE FROM files")
+        self._conn.commit()
+
+    def get(self, path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """Return the recorded entry of a file, or None."""
+        row = self._conn.execute(
+            "SELECT * FROM files WHERE path = ?", (str(path),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def needs_processing(
+        self,
+        path: Union[str, Path],
+        max_attempts: Optional[int] = None,
+        size: Optional[int] = None,
+        mtime_ns: Optional[int] = None,
+        hasher: Optional[Callable[[], str]] = None,
+    ) -> bool:
+        """
+        Decide whether a file has to be processed in a resumed run.
+
+        Args:
+            path: Input file
+            max_attempts: Failed files with this many attempts are skipped;
+                failed files are always retried if None
+            size: Current size, read from the file at path if None
+            mtime_ns: Current modification time, read from the file if None
+            hasher: Returns the current content hash, hashes the file if None
+
+        Returns:
+            False if the file is done and unchanged, failed too often, or
+            exceeded its time or memory limit
+        """
+        entry = self.get(path)
+        if entry is None:
+            return True
+        if entry["status"] in LIMIT_STATUSES:
+            return False
+        if entry["status"] == STATUS_FAILED:
+            return max_attempts is None or entry["attempts"] < max_attempts
+
+        if size is None or mtime_ns is None:
+            stat = Path(path).stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        if size == entry["size"] and mtime_ns == entry["mtime_ns"]:
+            return False
+        if size != entry["size"] or entry["content_hash"] is None:
+            return True
+
+        # Same size but touched: unchanged if the content is the same
+        current_hash = hasher() if hasher is not None else file_hash(path)
+        if current_hash != entry["content_hash"]:
+            return True
+        self._conn.execute(
+            "UPDATE files SET mtime_ns = ? WHERE path = ?",
+            (mtime_ns, str(path)),
+        )
+        return False
+
+    def mark_done(self, files: Iterable[Dict[str, Any]], shard: str) -> None:
+        """
+        Record files as done and commit.
+
+        Args:
+            files: Entries with path, arxiv_id, size, mtime_ns and content_hash
+            shard: Output shard holding the files' papers
+        """
+        now = time.time()
+        self._conn.executemany(
+            """
+            INSERT INTO files
+                (path, arxiv_id, status, size, mtime_ns, content_hash, shard,
+                 error, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, NULL, 1, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                arxiv_id = excluded.arxiv_id,
+                status = excluded.status,
+                size = excluded.size,
+                mtime_ns = excluded.mtime_ns,
+                content_hash = excluded.content_hash,
+                shard = excluded.shard,
+                error = NULL,
+                attempts = files.attempts + 1,
+                updated_at = excluded.updated_at
+            """,
+            [
+                (
+                    str(entry["path"]),
+                    entry["arxiv_id"],
+                    STATUS_DONE,
+                    entry["size"],
+                    entry["mtime_ns"],
+                    entry["content_hash"],
+                    shard,
+                    now,
+                )
+                for entry in files
+            ],
+        )
+        self._conn.commit()
+
+    def mark_failed(
+        self, entry: Dict[str, Any], error: str, status: str = STATUS_FAILED
+    ) -> None:
+        """
+        Record a file as failed and commit.
+
+        Args:
+            entry: Entry with path, arxiv_id, size, mtime_ns and content_hash
+            error: Error message
+            status: STATUS_FAILED, or one of LIMIT_STATUSES if the file
+                exceeded its time or memory limit
+        """
+        self._conn.execute(
+            """
+            INSERT INTO files
+                (path, arxiv_id, status, size, mtime_ns, content_hash, shard,
+                 error, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, NULL, ?, 1, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                status = excluded.status,
+                size = excluded.size,
+                mtime_ns = excluded.mtime_ns,
+                content_hash = excluded.content_hash,
+                shard = NULL,
+                error = excluded.error,
+                attempts = files.attempts + 1,
+                updated_at = excluded.updated_at
+            """,
+            (
+                str(entry["path"]),
+                entry["arxiv_id"],
+                status,
+                entry["size"],
+                entry["mtime_ns"],
+                entry["content_hash"],
+                error,
+                time.time(),
+            ),
+        )
+        self._conn.commit()
+
+    def failed_files(self) -> List[Dict[str, Any]]:
+        """
+        Return the entries of failed files, most attempted first.
+
+        Includes the files that exceeded their time or memory limit.
+        """
+        rows = self._conn.execute(
+            "SELECT * FROM files WHERE status != ? ORDER BY attempts DESC, path",
+            (STATUS_DONE,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of files per status."""
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM files GROUP BY status"
+        ).fetchall()
+        return {status: count for status, count in rows}
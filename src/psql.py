@@ -1,18 +1,71 @@
 """PostgreSQL database handler with connection pooling."""
 
 import contextlib
+import csv
+import io
 import logging
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import psycopg2
 import psycopg2.pool
 from psycopg2 import Error as PostgresError
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
 from src import config_loader as config
 
 logger = logging.getLogger(__name__)
 
+# Document expression used for lexical search. Queries must use the exact same
+# expression as the GIN index for Postgres to pick the index up.
+LEXICAL_DOCUMENT_SQL = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(abstract, ''))"
+)
+
+# Normalized title expression for exact title lookups. Mirrors
+# query_router.normalize_title and must match the expression index.
+TITLE_KEY_SQL = "btrim(regexp_replace(lower(title), '[^0-9a-z]+', ' ', 'g'))"
+
+# Columns written by article inserts, all of them required
+ARTICLE_INSERT_COLUMNS = (
+    "authors",
+    "categories",
+    "published_year",
+    "primary_category",
+    "article_id",
+    "text",
+    "abstract",
+    "title",
+)
+
+ARTICLE_RESULT_COLUMNS = (
+    "article_id, authors, categories, primary_category, "
+    "published_year, title, abstract"
+)
+
+
+def _filter_conditions(filters: Dict[str, str], params: Dict[str, Any]) -> List[str]:
+    """
+    Build the WHERE conditions of search filters, adding their parameters.
+
+    Matches the metadata filters of knowledge base searches, see
+    utils.build_search_query.
+
+    Args:
+        filters: Optional "category" and "year" filters.
+        params: Query parameters, extended in place.
+
+    Returns:
+        Conditions to AND with the other conditions of the query.
+    """
+    conditions = []
+    if "category" in filters:
+        conditions.append("primary_category = %(category)s")
+        params["category"] = filters["category"]
+    if "year" in filters:
+        conditions.append("published_year = %(year)s")
+        params["year"] = filters["year"]
+    return conditions
+
 
 class PostgresConnectionError(Exception):
     """Custom exception for PostgreSQL connection errors."""
@@ -31,7 +84,8 @@ class PostgresHandler:
     PostgreSQL database handler with connection pooling.
 
     Provides methods for database operations with proper connection management,
-    error handling, and resource cleanup.
+    error handling, and resource cleanup. The pool is thread-safe, since the
+    web app and the ingestion pipelines use the handler from worker threads.
     """
 
     DEFAULT_MIN_CONNECTIONS = 1
@@ -54,7 +108,7 @@ class PostgresHandler:
         """
         self.min_connections = min_connections
         self.max_connections = max_connections
-        self._pool: Optional[psycopg2.pool.SimpleConnectionPool] = None
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
         self._initialize_pool()
 
     def _initialize_pool(self) -> None:
@@ -69,7 +123,7 @@ class PostgresHandler:
             logger.error(f"Failed to create connection pool: {e}")
             raise PostgresConnectionError(f"Failed to initialize connection pool: {e}")
 
-    def _create_connection_pool(self) -> psycopg2.pool.SimpleConnectionPool:
+    def _create_connection_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
         """
         Create PostgreSQL connection pool.
 
@@ -81,7 +135,7 @@ class PostgresHandler:
         """
         connection_params = self._build_connection_params()
         
-        return psycopg2.pool.SimpleConnectionPool(
+        return psycopg2.pool.ThreadedConnectionPool(
             minconn=self.min_connections,
             maxconn=self.max_connections,
             **connection_params,
@@ -104,7 +158,7 @@ class PostgresHandler:
         }
 
     @property
-    def pool(self) -> psycopg2.pool.SimpleConnectionPool:
+    def pool(self) -> psycopg2.pool.ThreadedConnectionPool:
         """Get the connection pool, initializing if necessary."""
         if self._pool is None:
             self._initialize_pool()
@@ -189,16 +243,7 @@ class PostgresHandler:
             PostgresQueryError: If insert operation fails.
             ValueError: If required fields are missing.
         """
-        required_fields = {
-            "authors",
-            "categories",
-            "published_year",
-            "primary_category",
-            "article_id",
-            "text",
-            "abstract",
-            "title",
-        }
+        required_fields = set(ARTICLE_INSERT_COLUMNS)
 
         missing_fields = required_fields - set(article_data.keys())
         if missing_fields:
@@ -229,6 +274,130 @@ class PostgresHandler:
             )
             raise PostgresQueryError(f"Failed to insert article: {e}")
 
+    def insert_articles(
+        self, articles: List[Dict[str, Any]], page_size: int = 100
+    ) -> int:
+        """
+        Insert several articles in one transaction with multi-row INSERTs.
+
+        Args:
+            articles: Dictionaries containing article data.
+            page_size: Rows sent per INSERT statement.
+
+        Returns:
+            Number of inserted articles.
+
+        Raises:
+            PostgresQueryError: If the insert fails; no article is inserted.
+            ValueError: If required fields are missing.
+        """
+        if not articles:
+            return 0
+
+        required_fields = set(ARTICLE_INSERT_COLUMNS)
+        for article_data in articles:
+            missing_fields = required_fields - set(article_data.keys())
+            if missing_fields:
+                raise ValueError(
+                    f"Missing required fields for article "
+                    f"{article_data.get('article_id')}: {missing_fields}"
+                )
+
+        table_name = getattr(config.psql, "table_name", "articles")
+        insert_query = (
+            f"INSERT INTO {table_name} ({', '.join(ARTICLE_INSERT_COLUMNS)}) VALUES %s"
+        )
+        values = [
+            tuple(article_data[column] for column in ARTICLE_INSERT_COLUMNS)
+            for article_data in articles
+        ]
+
+        try:
+            with self.get_cursor() as cur:
+                execute_values(cur, insert_query, values, page_size=page_size)
+            logger.debug(f"Successfully inserted {len(articles)} articles")
+            return len(articles)
+        except (PostgresError, PostgresQueryError) as e:
+            logger.error(f"Failed to insert batch of {len(articles)} articles: {e}")
+            raise PostgresQueryError(f"Failed to insert articles: {e}")
+
+    def copy_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """
+        Load articles with COPY, the fastest way to insert many rows.
+
+        Rows are streamed as CSV in one transaction. NUL characters, which
+        PostgreSQL text cannot hold, are removed.
+
+        Args:
+            articles: Dictionaries containing article data.
+
+        Returns:
+            Number of copied articles.
+
+        Raises:
+            PostgresQueryError: If the copy fails; no article is inserted.
+            ValueError: If required fields are missing.
+        """
+        if not articles:
+            return 0
+
+        required_fields = set(ARTICLE_INSERT_COLUMNS)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for article_data in articles:
+            missing_fields = required_fields - set(article_data.keys())
+            if missing_fields:
+                raise ValueError(
+                    f"Missing required fields for article "
+                    f"{article_data.get('article_id')}: {missing_fields}"
+                )
+            writer.writerow(
+                [
+                    str(article_data[column] or "").replace("\x00", "")
+                    for column in ARTICLE_INSERT_COLUMNS
+                ]
+            )
+        buffer.seek(0)
+
+        table_name = getattr(config.psql, "table_name", "articles")
+        copy_query = (
+            f"COPY {table_name} ({', '.join(ARTICLE_INSERT_COLUMNS)}) "
+            f"FROM STDIN WITH (FORMAT csv)"
+        )
+
+        try:
+            with self.get_cursor() as cur:
+                cur.copy_expert(copy_query, buffer)
+            logger.debug(f"Successfully copied {len(articles)} articles")
+            return len(articles)
+        except (PostgresError, PostgresQueryError) as e:
+            logger.error(f"Failed to copy batch of {len(articles)} articles: {e}")
+            raise PostgresQueryError(f"Failed to copy articles: {e}")
+
+    def find_existing_article_ids(self, article_ids: List[str]) -> List[str]:
+        """
+        Return which of the given ArXiv IDs are already stored.
+
+        Args:
+            article_ids: IDs to check.
+
+        Returns:
+            The stored IDs among article_ids.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        if not article_ids:
+            return []
+
+        select_query = f"""
+            SELECT DISTINCT article_id
+            FROM {config.psql.table_name}
+            WHERE article_id = ANY(%(article_ids)s);
+        """
+        rows = self.execute_query(select_query, {"article_ids": article_ids}, True)
+        return [row["article_id"] for row in rows or []]
+
     def execute_query(
         self,
         query: str,
@@ -280,6 +449,210 @@ class PostgresHandler:
             return res
         return {}
 
+    def create_search_indexes(self) -> None:
+        """
+        Create the indexes backing lexical search and exact lookups.
+
+        Raises:
+            PostgresQueryError: If index creation fails.
+        """
+        table_name = config.psql.table_name
+        self.execute_query(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_lexical_idx "
+            f"ON {table_name} USING GIN ({LEXICAL_DOCUMENT_SQL});"
+        )
+        self.execute_query(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_article_id_idx "
+            f"ON {table_name} (article_id);"
+        )
+        self.execute_query(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_title_key_idx "
+            f"ON {table_name} ({TITLE_KEY_SQL});"
+        )
+        logger.info(f"Search indexes verified on {table_name}")
+
+    def create_facet_view(self) -> None:
+        """
+        Create the materialized view holding paper counts per facet.
+
+        Counts are grouped by primary category prefix (e.g. "cs" for "cs.AI")
+        and published year. The unique index allows concurrent refreshes.
+
+        Raises:
+            PostgresQueryError: If view creation fails.
+        """
+        table_name = config.psql.table_name
+        self.execute_query(
+            f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_facets AS
+            SELECT coalesce(split_part(primary_category, '.', 1), '') AS category,
+                   coalesce(published_year, '') AS year,
+                   count(*) AS paper_count
+            FROM {table_name}
+            GROUP BY 1, 2;
+            """
+        )
+        self.execute_query(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_facets_key_idx "
+            f"ON {table_name}_facets (category, year);"
+        )
+        logger.info(f"Facet view verified on {table_name}")
+
+    def refresh_facet_view(self) -> None:
+        """
+        Recompute facet counts after new articles were ingested.
+
+        Uses a concurrent refresh so readers are not blocked while it runs.
+
+        Raises:
+            PostgresQueryError: If the refresh fails.
+        """
+        self.execute_query(
+            f"REFRESH MATERIALIZED VIEW CONCURRENTLY {config.psql.table_name}_facets;"
+        )
+        logger.info("Facet view refreshed")
+
+    def fetch_facet_counts(self) -> List[Dict[str, Any]]:
+        """
+        Read all facet counts from the materialized view.
+
+        Returns:
+            Rows with "category", "year" and "paper_count" keys.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        select_query = f"""
+            SELECT category, year, paper_count
+            FROM {config.psql.table_name}_facets
+            ORDER BY category, year;
+        """
+        rows = self.execute_query(select_query, None, True)
+        return [dict(row) for row in rows or []]
+
+    def find_articles_by_id(
+        self, article_ids: List[str], filters: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up articles by exact ArXiv ID.
+
+        Args:
+            article_ids: Candidate IDs, e.g. with and without version suffix.
+            filters: Optional "category" and "year" filters.
+
+        Returns:
+            Matching articles without their full text.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        params: Dict[str, Any] = {"article_ids": article_ids}
+        conditions = ["article_id = ANY(%(article_ids)s)"]
+        conditions += _filter_conditions(filters or {}, params)
+        select_query = f"""
+            SELECT {ARTICLE_RESULT_COLUMNS}
+            FROM {config.psql.table_name}
+            WHERE {" AND ".join(conditions)}
+            LIMIT 1;
+        """
+        rows = self.execute_query(select_query, params, True)
+        return [dict(row) for row in rows or []]
+
+    def find_articles_by_title(
+        self, title_key: str, filters: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up articles by normalized title.
+
+        Args:
+            title_key: Title normalized with query_router.normalize_title.
+            filters: Optional "category" and "year" filters.
+
+        Returns:
+            Matching articles without their full text.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        params: Dict[str, Any] = {"title_key": title_key}
+        conditions = [f"{TITLE_KEY_SQL} = %(title_key)s"]
+        conditions += _filter_conditions(filters or {}, params)
+        select_query = f"""
+            SELECT {ARTICLE_RESULT_COLUMNS}
+            FROM {config.psql.table_name}
+            WHERE {" AND ".join(conditions)}
+            LIMIT 10;
+        """
+        rows = self.execute_query(select_query, params, True)
+        return [dict(row) for row in rows or []]
+
+    def fetch_articles_for_suggest(
+        self, after_id: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch titles, authors and categories of articles added after a row id.
+
+        Args:
+            after_id: Only rows with a greater serial id are returned.
+            limit: Maximum number of rows.
+
+        Returns:
+            Rows ordered by id.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        select_query = f"""
+            SELECT id, article_id, title, authors, categories
+            FROM {config.psql.table_name}
+            WHERE id > %(after_id)s
+            ORDER BY id
+            LIMIT %(limit)s;
+        """
+        rows = self.execute_query(
+            select_query, {"after_id": after_id, "limit": limit}, True
+        )
+        return [dict(row) for row in rows or []]
+
+    def search_articles_lexical(
+        self, query: str, filters: Dict[str, str], limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over article titles and abstracts.
+
+        Args:
+            query: Search query string.
+            filters: Optional "category" and "year" filters.
+            limit: Maximum number of articles to return.
+
+        Returns:
+            Articles shaped like knowledge base search results, with a
+            relevance score normalized to the 0-1 range.
+
+        Raises:
+            PostgresQueryError: If the query fails.
+        """
+        params: Dict[str, Any] = {"query": query, "limit": limit}
+        conditions = [f"{LEXICAL_DOCUMENT_SQL} @@ q"]
+        conditions += _filter_conditions(filters, params)
+
+        select_query = f"""
+            SELECT {ARTICLE_RESULT_COLUMNS},
+                   ts_rank_cd({LEXICAL_DOCUMENT_SQL}, q, 32) AS relevance
+            FROM {config.psql.table_name}, plainto_tsquery('english', %(query)s) q
+            WHERE {" AND ".join(conditions)}
+            ORDER BY relevance DESC
+            LIMIT %(limit)s;
+        """
+
+        rows = self.execute_query(select_query, params, True) or []
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["relevance"] = round(float(result["relevance"]), 3)
+            results.append(result)
+        return results
+
     def test_connection(self) -> bool:
         """
         Test database connection.
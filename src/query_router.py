@@ -0,0 +1,126 @@
+"""Fast path routing for search queries that name a specific paper.
+
+Queries that are an ArXiv identifier or a (near) exact paper title do not need
+embedding, semantic search and reranking. The router classifies the query and
+answers those cases from indexed Postgres lookups, returning None for
+everything else so the caller falls back to the knowledge base search.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import psql
+
+logger = logging.getLogger(__name__)
+
+ROUTE_ARXIV_ID = "arxiv_id"
+ROUTE_TITLE = "title"
+ROUTE_SEMANTIC = "semantic"
+
+# New-style ArXiv IDs (YYMM.NNNN[N] with optional version). These are the
+# digit/dot/"v" strings ChatRequest.validate_arxiv_id accepts, restricted to
+# the real ID layout so numeric queries like "2023" stay semantic.
+ARXIV_ID_PATTERN = re.compile(r"^(?:arxiv:\s*)?(\d{4}\.\d{4,5})(v\d+)?$", re.IGNORECASE)
+
+# Shorter queries are topics rather than titles, skip the title lookup for them
+MIN_TITLE_WORDS = 4
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for exact matching.
+
+    Lowercases, collapses every run of non-alphanumeric characters to a single
+    space and trims. Must stay in sync with psql.TITLE_KEY_SQL.
+
+    Args:
+        title: Raw title or query text
+
+    Returns:
+        Normalized title key
+    """
+    return re.sub(r"[^0-9a-z]+", " ", title.lower()).strip()
+
+
+def classify_query(query: str) -> Tuple[str, Any]:
+    """
+    Classify a search query.
+
+    Args:
+        query: Cleaned search query
+
+    Returns:
+        Tuple of the route and its lookup key: the candidate IDs for
+        ROUTE_ARXIV_ID, the normalized title for ROUTE_TITLE, and the query
+        itself for ROUTE_SEMANTIC
+    """
+    match = ARXIV_ID_PATTERN.match(query.strip())
+    if match:
+        base_id, version = match.group(1), match.group(2)
+        candidates = [base_id + version, base_id] if version else [base_id]
+        return ROUTE_ARXIV_ID, candidates
+
+    title_key = normalize_title(query)
+    if len(title_key.split()) >= MIN_TITLE_WORDS:
+        return ROUTE_TITLE, title_key
+
+    return ROUTE_SEMANTIC, query
+
+
+class QueryRouter:
+    """Answers ArXiv ID and exact title queries from Postgres."""
+
+    def __init__(self, postgres_client: psql.PostgresHandler) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            postgres_client: PostgreSQL client used for the lookups
+        """
+        self._postgres_client = postgres_client
+
+    def route(
+        self, query: str, filters: Optional[Dict[str, str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Resolve a query through the fast path if possible.
+
+        Papers not matching the filters are not returned, as in the knowledge
+        base search the query otherwise falls back to.
+
+        Args:
+            query: Cleaned search query
+            filters: Validated "category" and "year" search filters
+
+        Returns:
+            Matching papers shaped like knowledge base search results with a
+            relevance of 1.0, or None when the query needs a semantic search
+        """
+        route, key = classify_query(query)
+
+        try:
+            if route == ROUTE_ARXIV_ID:
+                rows = self._postgres_client.find_articles_by_id(key, filters)
+            elif route == ROUTE_TITLE:
+                rows = self._postgres_client.find_articles_by_title(key, filters)
+            else:
+                return None
+        except Exception as e:
+            logger.warning(f"Fast path lookup failed for query '{query}': {e}")
+            return None
+
+        if not rows:
+            logger.debug(f"No fast path match for {route} query '{query}'")
+            return None
+
+        results = []
+        seen_articles = set()
+        for row in rows:
+            if row["article_id"] in seen_articles:
+                continue
+            seen_articles.add(row["article_id"])
+            results.append({**row, "relevance": 1.0})
+
+        logger.info(f"Answered {route} query '{query}' from the fast path")
+        return results
@@ -0,0 +1,40 @@
+"""
+Thread-safe counters and stage busy times of a pipeline run.
+
+The batch pipeline and the bulk ingestion sink count papers and time their
+stages from several threads; their statistics subclass RunStats and only
+declare their own counters and how they are reported.
+"""
+
+import threading
+from typing import Any, Dict
+
+
+class RunStats:
+    """Counters and stage busy times of a run, updated from many threads."""
+
+    def __init__(self) -> None:
+        # Stage name -> summed busy seconds across its workers
+        self.stage_seconds: Dict[str, float] = {}
+        self.elapsed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, counter: str, value: int = 1) -> None:
+        """Thread-safe increment of a counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + value)
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """Thread-safe addition of busy time to a stage."""
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def timings(self) -> Dict[str, Any]:
+        """Return the elapsed and per stage seconds, rounded for reports."""
+        return {
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "stage_seconds": {
+                stage: round(seconds, 2)
+                for stage, seconds in self.stage_seconds.items()
+            },
+        }
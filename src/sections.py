@@ -0,0 +1,273 @@
+"""
+Section-aware chunking of paper text.
+
+Reference lists, acknowledgements and similar sections make up a large share
+of a paper's text but are of little use for semantic search. This module
+finds section headings in the cleaned text (short lines such as
+"References", "7 Acknowledgments" or "Appendix B Proofs") and chunks only
+the remaining text, reporting how many chunks the excluded sections would
+have produced.
+
+An excluded section runs from its heading to the next recognized heading of
+another section, or to the end of the text. Two guards keep a misdetected
+heading from dropping real content: excluded headings in the first part of
+the text (tables of contents, a "References" line in the introduction) are
+ignored, and if the excluded sections would cover too much of the text,
+nothing is excluded.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import config_loader as config
+from .text_splitter import RecursiveTextSplitter
+
+logger = logging.getLogger(__name__)
+
+# Excludable section kinds and their heading names, lower case with single
+# spaces as produced by the text normalizer
+SECTION_HEADINGS = {
+    "references": (
+        "references",
+        "reference",
+        "bibliography",
+        "literature cited",
+        "works cited",
+        "cited literature",
+    ),
+    "acknowledgements": (
+        "acknowledgements",
+        "acknowledgments",
+        "acknowledgement",
+        "acknowledgment",
+        "acknowledgements and disclosure of funding",
+        "acknowledgments and disclosure of funding",
+        "funding",
+    ),
+    "appendix": (
+        "appendix",
+        "appendices",
+        "supplementary material",
+        "supplementary materials",
+    ),
+}
+
+# Headings that only end an excluded section
+BOUNDARY_HEADINGS = (
+    "abstract",
+    "introduction",
+    "background",
+    "related work",
+    "preliminaries",
+    "method",
+    "methods",
+    "methodology",
+    "approach",
+    "experiments",
+    "experimental setup",
+    "experimental results",
+    "results",
+    "evaluation",
+    "discussion",
+    "analysis",
+    "conclusion",
+    "conclusions",
+    "conclusion and future work",
+    "conclusions and future work",
+    "limitations",
+    "future work",
+    "broader impact",
+    "broader impacts",
+    "ethics statement",
+    "author contributions",
+)
+
+_HEADING_KINDS = {
+    name: kind for kind, names in SECTION_HEADINGS.items() for name in names
+}
+_HEADING_KINDS.update((name, "body") for name in BOUNDARY_HEADINGS)
+
+# Optional section number ("7", "A", "IV", "3 2" after punctuation removal)
+# followed by up to eight words; headings never span lines
+_HEADING_LINE = re.compile(
+    r"^[ \t]*(?:(?:\d{1,2}|[A-Z]|[IVX]{1,4})[ \t]+)*"
+    r"(?P<title>[A-Za-z][A-Za-z]*(?:[ \t]+[A-Za-z0-9]+){0,7})[ \t]*$",
+    re.MULTILINE,
+)
+_SPACES = re.compile(r"[ \t]+")
+
+Span = Tuple[int, int]
+
+
+def _heading_kind(title: str) -> Optional[str]:
+    """Return the section kind of a heading title, or None if it is none."""
+    title = _SPACES.sub(" ", title.lower())
+    kind = _HEADING_KINDS.get(title)
+    if kind is None and title.split(" ", 1)[0] in ("appendix", "appendices"):
+        # Appendices are titled, e.g. "Appendix B Proof of Theorem 2"
+        kind = "appendix"
+    return kind
+
+
+def find_headings(text: str) -> List[Tuple[int, str]]:
+    """
+    Find recognized section headings.
+
+    Args:
+        text: Cleaned paper text with one heading per line
+
+    Returns:
+        (offset, kind) of every heading in text order; kind is "body" for
+        headings that are never excluded
+    """
+    headings = []
+    for match in _HEADING_LINE.finditer(text):
+        kind = _heading_kind(match.group("title"))
+        if kind is not None:
+            headings.append((match.start(), kind))
+    return headings
+
+
+def find_excluded_sections(
+    text: str,
+    exclude: Iterable[str],
+    min_heading_position: float = 0.3,
+    max_excluded_fraction: float = 0.5,
+) -> List[Tuple[str, int, int]]:
+    """
+    Locate the sections to leave out of chunking.
+
+    Args:
+        text: Cleaned paper text
+        exclude: Section kinds to exclude, keys of SECTION_HEADINGS
+        min_heading_position: Excluded headings in this leading fraction of
+            the text are ignored
+        max_excluded_fraction: If more than this fraction of the text would be
+            excluded, nothing is excluded
+
+    Returns:
+        (kind, start, end) of every excluded section in text order
+    """
+    exclude = set(exclude)
+    if not exclude or not text:
+        return []
+
+    min_offset = len(text) * min_heading_position
+    sections = []
+    current: Optional[Tuple[str, int]] = None
+
+    for offset, kind in find_headings(text):
+        if current is not None and kind != current[0]:
+            sections.append((current[0], current[1], offset))
+            current = None
+        if current is None and kind in exclude and offset >= min_offset:
+            current = (kind, offset)
+
+    if current is not None:
+        sections.append((current[0], current[1], len(text)))
+
+    excluded_chars = sum(end - start for _, start, end in sections)
+    if excluded_chars > len(text) * max_excluded_fraction:
+        logger.warning(
+            f"Excluded sections would cover {excluded_chars / len(text):.0%} of "
+            f"the text, keeping all sections"
+        )
+        return []
+    return sections
+
+
+def chunk_sections(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    exclude: Iterable[str],
+    min_heading_position: float = 0.3,
+    max_excluded_fraction: float = 0.5,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Chunk text without its excluded sections.
+
+    The text between excluded sections is chunked piece by piece, so no chunk
+    mixes kept and excluded text. Every chunk records its span of the text,
+    text[start:end], e.g. for exporting it with columnar.chunk_rows.
+
+    Args:
+        text: Cleaned paper text
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Number of characters to overlap between chunks
+        exclude: Section kinds to exclude, keys of SECTION_HEADINGS
+        min_heading_position: See find_excluded_sections
+        max_excluded_fraction: See find_excluded_sections
+
+    Returns:
+        Tuple of the chunk dictionaries, with "text", "start" and "end" keys,
+        and the number of chunks saved per excluded section kind
+
+    Raises:
+        ValueError: If text is empty
+    """
+    if not text.strip():
+        raise ValueError("Text cannot be empty")
+
+    splitter = RecursiveTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""],
+    )
+    excluded = find_excluded_sections(
+        text, exclude, min_heading_position, max_excluded_fraction
+    )
+
+    kept: List[Span] = []
+    saved: Dict[str, int] = {}
+    position = 0
+    for kind, start, end in excluded:
+        kept.extend(splitter.split_range(text, position, start))
+        skipped = splitter.split_range(text, start, end)
+        saved[kind] = saved.get(kind, 0) + len(skipped)
+        position = end
+    kept.extend(splitter.split_range(text, position, len(text)))
+
+    chunks = [
+        {"text": text[start:end], "start": start, "end": end} for start, end in kept
+    ]
+    return chunks, saved
+
+
+def describe_saved(saved: Dict[str, int]) -> str:
+    """Describe chunks saved per section kind, e.g. "12 (references: 12)"."""
+    total = sum(saved.values())
+    if not total:
+        return "0"
+    kinds = ", ".join(f"{kind}: {count}" for kind, count in saved.items())
+    return f"{total} ({kinds})"
+
+
+def chunk_paper_text(
+    text: str, chunk_size: int = 1500, chunk_overlap: int = 300
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Chunk paper text with the sections config.
+
+    Args:
+        text: Cleaned paper text
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Number of characters to overlap between chunks
+
+    Returns:
+        Tuple of the chunk dictionaries and the number of chunks saved per
+        excluded section kind
+
+    Raises:
+        ValueError: If text is empty
+    """
+    exclude = config.sections.exclude if config.sections.enabled else []
+    return chunk_sections(
+        text,
+        chunk_size,
+        chunk_overlap,
+        exclude,
+        config.sections.min_heading_position,
+        config.sections.max_excluded_fraction,
+    )
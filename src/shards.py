@@ -0,0 +1,353 @@
+"""
+Sharded JSONL, Parquet or Arrow IPC storage of processed papers.
+
+The bulk processor streams every processed paper into append-only JSONL
+shards instead of keeping them all in memory and rewriting one JSON list. A
+shard is closed and a new one started once it holds max_records records or
+max_bytes bytes of JSON, and shards can be zstd compressed. A manifest next
+to the shards records the file, record count, size and ArXiv ID range of every
+finished shard; it is rewritten atomically after each shard, so the shards of
+an interrupted run remain readable.
+
+Shards can also be written as Parquet or Arrow IPC files, see columnar.py;
+these are smaller, faster to read and let readers load only some fields. The
+same writer also stores chunk rows in the columnar formats.
+
+Readers iterate over the records lazily, one shard and one line or record
+batch at a time, optionally projected onto some fields. The UTF-16 JSON list
+files written by earlier versions of the bulk processor are still accepted.
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import zstandard
+
+try:
+    from . import columnar
+except ImportError:
+    # Imported by the bulk processor run as a script from the src folder
+    import columnar
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+JSONL_SUFFIX = ".jsonl"
+ZSTD_SUFFIX = ".jsonl.zst"
+
+JSONL_FORMAT = "jsonl"
+FORMATS = (JSONL_FORMAT, columnar.PARQUET_FORMAT, columnar.ARROW_FORMAT)
+
+# Encoding of the JSON list files of earlier bulk processor versions
+LEGACY_ENCODING = "utf-16"
+
+
+class ShardWriter:
+    """Writes records to rolling JSONL or columnar shards with a manifest."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        prefix: str = "processed_data",
+        max_records: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        compress: bool = False,
+        compression_level: int = 3,
+        append: bool = False,
+        on_shard_closed: Optional[Callable[[Dict[str, Any]], None]] = None,
+        output_format: str = JSONL_FORMAT,
+        kind: str = columnar.PAPERS,
+    ) -> None:
+        """
+        Initialize the writer, creating the directory if needed.
+
+        Args:
+            directory: Directory holding the shards and the manifest
+            prefix: File name prefix of the shards
+            max_records: Records per shard before rolling over
+            max_bytes: Uncompressed bytes per shard before rolling over,
+                estimated from the string lengths for columnar shards
+            compress: Whether JSONL shards are zstd compressed; Parquet
+                shards are always compressed, Arrow IPC shards never
+            compression_level: zstd compression level
+            append: Continue after the shards in an existing manifest instead
+                of starting over; unlisted shard files are overwritten
+            on_shard_closed: Called with the manifest entry of every shard
+                once it is completely written to disk
+            output_format: One of FORMATS
+            kind: Kind of columnar rows, columnar.PAPERS or columnar.CHUNKS
+
+        Raises:
+            ValueError: If a limit is not positive or the format is unknown
+            columnar.ColumnarError: If a columnar format needs missing pyarrow
+        """
+        if max_records <= 0 or max_bytes <= 0:
+            raise ValueError("max_records and max_bytes must be positive")
+        if output_format not in FORMATS:
+            raise ValueError(
+                f"Unknown output format '{output_format}', expected one of {FORMATS}"
+            )
+        if output_format != JSONL_FORMAT:
+            columnar.require_pyarrow()
+
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.compression_level = compression_level
+        self.on_shard_closed = on_shard_closed
+        self.output_format = output_format
+        self.kind = kind
+        self.shards: List[Dict[str, Any]] = []
+        self.records_written = 0
+
+        self._file = None
+        self._stream = None
+        self._current: Optional[Dict[str, Any]] = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.directory / MANIFEST_NAME
+        if append and manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.shards = json.load(f)["shards"]
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open_shard(self) -> None:
+        """Start the next shard file."""
+        if self.output_format != JSONL_FORMAT:
+            suffix = columnar.SUFFIXES[self.output_format]
+        else:
+            suffix = ZSTD_SUFFIX if self.compress else JSONL_SUFFIX
+        name = f"{self.prefix}-{len(self.shards):05d}{suffix}"
+        self._file = open(self.directory / name, "wb")
+        if self.output_format != JSONL_FORMAT:
+            self._stream = columnar.ColumnarWriter(
+                self._file, self.output_format, self.kind
+            )
+        elif self.compress:
+            compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            self._stream = compressor.stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+        self._current = {
+            "file": name,
+            "records": 0,
+            "bytes": 0,
+            "first_article_id": None,
+            "last_article_id": None,
+        }
+
+    def _close_shard(self) -> None:
+        """Finish the current shard and record it in the manifest."""
+        if self._current is None:
+            return
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        shard = self._current
+        self.shards.append(shard)
+        self._file = self._stream = self._current = None
+        self._write_manifest()
+        if self.on_shard_closed is not None:
+            self.on_shard_closed(shard)
+
+    def _write_manifest(self) -> None:
+        """Atomically replace the manifest with the finished shards."""
+        manifest = {
+            "records": sum(shard["records"] for shard in self.shards),
+            "compressed": self.compress,
+            "format": self.output_format,
+            "shards": self.shards,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.directory / MANIFEST_NAME)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Append a record, rolling over to a new shard when the current is full.
+
+        Args:
+            record: JSON serializable record
+        """
+        if self.output_format == JSONL_FORMAT:
+            data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            size = len(data)
+        else:
+            data = record
+            size = columnar.record_bytes(record)
+        if self._current is not None and (
+            self._current["records"] >= self.max_records
+            or self._current["bytes"] + size > self.max_bytes
+        ):
+            self._close_shard()
+        if self._current is None:
+            self._open_shard()
+
+        self._stream.write(data)
+        self._current["records"] += 1
+        self._current["bytes"] += size
+        article_id = record.get("article_id")
+        if article_id is not None:
+            if self._current["first_article_id"] is None:
+                self._current["first_article_id"] = article_id
+            self._current["last_article_id"] = article_id
+        self.records_written += 1
+
+    def close(self) -> None:
+        """Finish the current shard and write the manifest."""
+        self._close_shard()
+        if not self.shards:
+            self._write_manifest()
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the records of one, possibly zstd compressed, JSONL shard."""
+    with open(path, "rb") as f:
+        if path.name.endswith(ZSTD_SUFFIX):
+            stream = zstandard.ZstdDecompressor().stream_reader(f)
+        else:
+            stream = f
+        with stream:
+            for line in _iter_lines(stream):
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _iter_shard(
+    path: Path, columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield the records of one JSONL or columnar shard, projected onto columns."""
+    if columnar.is_columnar_path(path):
+        yield from columnar.iter_records(path, columns)
+    else:
+        yield from _project(_iter_jsonl(path), columns)
+
+
+def _project(
+    records: Iterable[Dict[str, Any]], columns: Optional[List[str]]
+) -> Iterator[Dict[str, Any]]:
+    """Keep only the given fields of records, all if columns is None."""
+    if columns is None:
+        yield from records
+        return
+    for record in records:
+        yield {key: value for key, value in record.items() if key in columns}
+
+
+def _is_shard_file(path: Path) -> bool:
+    return (
+        path.name.endswith(JSONL_SUFFIX)
+        or path.name.endswith(ZSTD_SUFFIX)
+        or columnar.is_columnar_path(path)
+    )
+
+
+def _iter_lines(stream, block_size: int = 1 << 20) -> Iterator[bytes]:
+    """Yield the lines of a binary stream, reading it in blocks."""
+    pending = b""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        lines = (pending + block).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def shard_paths(path: Union[str, Path]) -> List[Path]:
+    """
+    List the shards of a shard directory or manifest.
+
+    The manifest decides which shards exist. Without one, every shard file in
+    the directory is used in name order.
+
+    Args:
+        path: Shard directory or its manifest
+
+    Returns:
+        Paths of the shards in write order
+    """
+    path = Path(path)
+    directory = path.parent if path.is_file() else path
+    manifest_path = directory / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return [directory / shard["file"] for shard in manifest["shards"]]
+    return sorted(p for p in directory.iterdir() if _is_shard_file(p))
+
+
+def iter_records(
+    path: Union[str, Path], columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate over processed paper records.
+
+    Args:
+        path: Shard directory, manifest, single JSONL, Parquet or Arrow IPC
+            shard, or a UTF-16 JSON list file of earlier bulk processor versions
+        columns: Fields to keep, all if None; columnar shards only read the
+            columns holding them
+
+    Yields:
+        Records in write order
+
+    Raises:
+        FileNotFoundError: If path does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+
+    if path.is_dir() or path.name == MANIFEST_NAME:
+        for shard in shard_paths(path):
+            yield from _iter_shard(shard, columns)
+    elif _is_shard_file(path):
+        yield from _iter_shard(path, columns)
+    else:
+        # Legacy JSON lists can only be parsed as a whole
+        with open(path, "r", encoding=LEGACY_ENCODING) as f:
+            yield from _project(json.load(f), columns)
+
+
+def sample_records(
+    records: Iterable[Dict[str, Any]], k: int, rng: Optional[random.Random] = None
+) -> List[Dict[str, Any]]:
+    """
+    Uniformly sample k records in one pass, keeping only k in memory.
+
+    Args:
+        records: Records to sample from
+        k: Sample size
+        rng: Random number generator, the random module if None
+
+    Returns:
+        Up to k records, fewer if there are fewer records
+    """
+    rng = rng or random
+    sample: List[Dict[str, Any]] = []
+    for i, record in enumerate(records):
+        if i < k:
+            sample.append(record)
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                sample[j] = record
+    return sample
@@ -0,0 +1,159 @@
+"""
+Small dependency graph of pipeline stages executed concurrently.
+
+A stage is a named callable with the names of the stages it depends on. It
+receives the results of all finished stages and returns its own result.
+Stages run on a thread pool as soon as all their dependencies have finished,
+which suits the I/O bound pipeline steps (HTTP downloads, ArXiv API calls,
+database and knowledge base inserts) that spend their time waiting.
+
+If a stage fails, no further stages are started, the running ones are
+allowed to finish and the first error is re-raised. Start offset and
+duration of every stage are recorded for a timing breakdown.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+StageFunction = Callable[[Dict[str, Any]], Any]
+
+
+class StageGraphError(Exception):
+    """Raised when a stage graph is invalid."""
+
+    pass
+
+
+class StageGraph:
+    """Dependency graph of stages run concurrently where dependencies allow."""
+
+    def __init__(self, name: str = "pipeline", max_workers: int = 4) -> None:
+        """
+        Initialize an empty graph.
+
+        Args:
+            name: Name used in log messages
+            max_workers: Maximum number of stages running at the same time
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._stages: Dict[str, Tuple[StageFunction, Tuple[str, ...]]] = {}
+        # Stage name -> (start offset, duration) in seconds
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self.elapsed_seconds = 0.0
+
+    def add(
+        self, name: str, function: StageFunction, depends_on: Iterable[str] = ()
+    ) -> None:
+        """
+        Add a stage.
+
+        Args:
+            name: Unique stage name, the key of its result
+            function: Called with the results of all finished stages
+            depends_on: Names of stages that must finish first
+
+        Raises:
+            StageGraphError: If the name is taken or a dependency is unknown
+        """
+        if name in self._stages:
+            raise StageGraphError(f"Duplicate stage '{name}'")
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise StageGraphError(
+                    f"Stage '{name}' depends on unknown stage '{dependency}'"
+                )
+        self._stages[name] = (function, depends_on)
+
+    def _run_stage(
+        self, name: str, results: Dict[str, Any], started: float
+    ) -> Any:
+        function = self._stages[name][0]
+        start = time.perf_counter()
+        try:
+            return function(results)
+        finally:
+            end = time.perf_counter()
+            self.timings[name] = (start - started, end - start)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all stages.
+
+        Stages are added after their dependencies, so the graph is acyclic by
+        construction.
+
+        Returns:
+            Results of all stages by stage name
+
+        Raises:
+            Exception: The first error raised by a stage
+        """
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running: Dict[Future, str] = {}
+        error = None
+        started = time.perf_counter()
+        self.timings = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=self.name
+        ) as executor:
+            while pending or running:
+                if error is None:
+                    ready = [
+                        name
+                        for name, (_, depends_on) in pending.items()
+                        if all(dependency in results for dependency in depends_on)
+                    ]
+                    for name in ready:
+                        del pending[name]
+                        # Stages only read the results of finished dependencies
+                        future = executor.submit(
+                            self._run_stage, name, dict(results), started
+                        )
+                        running[future] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if error is None:
+                            logger.error(f"Stage '{name}' of {self.name} failed: {e}")
+                            error = e
+
+        self.elapsed_seconds = time.perf_counter() - started
+        if error is not None:
+            raise error
+        return results
+
+    def timing_breakdown(self) -> List[str]:
+        """
+        Format the timings of the last run, ordered by start offset.
+
+        Returns:
+            One line per stage with its start offset and duration
+        """
+        return [
+            f"{name}: start +{start:.2f}s, took {duration:.2f}s"
+            for name, (start, duration) in sorted(
+                self.timings.items(), key=lambda item: item[1][0]
+            )
+        ]
+
+    def log_timings(self) -> None:
+        """Log the timing breakdown of the last run."""
+        logger.info(
+            f"{self.name} finished in {self.elapsed_seconds:.2f}s: "
+            + "; ".join(self.timing_breakdown())
+        )
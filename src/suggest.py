@@ -0,0 +1,170 @@
+"""In-memory prefix index powering search box autocomplete.
+
+Titles, author names and categories from the articles table are kept in a
+sorted array of normalized keys, so a prefix lookup is a binary search followed
+by a short forward scan. The index is built once and then refreshed
+incrementally by loading only rows added since the last refresh.
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from . import psql
+from .query_router import normalize_title
+
+logger = logging.getLogger(__name__)
+
+KIND_TITLE = "title"
+KIND_AUTHOR = "author"
+KIND_CATEGORY = "category"
+
+# Rows loaded from Postgres per round trip while refreshing
+REFRESH_BATCH_SIZE = 10000
+
+
+def _split_authors(authors: str) -> List[str]:
+    """Split an authors string like "A. One, B. Two and C. Three" into names."""
+    names = []
+    for part in authors.replace("\n", " ").split(","):
+        for name in part.split(" and "):
+            name = " ".join(name.split())
+            if name:
+                names.append(name)
+    return names
+
+
+def _split_categories(categories: str) -> List[str]:
+    """Split a categories string like "cs.AI, cs.LG" or "cs.GR math.NA"."""
+    return [c for c in categories.replace(",", " ").split() if c]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over titles, authors and categories."""
+
+    def __init__(
+        self, postgres_client: psql.PostgresHandler, refresh_interval_seconds: int
+    ) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            postgres_client: PostgreSQL client the index is loaded from
+            refresh_interval_seconds: Age after which refresh_if_stale reloads
+        """
+        self._postgres_client = postgres_client
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+        # (keys, entries) snapshot, replaced atomically by refreshes so readers
+        # never see keys and entries from different generations
+        self._snapshot: Tuple[List[str], List[Tuple[str, str, str, str]]] = ([], [])
+        self._seen: set = set()
+        self._last_id = 0
+        self._last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot[0])
+
+    def _build_entries(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Tuple[str, str, str, str]]:
+        """Turn article rows into (key, text, kind, article_id) entries."""
+        entries = []
+
+        def add(text: str, kind: str, article_id: str) -> None:
+            key = normalize_title(text)
+            # Authors and categories repeat across papers, keep them once
+            dedup_key = (kind, key) if kind != KIND_TITLE else (kind, key, article_id)
+            if key and dedup_key not in self._seen:
+                self._seen.add(dedup_key)
+                entries.append((key, text, kind, article_id))
+
+        for row in rows:
+            title = " ".join((row.get("title") or "").split())
+            if title:
+                add(title, KIND_TITLE, row.get("article_id") or "")
+            for name in _split_authors(row.get("authors") or ""):
+                add(name, KIND_AUTHOR, "")
+            for category in _split_categories(row.get("categories") or ""):
+                add(category, KIND_CATEGORY, "")
+
+        entries.sort()
+        return entries
+
+    def refresh(self) -> int:
+        """
+        Load articles added since the last refresh into the index.
+
+        Returns:
+            Number of new index entries
+        """
+        with self._refresh_lock:
+            added = []
+            while True:
+                rows = self._postgres_client.fetch_articles_for_suggest(
+                    self._last_id, REFRESH_BATCH_SIZE
+                )
+                if not rows:
+                    break
+                added.extend(self._build_entries(rows))
+                self._last_id = rows[-1]["id"]
+                if len(rows) < REFRESH_BATCH_SIZE:
+                    break
+
+            if added:
+                added.sort()
+                entries = list(heapq.merge(self._snapshot[1], added))
+                keys = [entry[0] for entry in entries]
+                self._snapshot = (keys, entries)
+
+            self._last_refresh = time.monotonic()
+            logger.info(
+                f"Suggest index refreshed: {len(added)} new entries, "
+                f"{len(self)} total"
+            )
+            return len(added)
+
+    def refresh_if_stale(self) -> None:
+        """Start a background refresh if the index is older than the interval."""
+        if time.monotonic() - self._last_refresh < self.refresh_interval_seconds:
+            return
+        if self._refresh_lock.locked():
+            return
+
+        def run() -> None:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Suggest index refresh failed: {e}")
+
+        threading.Thread(target=run, name="suggest-refresh", daemon=True).start()
+
+    def suggest(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Return index entries whose normalized key starts with the prefix.
+
+        Args:
+            prefix: Text typed by the user
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestions with "text", "kind" and "article_id" keys
+        """
+        key = normalize_title(prefix)
+        if not key:
+            return []
+
+        keys, entries = self._snapshot
+        suggestions = []
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and len(suggestions) < limit and keys[i].startswith(key):
+            _, text, kind, article_id = entries[i]
+            suggestions.append(
+                {"text": text, "kind": kind, "article_id": article_id or None}
+            )
+            i += 1
+        return suggestions
@@ -0,0 +1,141 @@
+"""
+Shared LaTeX/equation cleaning for text extracted from ArXiv PDFs.
+
+Both ingestion paths (ArxivProcessPipeline and the bulk ArxivTextExtractor)
+normalize extracted text with the functions in this module. All patterns are
+compiled once at import time.
+
+The cleaning steps are defined as an ordered series of substitutions, and
+earlier substitutions change what later ones see, so patterns are only merged
+where the merged pattern provably produces the same output:
+
+- Passes that cannot match are skipped with a cheap substring check for the
+  literal every match must contain. Substitutions replace matches with a
+  space or delete them, so they never create a new occurrence of a literal
+  that was not there before.
+- The unversioned equation/align environment patterns are covered by their
+  starred variants and the formatting-command patterns (textbf, cite, ...)
+  can never match once braces are gone, so they are dropped.
+- Runs that a substitution would replace with themselves (a single space)
+  are not matched at all, and character deletions use one character class
+  instead of str.translate, which is slow on non-ASCII text.
+"""
+
+import re
+import string
+
+# Bump whenever a change alters the cleaned output; cached text is keyed on it
+VERSION = "1"
+
+# Display equations, in the order they are removed. Each entry is the literal
+# a match must contain and the compiled pattern.
+_EQUATION_PATTERNS = [
+    ("$$", re.compile(r"\$\$.*?\$\$", re.DOTALL)),
+    ("\\[", re.compile(r"\\\[.*?\\\]", re.DOTALL)),
+    (
+        "\\begin{equation",
+        re.compile(r"\\begin\{equation\*?\}.*?\\end\{equation\*?\}", re.DOTALL),
+    ),
+    (
+        "\\begin{align",
+        re.compile(r"\\begin\{align\*?\}.*?\\end\{align\*?\}", re.DOTALL),
+    ),
+    (
+        "\\begin{eqnarray",
+        re.compile(r"\\begin\{eqnarray\*?\}.*?\\end\{eqnarray\*?\}", re.DOTALL),
+    ),
+    (
+        "\\begin{gather",
+        re.compile(r"\\begin\{gather\*?\}.*?\\end\{gather\*?\}", re.DOTALL),
+    ),
+    (
+        "\\begin{multline",
+        re.compile(r"\\begin\{multline\*?\}.*?\\end\{multline\*?\}", re.DOTALL),
+    ),
+    ("\\begin{split}", re.compile(r"\\begin\{split\}.*?\\end\{split\}", re.DOTALL)),
+    # Inline equations ($...$)
+    ("$", re.compile(r"\$[^$\n]+\$")),
+    ("\\begin{math}", re.compile(r"\\begin\{math\}.*?\\end\{math\}", re.DOTALL)),
+    (
+        "\\begin{displaymath}",
+        re.compile(r"\\begin\{displaymath\}.*?\\end\{displaymath\}", re.DOTALL),
+    ),
+]
+
+# General LaTeX commands with optional argument and brace groups
+_LATEX_COMMAND = re.compile(r"\\[a-zA-Z]+\*?(\[[^\]]*\])?(\{[^}]*\})*")
+
+# Line breaks, alignment characters and braces
+_LATEX_SYMBOLS = re.compile(r"\\\\|\\&|[{}]")
+_BRACES = re.compile(r"[{}]")
+
+_MULTIPLE_NEWLINES = re.compile(r"\n\s*\n\s*\n+")
+# Equivalent to [ \t]+ -> " " without rewriting single spaces
+_MULTIPLE_SPACES = re.compile(r"[ \t]{2,}|\t")
+_LINE_EDGE_WHITESPACE = re.compile(r"^\s+|\s+$", re.MULTILINE)
+_REMAINING_COMMANDS = re.compile(r"\\[a-zA-Z]+\*?")
+_REMAINING_LINE_BREAKS = re.compile(r"\\\\")
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+(?=[.,;:])")
+_PUNCTUATION_AT_LINE_END = re.compile(r"([.,;:])\s*\n")
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]+")
+_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]+")
+
+
+def remove_equations(text: str) -> str:
+    """Remove mathematical equations from text."""
+    if "$" not in text and "\\" not in text:
+        return text
+
+    for literal, pattern in _EQUATION_PATTERNS:
+        if literal in text:
+            text = pattern.sub(" ", text)
+
+    return text
+
+
+def remove_latex_commands(text: str) -> str:
+    """Remove LaTeX formatting commands."""
+    if "\\" not in text:
+        return _BRACES.sub(" ", text)
+
+    text = _LATEX_COMMAND.sub(" ", text)
+    return _LATEX_SYMBOLS.sub(" ", text)
+
+
+def clean_text(text: str) -> str:
+    """Clean up the text formatting."""
+    # Remove extra whitespace and newlines
+    text = _MULTIPLE_NEWLINES.sub("\n\n", text)
+    text = _MULTIPLE_SPACES.sub(" ", text)
+    text = _LINE_EDGE_WHITESPACE.sub("", text)
+
+    # Remove common LaTeX artifacts
+    if "\\" in text:
+        text = _REMAINING_COMMANDS.sub("", text)
+    text = _BRACES.sub("", text)
+    if "\\" in text:
+        text = _REMAINING_LINE_BREAKS.sub("", text)
+
+    # Clean up punctuation spacing
+    text = _SPACE_BEFORE_PUNCTUATION.sub("", text)
+    text = _PUNCTUATION_AT_LINE_END.sub(r"\1\n", text)
+    text = _CONTROL_CHARS.sub("", text)
+    text = _PUNCTUATION.sub("", text.strip())
+
+    return text.strip()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Run the full cleaning pipeline on raw extracted text.
+
+    Args:
+        text: Raw text extracted from a PDF
+
+    Returns:
+        Text without equations, LaTeX commands and punctuation
+    """
+    text = remove_equations(text)
+    text = remove_latex_commands(text)
+    return clean_text(text)
@@ -0,0 +1,187 @@
+"""
+Recursive character text splitter working on offsets.
+
+Produces the same chunks as langchain's RecursiveCharacterTextSplitter with
+its defaults (separators kept at the start of the following piece, chunk
+edges stripped of whitespace, lengths measured with len), without building a
+string for every intermediate piece. Since kept separators make every piece
+a contiguous slice of the input, pieces and chunks are handled as
+(start, end) offsets into the original string, and chunk text is only
+materialized when asked for.
+
+The algorithm, as in langchain:
+
+1. Pick the first separator that occurs in the text and split the text in
+   front of every occurrence.
+2. Pieces shorter than chunk_size are merged greedily into chunks of at most
+   chunk_size characters. When a chunk is emitted, pieces are dropped from
+   its front until at most chunk_overlap characters remain, and those carry
+   over into the next chunk.
+3. Pieces of chunk_size or more characters are split recursively with the
+   remaining separators; with none left they become a chunk as they are.
+"""
+
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_SEPARATORS = ("\n\n", "\n", " ", "")
+
+Span = Tuple[int, int]
+
+
+class RecursiveTextSplitter:
+    """Splits text into overlapping chunks, returning offsets into the text."""
+
+    def __init__(
+        self,
+        chunk_size: int = 1500,
+        chunk_overlap: int = 300,
+        separators: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Initialize the splitter.
+
+        Args:
+            chunk_size: Maximum number of characters per chunk
+            chunk_overlap: Maximum number of characters shared by consecutive chunks
+            separators: Separators tried in order, "" splits into characters
+
+        Raises:
+            ValueError: If the sizes are invalid
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be > 0, got {chunk_size}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must be >= 0, got {chunk_overlap}")
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators or DEFAULT_SEPARATORS)
+
+    def split_offsets(self, text: str) -> List[Span]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            (start, end) offsets of the chunks, text[start:end] is a chunk
+        """
+        return self._split(text, 0, len(text), self.separators)
+
+    def split_range(self, text: str, start: int, end: int) -> List[Span]:
+        """
+        Split the slice text[start:end] without copying it.
+
+        Args:
+            text: Text the slice is taken from
+            start: Start offset of the slice
+            end: End offset of the slice
+
+        Returns:
+            (start, end) offsets of the chunks into text
+        """
+        return self._split(text, start, end, self.separators)
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """Yield the chunk strings of text one at a time."""
+        for start, end in self.split_offsets(text):
+            yield text[start:end]
+
+    def split_text(self, text: str) -> List[str]:
+        """Return the chunk strings of text."""
+        return list(self.iter_chunks(text))
+
+    @staticmethod
+    def _split_on(text: str, start: int, end: int, separator: str) -> List[Span]:
+        """Split text[start:end] in front of every occurrence of separator."""
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+
+        spans = []
+        piece_start = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > piece_start:
+                spans.append((piece_start, position))
+            piece_start = position
+            position = text.find(separator, position + len(separator), end)
+        if end > piece_start:
+            spans.append((piece_start, end))
+        return spans
+
+    def _split(
+        self, text: str, start: int, end: int, separators: Sequence[str]
+    ) -> List[Span]:
+        """Recursively split text[start:end] into chunk offsets."""
+        separator = separators[-1]
+        remaining: Sequence[str] = ()
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1 :]
+                break
+
+        chunks: List[Span] = []
+        short_pieces: List[Span] = []
+        for piece in self._split_on(text, start, end, separator):
+            if piece[1] - piece[0] < self.chunk_size:
+                short_pieces.append(piece)
+                continue
+
+            if short_pieces:
+                chunks.extend(self._merge(text, short_pieces))
+                short_pieces = []
+            if remaining:
+                chunks.extend(self._split(text, piece[0], piece[1], remaining))
+            else:
+                # Too long but unsplittable, kept as is without stripping
+                chunks.append(piece)
+
+        if short_pieces:
+            chunks.extend(self._merge(text, short_pieces))
+        return chunks
+
+    def _merge(self, text: str, pieces: List[Span]) -> List[Span]:
+        """Merge contiguous pieces into chunks with overlap."""
+        chunks: List[Span] = []
+        current: Deque[Span] = deque()
+        total = 0
+
+        for piece in pieces:
+            length = piece[1] - piece[0]
+            if total + length > self.chunk_size and current:
+                chunk = self._strip(text, current[0][0], current[-1][1])
+                if chunk is not None:
+                    chunks.append(chunk)
+                while total > self.chunk_overlap or (
+                    total + length > self.chunk_size and total > 0
+                ):
+                    dropped = current.popleft()
+                    total -= dropped[1] - dropped[0]
+            current.append(piece)
+            total += length
+
+        if current:
+            chunk = self._strip(text, current[0][0], current[-1][1])
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _strip(text: str, start: int, end: int) -> Optional[Span]:
+        """Offsets of text[start:end].strip(), or None if it is empty."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if end > start else None
@@ -13,9 +13,8 @@ import logging
 import re
 from typing import Any, Dict, List, Optional
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
 from . import config_loader as config
+from .text_splitter import RecursiveTextSplitter
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -98,7 +97,7 @@ def chunk_text(
     text: str, chunk_size: int = 1500, chunk_overlap: int = 300
 ) -> List[Dict[str, Any]]:
     """
-    Split text into chunks using RecursiveCharacterTextSplitter.
+    Split text into chunks using the recursive character splitter.
 
     Args:
         text: Input text to be chunked
@@ -123,18 +122,15 @@ def chunk_text(
     )
 
     try:
-        text_splitter = RecursiveCharacterTextSplitter(
+        text_splitter = RecursiveTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=["\n\n", "\n", " ", ""],
         )
 
-        docs = text_splitter.create_documents([text])
-        chunks = []
-
-        for i, doc in enumerate(docs):
-            chunks.append({"text": doc.page_content})
-            logger.debug(f"Created chunk {i + 1}: {len(doc.page_content)} characters")
+        chunks = [
+            {"text": chunk} for chunk in text_splitter.iter_chunks(text)
+        ]
 
         logger.info(f"Successfully created {len(chunks)} text chunks")
         return chunks
@@ -229,6 +225,7 @@ def build_search_query(
     metadata: Optional[Dict[str, Any]] = None,
     limit: int = 10,
     relevance_threshold: float = 0.5,
+    rerank: bool = True,
 ) -> str:
     """
     Build search query for knowledge base.
@@ -238,6 +235,7 @@ def build_search_query(
         metadata: Optional metadata filters
         limit: Maximum number of results
         relevance_threshold: Minimum relevance score
+        rerank: Whether the reranking model should reorder the results
 
     Returns:
         SQL search query string
@@ -273,6 +271,9 @@ def build_search_query(
 
         search_query += " AND ".join(conditions)
 
+    if not rerank:
+        search_query += " AND reranking = false"
+
     search_query += f" AND relevance >= {relevance_threshold} LIMIT {limit};"
 
     logger.debug(f"Generated search query (length: {len(search_query)} characters)")
@@ -0,0 +1,164 @@
+"""Compare the storage formats of processed papers (src/shards.py, src/columnar.py).
+
+Writes the same papers as the UTF-16 indented JSON list of earlier bulk
+processor versions, as JSONL and zstd JSONL shards, and as Parquet and Arrow
+IPC shards, then reports per format:
+
+- Size: bytes on disk
+- Write: seconds to write all papers
+- Read: seconds to read every paper with all fields
+- Metadata: seconds to read every paper without its text, as a listing
+  or a metadata load would; columnar shards skip the text column
+- Table: seconds to load the columns into Arrow tables, memory-mapped,
+  for columnar shards only
+
+Usage (from the repository root):
+    python test/columnar_bench.py --data-path ./processed_data --repeat 10
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import columnar, shards  # noqa: E402
+
+METADATA_COLUMNS = [
+    "article_id",
+    "arxiv_id",
+    "title",
+    "authors",
+    "abstract",
+    "categories",
+    "primary_category",
+    "published_year",
+]
+
+
+def load_papers(path: str, limit: Optional[int], repeat: int) -> List[Dict[str, Any]]:
+    """Read papers, repeated with distinct IDs to get a larger corpus."""
+    papers = list(islice(shards.iter_records(path), limit))
+    return [
+        paper | {"article_id": f"{paper.get('article_id')}-{i}"} if i else paper
+        for i in range(repeat)
+        for paper in papers
+    ]
+
+
+def write_legacy(papers: List[Dict[str, Any]], directory: Path) -> Path:
+    """Write the JSON list of earlier bulk processor versions."""
+    path = directory / "processed_data.json"
+    with open(path, "w", encoding=shards.LEGACY_ENCODING, errors="ignore") as f:
+        json.dump(papers, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def shard_writer(output_format: str, compress: bool = False) -> Callable:
+    """Return a function writing papers to shards of a format."""
+
+    def write(papers: List[Dict[str, Any]], directory: Path) -> Path:
+        with shards.ShardWriter(
+            directory, compress=compress, output_format=output_format
+        ) as writer:
+            for paper in papers:
+                writer.write(paper)
+        return directory
+
+    return write
+
+
+def disk_size(path: Path) -> int:
+    """Bytes of a file, or of the shards in a directory."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in shards.shard_paths(path))
+
+
+def timed(function: Callable, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def consume(path: Path, columns: Optional[List[str]] = None) -> None:
+    for _ in shards.iter_records(path, columns):
+        pass
+
+
+def load_tables(path: Path, columns: Optional[List[str]] = None) -> None:
+    for shard in shards.shard_paths(path):
+        columnar.read_table(shard, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage formats of processed papers")
+    parser.add_argument("--data-path", type=str, required=True, help="Processed papers: shard directory, shard or legacy JSON file")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of papers to read")
+    parser.add_argument("--repeat", type=int, default=1, help="Times the papers are repeated")
+    args = parser.parse_args()
+
+    console = Console()
+    papers = load_papers(args.data_path, args.limit, args.repeat)
+    if not papers:
+        console.print(f"[red]No papers in {args.data_path}[/red]")
+        sys.exit(1)
+    try:
+        columnar.require_pyarrow()
+        has_pyarrow = True
+    except columnar.ColumnarError as e:
+        console.print(f"[yellow]{e}, skipping the columnar formats[/yellow]")
+        has_pyarrow = False
+
+    formats = [
+        ("UTF-16 JSON list", write_legacy, False),
+        ("JSONL", shard_writer(shards.JSONL_FORMAT), False),
+        ("JSONL zstd", shard_writer(shards.JSONL_FORMAT, compress=True), False),
+    ]
+    if has_pyarrow:
+        formats += [
+            ("Parquet", shard_writer(columnar.PARQUET_FORMAT), True),
+            ("Arrow IPC", shard_writer(columnar.ARROW_FORMAT), True),
+        ]
+
+    table = Table(title=f"Storage Formats of {len(papers)} Papers", box=box.ROUNDED)
+    table.add_column("Format", style="cyan")
+    table.add_column("Size MB", justify="right")
+    table.add_column("Write s", justify="right")
+    table.add_column("Read s", justify="right", style="green")
+    table.add_column("Metadata s", justify="right", style="green")
+    table.add_column("Table s", justify="right")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="columnar_bench_"))
+    try:
+        for i, (label, write, is_columnar) in enumerate(formats):
+            directory = work_dir / str(i)
+            directory.mkdir()
+            start = time.perf_counter()
+            path = write(papers, directory)
+            write_seconds = time.perf_counter() - start
+            table.add_row(
+                label,
+                f"{disk_size(path) / (1024 * 1024):.2f}",
+                f"{write_seconds:.2f}",
+                f"{timed(consume, path):.2f}",
+                f"{timed(consume, path, METADATA_COLUMNS):.2f}",
+                f"{timed(load_tables, path):.3f}" if is_columnar else "-",
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
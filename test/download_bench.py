@@ -0,0 +1,174 @@
+"""Benchmark and resume check for src/downloader.py against a local stand-in.
+
+Serves a folder of PDFs from a local HTTP server laid out like arxiv.org
+(/pdf/<id>), with Range support and an option to drop every first transfer
+of a file halfway through. Downloads every PDF with the previous approach
+(requests.get per paper, body loaded into memory and wrapped in a BytesIO)
+and with PdfDownloader, verifies the bytes, and reports wall time and peak
+Python heap usage of both.
+
+Usage (from the repository root):
+    python test/download_bench.py --pdf-folder ./pdfs --drop-halfway
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict
+
+import requests
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import downloader  # noqa: E402
+
+RANGE_PATTERN = re.compile(r"bytes=(\d+)-")
+
+
+def make_handler(files: Dict[str, bytes], drop_halfway: bool):
+    """Build a request handler serving files by name below /pdf/."""
+    dropped = set()
+    lock = threading.Lock()
+
+    class PdfHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            data = files.get(self.path.rsplit("/", 1)[-1])
+            if data is None:
+                self.send_error(404)
+                return
+
+            start = 0
+            match = RANGE_PATTERN.match(self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                if start >= len(data):
+                    self.send_error(416)
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+
+            with lock:
+                drop = drop_halfway and self.path not in dropped
+                dropped.add(self.path)
+            if drop:
+                # Send half the body, then cut the connection
+                self.wfile.write(data[start : start + (len(data) - start) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(data[start:])
+
+    return PdfHandler
+
+
+def download_legacy(base_url: str, name: str) -> BytesIO:
+    """The per-paper download used before PdfDownloader."""
+    response = requests.get(f"{base_url}/pdf/{name}", timeout=30)
+    response.raise_for_status()
+    return BytesIO(response.content)
+
+
+def file_digest(pdf_file) -> bytes:
+    """SHA-256 of a binary file, read in chunks so it does not skew peak heap."""
+    digest = hashlib.sha256()
+    pdf_file.seek(0)
+    for chunk in iter(lambda: pdf_file.read(64 * 1024), b""):
+        digest.update(chunk)
+    return digest.digest()
+
+
+def measure(download: Callable[[str], object], names, files) -> Dict[str, float]:
+    """Download every file, check its bytes and return time and peak heap."""
+    expected = {name: hashlib.sha256(data).digest() for name, data in files.items()}
+    failures = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for name in names:
+        try:
+            pdf_file = download(name)
+            if file_digest(pdf_file) != expected[name]:
+                failures += 1
+            pdf_file.close()
+        except Exception as e:
+            failures += 1
+            print(f"{name}: {e}")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / (1024 * 1024), "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming PDF downloader benchmark")
+    parser.add_argument("--pdf-folder", type=str, required=True, help="Folder with PDFs to serve")
+    parser.add_argument("--repeat", type=int, default=3, help="Times each PDF is downloaded")
+    parser.add_argument("--drop-halfway", action="store_true", help="Cut the first transfer of every file halfway")
+    parser.add_argument("--spool-max-mb", type=int, default=1, help="In-memory buffer of the downloader")
+    args = parser.parse_args()
+
+    console = Console()
+    files = {path.stem: path.read_bytes() for path in sorted(Path(args.pdf_folder).glob("*.pdf"))}
+    if not files:
+        console.print(f"[red]No PDFs found in {args.pdf_folder}[/red]")
+        sys.exit(1)
+    names = list(files) * args.repeat
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(files, args.drop_halfway))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    pdf_downloader = downloader.PdfDownloader(
+        base_url=base_url, spool_max_mb=args.spool_max_mb, min_interval_seconds=0
+    )
+    results = {
+        # The legacy download has no resume, so it only runs without drops
+        "requests.get + BytesIO": None if args.drop_halfway else measure(
+            lambda name: download_legacy(base_url, name), names, files
+        ),
+        "PdfDownloader": measure(pdf_downloader.download_pdf, names, files),
+    }
+    pdf_downloader.close()
+    server.shutdown()
+
+    total_mb = sum(len(files[name]) for name in names) / (1024 * 1024)
+    table = Table(title=f"{len(names)} downloads, {total_mb:.1f} MB", box=box.ROUNDED)
+    table.add_column("Downloader", style="cyan")
+    table.add_column("Seconds", justify="right")
+    table.add_column("MB/s", justify="right", style="green")
+    table.add_column("Peak heap (MB)", justify="right")
+    table.add_column("Failures", justify="right", style="red")
+    for label, result in results.items():
+        if result is None:
+            table.add_row(label, "-", "-", "-", "skipped")
+            continue
+        table.add_row(
+            label,
+            f"{result['seconds']:.2f}",
+            f"{total_mb / result['seconds']:.1f}",
+            f"{result['peak_mb']:.1f}",
+            str(result["failures"]),
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compare LaTeX-source extraction (src/latex_source.py) with the PDF path.
+
+For every PDF in a folder whose paper has an e-print in the source folder,
+extracts the text both ways: from the LaTeX source, and from the PDF with
+PyPDF2 (or another backend) followed by the text normalizer, as the bulk
+processor does. Reports papers/s and text quality per path:
+
+- Quality: share of tokens that look like words, see pdf_backend_bench
+- PDF-only tokens: share of the PDF tokens whose word never occurs in the
+  LaTeX text, mostly math glyphs, running headers and hyphenation fragments
+- Shared vocabulary: Jaccard similarity of the two word sets, low values
+  mean one path lost content
+
+Usage (from the repository root):
+    python test/latex_source_bench.py --pdf-folder ./pdfs --source-dir ./src
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_backend_bench import WORD_PATTERN, quality_score  # noqa: E402
+from src import arxiv_tar, latex_source, pdf_extraction, text_normalizer  # noqa: E402
+
+
+def vocabulary(text: str) -> Set[str]:
+    """Lower case word-like tokens of a text."""
+    return {token.lower() for token in text.split() if WORD_PATTERN.match(token)}
+
+
+def find_pairs(pdf_folder: str, source_dir: str) -> List[Tuple[str, Path, Path]]:
+    """Match the PDFs of a folder with their e-prints."""
+    pairs = []
+    for pdf_file in sorted(Path(pdf_folder).glob("*.pdf")):
+        arxiv_id, version = arxiv_tar.parse_pdf_name(pdf_file.name)
+        if arxiv_id is None:
+            continue
+        source = latex_source.find_source(source_dir, arxiv_id, version)
+        if source is not None:
+            pairs.append((arxiv_id, pdf_file, source))
+    return pairs
+
+
+def extract_pdf(pdf_file: Path, backend: str) -> str:
+    """Extract a PDF the way the bulk processor does."""
+    raw_text = pdf_extraction.extract_text(pdf_file, backend=backend, workers=1)
+    return text_normalizer.normalize_text(raw_text)
+
+
+def extract_latex(source: Path) -> Optional[str]:
+    """Extract an e-print, None if it has no usable LaTeX source."""
+    try:
+        return latex_source.extract_text(source)
+    except latex_source.LatexSourceError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LaTeX source vs PDF extraction")
+    parser.add_argument("--pdf-folder", type=str, required=True, help="Folder with PDFs named by ArXiv ID")
+    parser.add_argument("--source-dir", type=str, required=True, help="Folder with the papers' e-prints")
+    parser.add_argument("--backend", type=str, default="pypdf2", help="PDF backend of the PDF path")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of papers to use")
+    args = parser.parse_args()
+
+    console = Console()
+    pairs = find_pairs(args.pdf_folder, args.source_dir)[: args.limit]
+    if not pairs:
+        console.print(f"[red]No PDFs in {args.pdf_folder} with an e-print in {args.source_dir}[/red]")
+        sys.exit(1)
+
+    totals: Dict[str, Dict[str, float]] = {
+        path: {"papers": 0, "chars": 0, "seconds": 0.0, "quality": 0.0}
+        for path in ("latex", "pdf")
+    }
+    pdf_only_shares = []
+    jaccards = []
+    fallbacks = 0
+
+    for arxiv_id, pdf_file, source in pairs:
+        start = time.perf_counter()
+        latex_text = extract_latex(source)
+        latex_seconds = time.perf_counter() - start
+        if latex_text is None:
+            fallbacks += 1
+            continue
+
+        start = time.perf_counter()
+        try:
+            pdf_text = extract_pdf(pdf_file, args.backend)
+        except Exception as e:
+            console.print(f"[yellow]{arxiv_id}: PDF extraction failed: {e}[/yellow]")
+            continue
+        pdf_seconds = time.perf_counter() - start
+
+        for path, text, seconds in (
+            ("latex", latex_text, latex_seconds),
+            ("pdf", pdf_text, pdf_seconds),
+        ):
+            totals[path]["papers"] += 1
+            totals[path]["chars"] += len(text)
+            totals[path]["seconds"] += seconds
+            totals[path]["quality"] += quality_score(text)
+
+        latex_words = vocabulary(latex_text)
+        pdf_words = vocabulary(pdf_text)
+        pdf_tokens = [token.lower() for token in pdf_text.split()]
+        if pdf_tokens:
+            pdf_only = sum(1 for token in pdf_tokens if token not in latex_words)
+            pdf_only_shares.append(pdf_only / len(pdf_tokens))
+        if latex_words or pdf_words:
+            jaccards.append(len(latex_words & pdf_words) / len(latex_words | pdf_words))
+
+    table = Table(title=f"LaTeX Source vs PDF on {len(pairs)} Papers", box=box.ROUNDED)
+    table.add_column("Path", style="cyan")
+    table.add_column("Papers", justify="right")
+    table.add_column("Papers/s", justify="right", style="green")
+    table.add_column("Quality", justify="right")
+    table.add_column("Chars", justify="right")
+    for path, label in (("latex", "LaTeX source"), ("pdf", f"PDF ({args.backend})")):
+        result = totals[path]
+        papers = result["papers"]
+        table.add_row(
+            label,
+            str(int(papers)),
+            f"{papers / result['seconds']:.1f}" if result["seconds"] else "-",
+            f"{result['quality'] / papers:.3f}" if papers else "-",
+            str(int(result["chars"])),
+        )
+    console.print(table)
+
+    if pdf_only_shares:
+        console.print(f"PDF-only tokens: {sum(pdf_only_shares) / len(pdf_only_shares):.1%}")
+        console.print(f"Shared vocabulary: {sum(jaccards) / len(jaccards):.3f}")
+    if fallbacks:
+        console.print(f"[yellow]{fallbacks} e-prints without usable LaTeX source were skipped[/yellow]")
+
+
+if __name__ == "__main__":
+    main()
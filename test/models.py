@@ -19,7 +19,7 @@ class MindsDBInfraConfig(BaseModel):
 class BenchmarkConfig(BaseModel):
     """Configuration for benchmark testing."""
     data_size: int = Field(description="Size of data for benchmarking", default=1000)
-    test_data_path: str = Field(description="Path to test data file")
+    test_data_path: str = Field(description="Path to test data file or shard directory")
     queries_file_path: str = Field(description="Path to queries file")
     output_dir: str = Field(description="Directory for test output")
     iterations: int = Field(description="Number of iterations to run", default=1)
@@ -33,7 +33,7 @@ class BenchmarkConfig(BaseModel):
 class StressConfig(BaseModel):
     """Configuration for stress testing."""
     data_size: int = Field(description="Size of data for stress testing", default=1000)
-    test_data_path: str = Field(description="Path to test data file")
+    test_data_path: str = Field(description="Path to test data file or shard directory")
     queries_file_path: str = Field(description="Path to queries file")
     output_dir: str = Field(description="Directory for test output")
     concurrent_users: int = Field(description="Number of concurrent users", default=30)
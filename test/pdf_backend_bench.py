@@ -0,0 +1,141 @@
+"""Compare the PDF extraction backends in src/pdf_backends.py.
+
+Runs every installed backend over a local folder of PDFs, each backend in a
+fresh process so peak memory is measured in isolation, and reports pages/s,
+peak RSS and a text-quality proxy: the share of extracted tokens that look
+like words (2-20 letters with a vowel). Merged or garbled text from
+multi-column layouts lowers the score.
+
+Usage (from the repository root):
+    python test/pdf_backend_bench.py --pdf-folder ./pdfs
+"""
+
+import argparse
+import multiprocessing
+import re
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import pdf_backends, pdf_extraction  # noqa: E402
+
+WORD_PATTERN = re.compile(r"^[A-Za-z]{2,20}$")
+VOWELS = set("aeiouyAEIOUY")
+
+
+def quality_score(text: str) -> float:
+    """Share of whitespace separated tokens that look like natural words."""
+    tokens = [token.strip(".,;:()[]\"'") for token in text.split()]
+    if not tokens:
+        return 0.0
+    words = sum(
+        1 for token in tokens if WORD_PATTERN.match(token) and VOWELS.intersection(token)
+    )
+    return words / len(tokens)
+
+
+def run_backend(backend: str, pdf_files: List[str], workers: int, queue) -> None:
+    """Extract every PDF with one backend and report the totals to the parent."""
+    pages = 0
+    chars = 0
+    failures = 0
+    scores = []
+    extractor = pdf_backends.get_backend(backend)
+
+    for pdf_file in pdf_files:
+        try:
+            with open(pdf_file, "rb") as file:
+                pages += extractor.page_count(extractor.open(file))
+        except Exception:
+            pass
+
+    start = time.perf_counter()
+    for pdf_file in pdf_files:
+        try:
+            text = pdf_extraction.extract_text(pdf_file, backend=backend, workers=workers)
+            chars += len(text)
+            scores.append(quality_score(text))
+        except Exception as e:
+            failures += 1
+            print(f"[{backend}] {Path(pdf_file).name}: {e}")
+    elapsed = time.perf_counter() - start
+    pdf_extraction.shutdown_pool()
+
+    queue.put({
+        "backend": backend,
+        "pages": pages,
+        "chars": chars,
+        "failures": failures,
+        "seconds": elapsed,
+        "quality": sum(scores) / len(scores) if scores else 0.0,
+        # Linux reports ru_maxrss in KiB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def benchmark(backend: str, pdf_files: List[str], workers: int) -> Dict[str, Any]:
+    """Run one backend in a fresh process and return its measurements."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run_backend, args=(backend, pdf_files, workers, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction backend comparison")
+    parser.add_argument("--pdf-folder", type=str, required=True, help="Folder with PDFs to extract")
+    parser.add_argument("--backends", type=str, nargs="*", default=None, help="Backends to compare (default: all installed)")
+    parser.add_argument("--workers", type=int, default=1, help="Extraction processes per PDF (1 = serial)")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of PDFs to use")
+    args = parser.parse_args()
+
+    console = Console()
+    pdf_files = sorted(str(path) for path in Path(args.pdf_folder).glob("*.pdf"))[: args.limit]
+    if not pdf_files:
+        console.print(f"[red]No PDFs found in {args.pdf_folder}[/red]")
+        sys.exit(1)
+
+    backends = args.backends or pdf_backends.available_backends()
+    missing = sorted(set(pdf_backends.BACKENDS) - set(pdf_backends.available_backends()))
+    if missing:
+        console.print(f"[yellow]Not installed, skipped: {', '.join(missing)}[/yellow]")
+
+    table = Table(title=f"PDF Backends on {len(pdf_files)} PDFs", box=box.ROUNDED)
+    table.add_column("Backend", style="cyan")
+    table.add_column("Pages", justify="right")
+    table.add_column("Pages/s", justify="right", style="green")
+    table.add_column("Peak RSS (MB)", justify="right")
+    table.add_column("Quality", justify="right")
+    table.add_column("Chars", justify="right")
+    table.add_column("Failures", justify="right", style="red")
+
+    for backend in backends:
+        console.print(f"Running {backend}...")
+        result = benchmark(backend, pdf_files, args.workers)
+        pages_per_second = result["pages"] / result["seconds"] if result["seconds"] else 0.0
+        table.add_row(
+            backend,
+            str(result["pages"]),
+            f"{pages_per_second:.1f}",
+            f"{result['peak_rss_mb']:.1f}",
+            f"{result['quality']:.3f}",
+            str(result["chars"]),
+            str(result["failures"]),
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
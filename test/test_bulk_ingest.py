@@ -0,0 +1,139 @@
+"""Knowledge base inserts of src/bulk_ingest.py with bulk metadata records.
+
+Records shaped like data/metadata.json go through a BulkIngestSink whose
+knowledge base builds real insert queries against a fake MindsDB connection,
+so any missing metadata column fails the test.
+
+Usage (from the repository root):
+    python -m pytest test
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("mindsdb_sdk")
+
+from src import bulk_ingest, config_loader as config, dedup, utils  # noqa: E402
+from src.MindsDBMiddleware import knowledge_base  # noqa: E402
+
+TEXT = " ".join(
+    f"Sentence {i} about sparse attention in transformers." for i in range(400)
+)
+
+
+def bulk_record(arxiv_id="2401.00001", text=TEXT):
+    """A processed paper with only the fields of data/metadata.json."""
+    return {
+        "arxiv_id": arxiv_id,
+        "title": "Sparse Attention",
+        "authors": "A. Author, B. Author",
+        "categories": "cs.LG cs.CL",
+        "text": text,
+    }
+
+
+class FakeManager:
+    """Records the queries of a KnowledgeBase, failing them while failing is set."""
+
+    def __init__(self):
+        self.queries = []
+        self.failing = False
+
+    def execute_query(self, query):
+        if self.failing:
+            raise RuntimeError("MindsDB is unavailable")
+        self.queries.append(query)
+
+
+class FakePostgres:
+    """Keeps the stored articles in memory."""
+
+    def __init__(self):
+        self.articles = []
+
+    def find_existing_article_ids(self, article_ids):
+        stored = {article["article_id"] for article in self.articles}
+        return [article_id for article_id in article_ids if article_id in stored]
+
+    def copy_articles(self, articles):
+        self.articles.extend(articles)
+        return len(articles)
+
+    def insert_article(self, article):
+        self.articles.append(article)
+
+
+def ingest(manager, *records, postgres=None):
+    sink = bulk_ingest.BulkIngestSink(
+        knowledge_base.KnowledgeBase(manager),
+        postgres or FakePostgres(),
+        kb_name="test_kb",
+    )
+    for record in records:
+        sink.add(record)
+    return sink.close()
+
+
+@pytest.fixture
+def corpus_filter(monkeypatch):
+    corpus_filter = dedup.NearDuplicateFilter()
+    monkeypatch.setattr(dedup, "shared_filter", lambda: corpus_filter)
+    return corpus_filter
+
+
+def test_kb_metadata_has_every_column():
+    metadata = bulk_ingest.to_kb_metadata(bulk_record())
+    assert "text" not in metadata
+    assert set(config.kb.metadata_columns) <= set(metadata)
+    assert metadata["article_id"]
+    columns = set(config.kb.content_columns + config.kb.metadata_columns)
+    assert utils.build_values_clause([{"text": "chunk"} | metadata], columns)
+
+
+def test_bulk_record_is_inserted(corpus_filter):
+    manager = FakeManager()
+    stats = ingest(manager, bulk_record())
+    assert stats.kb_batches > 0
+    assert stats.kb_batches_failed == 0
+    assert len(manager.queries) == stats.kb_batches
+
+
+def test_failed_insert_does_not_remember_chunks(corpus_filter):
+    manager = FakeManager()
+    manager.failing = True
+    stats = ingest(manager, bulk_record())
+    assert stats.kb_batches == 0
+    assert stats.kb_batches_failed > 0
+    assert len(corpus_filter) == 0
+
+    manager.failing = False
+    retried = ingest(manager, bulk_record())
+    assert retried.kb_batches == stats.kb_batches_failed
+    assert retried.chunks == stats.chunks
+    assert len(corpus_filter) == retried.chunks
+
+    duplicate = ingest(manager, bulk_record("2401.00002"))
+    assert duplicate.chunks == 0
+
+
+def test_stored_papers_are_skipped():
+    manager = FakeManager()
+    postgres = FakePostgres()
+    first = ingest(manager, bulk_record(), postgres=postgres)
+    assert first.articles_stored == 1
+    assert first.skipped == 0
+    queries = len(manager.queries)
+    assert queries > 0
+
+    # A resumed run hands the same paper to a new sink
+    second = ingest(manager, bulk_record(), bulk_record(), postgres=postgres)
+    assert second.skipped == 2
+    assert second.articles_stored == 0
+    assert second.chunks == 0
+    assert len(postgres.articles) == 1
+    assert len(manager.queries) == queries
@@ -0,0 +1,37 @@
+"""Character offsets of exported chunks, src/columnar.py chunk_rows.
+
+Usage (from the repository root):
+    python -m pytest test
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import columnar, sections  # noqa: E402
+
+BOILERPLATE = "Same boilerplate line repeated here.\n\n"
+
+
+def test_repeated_chunks_get_their_own_offsets():
+    text = "Intro paragraph.\n\n" + BOILERPLATE * 50
+    chunks, _ = sections.chunk_sections(text, 80, 0, [])
+    rows = columnar.chunk_rows("2401.00001", text, chunks)
+
+    assert [row["chunk_index"] for row in rows] == list(range(len(chunks)))
+    assert len({row["start"] for row in rows}) == len(rows)
+    for row in rows:
+        assert text[row["start"] : row["end"]] == row["text"]
+
+
+def test_chunks_without_spans_are_searched():
+    text = "first chunk, second chunk"
+    chunks = [{"text": "first chunk"}, {"text": "second chunk"}, {"text": "other"}]
+    rows = columnar.chunk_rows("2401.00001", text, chunks)
+
+    assert [(row["start"], row["end"]) for row in rows] == [
+        (0, 11),
+        (13, 25),
+        (None, None),
+    ]
@@ -0,0 +1,45 @@
+"""Output parity of src/text_normalizer.py with the regex pipeline it replaced.
+
+The legacy pipeline and the random LaTeX-heavy samples come from
+text_normalizer_bench.py; any difference in output fails the test.
+
+Usage (from the repository root):
+    python -m pytest test
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import text_normalizer  # noqa: E402
+from text_normalizer_bench import (  # noqa: E402
+    FRAGMENTS,
+    generate_samples,
+    legacy_normalize_text,
+)
+
+SAMPLES_PER_SEED = 5000
+
+
+@pytest.mark.parametrize("fragment", FRAGMENTS)
+def test_fragment_matches_legacy(fragment):
+    for text in (fragment, fragment * 2, f"word {fragment} word"):
+        assert text_normalizer.normalize_text(text) == legacy_normalize_text(text)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_generated_samples_match_legacy(seed):
+    mismatches = [
+        text
+        for text in generate_samples(SAMPLES_PER_SEED, seed)
+        if text_normalizer.normalize_text(text) != legacy_normalize_text(text)
+    ]
+    assert not mismatches, f"{len(mismatches)} samples differ, e.g. {mismatches[0]!r}"
+
+
+def test_empty_text():
+    assert text_normalizer.normalize_text("") == legacy_normalize_text("")
@@ -0,0 +1,54 @@
+"""Output parity of src/text_splitter.py with langchain's splitter.
+
+On random texts, chunk sizes, overlaps and separator lists from
+text_splitter_bench.py, RecursiveTextSplitter must return exactly the chunks
+of RecursiveCharacterTextSplitter, and every offset pair must slice its chunk
+out of the text. Skipped if langchain_text_splitters is not installed.
+
+Usage (from the repository root):
+    python -m pytest test
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langchain_text_splitters")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: E402
+from src.text_splitter import RecursiveTextSplitter  # noqa: E402
+from text_splitter_bench import random_case  # noqa: E402
+
+CASES_PER_SEED = 5000
+
+
+def assert_same_chunks(text, chunk_size, chunk_overlap, separators):
+    expected = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+    ).split_text(text)
+    splitter = RecursiveTextSplitter(chunk_size, chunk_overlap, separators)
+    offsets = splitter.split_offsets(text)
+
+    assert all(0 <= start < end <= len(text) for start, end in offsets)
+    assert [text[start:end] for start, end in offsets] == expected, (
+        f"size={chunk_size} overlap={chunk_overlap} "
+        f"separators={separators!r} text={text!r}"
+    )
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_cases_match_langchain(seed):
+    rng = random.Random(seed)
+    for _ in range(CASES_PER_SEED):
+        assert_same_chunks(*random_case(rng))
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(1500, 300), (1000, 200)])
+def test_pipeline_settings_match_langchain(chunk_size, chunk_overlap):
+    words = random.Random(0).choices(["lorem", "ipsum", "\n", "\n\n", ".", "é"], k=20000)
+    assert_same_chunks(" ".join(words), chunk_size, chunk_overlap, None)
@@ -0,0 +1,195 @@
+"""Parity check and throughput benchmark for src/text_normalizer.py.
+
+Compares the shared normalizer against a verbatim copy of the per-pattern
+cleaning code it replaced, on text extracted from PDFs and on generated
+LaTeX-heavy samples, then reports throughput of both in MB/s.
+
+Usage (from the repository root):
+    python test/text_normalizer_bench.py --pdf-folder ./pdfs --repeat 3
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import text_normalizer  # noqa: E402
+
+# Verbatim copy of the patterns and cleaning steps that ArxivProcessPipeline and
+# ArxivTextExtractor used before the shared normalizer
+LEGACY_EQUATION_PATTERNS = [
+    r'\$\$.*?\$\$',
+    r'\\\[.*?\\\]',
+    r'\\begin\{equation\*?\}.*?\\end\{equation\*?\}',
+    r'\\begin\{align\*?\}.*?\\end\{align\*?\}',
+    r'\\begin\{eqnarray\*?\}.*?\\end\{eqnarray\*?\}',
+    r'\\begin\{gather\*?\}.*?\\end\{gather\*?\}',
+    r'\\begin\{multline\*?\}.*?\\end\{multline\*?\}',
+    r'\\begin\{split\}.*?\\end\{split\}',
+    r'\$[^$\n]+\$',
+    r'\\begin\{math\}.*?\\end\{math\}',
+    r'\\begin\{displaymath\}.*?\\end\{displaymath\}',
+    r'\\begin\{equation\}.*?\\end\{equation\}',
+    r'\\begin\{align\}.*?\\end\{align\}',
+]
+
+LEGACY_LATEX_COMMANDS = [
+    r'\\[a-zA-Z]+\*?(\[[^\]]*\])?(\{[^}]*\})*',
+    r'\\\\',
+    r'\\&',
+    r'\{|\}',
+    r'\\textbf\{([^}]+)\}',
+    r'\\textit\{([^}]+)\}',
+    r'\\emph\{([^}]+)\}',
+    r'\\cite\{[^}]+\}',
+    r'\\ref\{[^}]+\}',
+    r'\\label\{[^}]+\}',
+]
+
+
+def legacy_remove_equations(text: str) -> str:
+    for pattern in LEGACY_EQUATION_PATTERNS:
+        text = re.sub(pattern, ' ', text, flags=re.DOTALL)
+    return text
+
+
+def legacy_remove_latex_commands(text: str) -> str:
+    for pattern in LEGACY_LATEX_COMMANDS:
+        if r'\{([^}]+)\}' in pattern:
+            text = re.sub(pattern, r'\1', text)
+        else:
+            text = re.sub(pattern, ' ', text)
+    return text
+
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\\[a-zA-Z]+\*?', '', text)
+    text = re.sub(r'[{}]', '', text)
+    text = re.sub(r'\\\\', '', text)
+    text = re.sub(r'\s+([.,;:])', r'\1', text)
+    text = re.sub(r'([.,;:])\s*\n', r'\1\n', text)
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    translator = str.maketrans("", "", string.punctuation)
+    text = text.strip().translate(translator)
+    return text.strip()
+
+
+def legacy_normalize_text(text: str) -> str:
+    text = legacy_remove_equations(text)
+    text = legacy_remove_latex_commands(text)
+    return legacy_clean_text(text)
+
+
+FRAGMENTS = [
+    "The model", " attains ", "state-of-the-art", " results", ".", ",", ";", ":",
+    " ", "  ", "\t", "\n", "\n\n\n", " \n ", "$x$", "$$", "$", "$a_i + b$",
+    "\\[", "\\]", "\\begin{equation}", "\\end{equation}", "\\begin{equation*}",
+    "\\end{equation*}", "\\begin{align}", "\\end{align}", "\\begin{align*}",
+    "\\end{align*}", "\\begin{split}", "\\end{split}", "\\begin{gather}",
+    "\\end{gather}", "\\begin{math}", "\\end{math}", "\\begin{displaymath}",
+    "\\end{displaymath}", "\\textbf{bold}", "\\emph{word}", "\\cite{ref1}",
+    "\\section*[short]{Intro}", "\\\\", "\\&", "\\", "{", "}", "[", "]", "&",
+    "\x00", "\x0b", "\x0c", "\x1f", "\x7f", "é", "\u2013", "(1)", "Fig. 2",
+]
+
+
+def generate_samples(count: int, seed: int) -> List[str]:
+    """Generate random text mixing prose, equations and LaTeX markup."""
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 200)))
+        for _ in range(count)
+    ]
+
+
+def load_pdf_texts(pdf_folder: str) -> List[Tuple[str, str]]:
+    """Extract raw text from every PDF in a folder."""
+    import PyPDF2
+
+    texts = []
+    for pdf_file in sorted(Path(pdf_folder).glob("*.pdf")):
+        try:
+            reader = PyPDF2.PdfReader(str(pdf_file))
+            text = "".join(page.extract_text() + "\n" for page in reader.pages)
+            texts.append((pdf_file.name, text))
+        except Exception as e:
+            print(f"Skipping {pdf_file.name}: {e}")
+    return texts
+
+
+def check_parity(samples: List[Tuple[str, str]]) -> List[str]:
+    """Return the names of samples where the outputs differ."""
+    mismatches = []
+    for name, text in samples:
+        if text_normalizer.normalize_text(text) != legacy_normalize_text(text):
+            mismatches.append(name)
+    return mismatches
+
+
+def measure(func: Callable[[str], str], texts: List[str], repeat: int) -> float:
+    """Return the best throughput of func over the texts in MB/s."""
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / (1024 * 1024)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best if best else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text normalizer parity check and benchmark")
+    parser.add_argument("--pdf-folder", type=str, default=None, help="Folder with ArXiv PDFs to extract text from")
+    parser.add_argument("--samples", type=int, default=2000, help="Number of generated LaTeX-heavy samples")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for generated samples")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions, the best one is reported")
+    args = parser.parse_args()
+
+    console = Console()
+
+    pdf_samples = load_pdf_texts(args.pdf_folder) if args.pdf_folder else []
+    generated = [(f"generated-{i}", text) for i, text in enumerate(generate_samples(args.samples, args.seed))]
+
+    mismatches = check_parity(pdf_samples + generated)
+    if mismatches:
+        console.print(f"[red]✗ Output differs for {len(mismatches)} samples: {mismatches[:10]}[/red]")
+    else:
+        console.print(f"[green]✓ Output identical for {len(pdf_samples) + len(generated)} samples[/green]")
+
+    table = Table(title="Text Normalization Throughput", box=box.ROUNDED)
+    table.add_column("Corpus", style="cyan")
+    table.add_column("Size (MB)", justify="right")
+    table.add_column("Legacy (MB/s)", justify="right")
+    table.add_column("Shared (MB/s)", justify="right")
+    table.add_column("Speedup", justify="right", style="green")
+
+    corpora = [("generated", [text for _, text in generated])]
+    if pdf_samples:
+        corpora.insert(0, ("pdf", [text for _, text in pdf_samples]))
+
+    for corpus_name, texts in corpora:
+        size_mb = sum(len(text.encode("utf-8")) for text in texts) / (1024 * 1024)
+        legacy = measure(legacy_normalize_text, texts, args.repeat)
+        shared = measure(text_normalizer.normalize_text, texts, args.repeat)
+        table.add_row(corpus_name, f"{size_mb:.2f}", f"{legacy:.2f}", f"{shared:.2f}", f"{shared / legacy:.2f}x")
+
+    console.print(table)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Parity check and benchmark for src/text_splitter.py.
+
+Property check: on randomly generated texts, chunk sizes, overlaps and
+separator lists, RecursiveTextSplitter must return exactly the chunks of
+langchain's RecursiveCharacterTextSplitter, and every offset pair must slice
+its chunk out of the original text. The benchmark then times both splitters
+with the chunking settings of the ingestion pipeline on large papers: text
+extracted from a folder of PDFs, repeated to the requested size.
+
+langchain_text_splitters is no longer a dependency of the application; it has
+to be installed to run this script.
+
+Usage (from the repository root):
+    python test/text_splitter_bench.py --cases 20000 --pdf-folder ./pdfs
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import pdf_extraction, text_normalizer  # noqa: E402
+from src.text_splitter import RecursiveTextSplitter  # noqa: E402
+
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+except ImportError:
+    print("langchain_text_splitters is required: pip install langchain_text_splitters")
+    sys.exit(1)
+
+# Pieces random texts are assembled from: words, whitespace runs of every
+# kind the separators care about, and non-ASCII characters
+TOKENS = [
+    "a", "lorem", "ipsum", "x1", "é", "∑", " ", "  ", "\t", "\n", "\n\n",
+    "\n\n\n", " \n ", "\n \n", ".", "ab",
+]
+SEPARATOR_CHOICES = [
+    None,
+    ["\n\n", "\n", " ", ""],
+    ["\n\n", "\n", " "],
+    ["\n", " "],
+    [" ", ""],
+    ["ab", "b", ""],
+]
+
+
+def random_case(rng: random.Random):
+    """Return a random (text, chunk_size, chunk_overlap, separators) case."""
+    text = "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 400)))
+    chunk_size = rng.randint(1, 80)
+    chunk_overlap = rng.randint(0, chunk_size)
+    return text, chunk_size, chunk_overlap, rng.choice(SEPARATOR_CHOICES)
+
+
+def check_parity(cases: int, seed: int, console: Console) -> int:
+    """Compare both splitters on random cases and return the mismatch count."""
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(cases):
+        text, chunk_size, chunk_overlap, separators = random_case(rng)
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+        ).split_text(text)
+        splitter = RecursiveTextSplitter(chunk_size, chunk_overlap, separators)
+        offsets = splitter.split_offsets(text)
+        actual = [text[start:end] for start, end in offsets]
+
+        in_bounds = all(0 <= start < end <= len(text) for start, end in offsets)
+        if actual != expected or not in_bounds:
+            mismatches += 1
+            if mismatches <= 3:
+                console.print(
+                    f"[red]Mismatch[/red] size={chunk_size} overlap={chunk_overlap} "
+                    f"separators={separators!r} text={text!r}"
+                )
+    return mismatches
+
+
+def load_papers(pdf_folder: str, target_chars: int) -> List[str]:
+    """Cleaned text of every PDF in the folder, repeated to target_chars."""
+    papers = []
+    for path in sorted(Path(pdf_folder).glob("*.pdf")):
+        text = text_normalizer.normalize_text(pdf_extraction.extract_text(str(path), workers=1))
+        if text:
+            papers.append((text * (target_chars // len(text) + 1))[:target_chars])
+    return papers
+
+
+def time_splitter(split, papers: List[str], repeat: int) -> float:
+    """Best wall time of splitting every paper, out of repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paper in papers:
+            split(paper)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text splitter parity check and benchmark")
+    parser.add_argument("--cases", type=int, default=20000, help="Random parity cases")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random cases")
+    parser.add_argument("--pdf-folder", type=str, default=None, help="Folder with PDFs to benchmark on")
+    parser.add_argument("--paper-chars", type=int, default=500_000, help="Size every paper is repeated to")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs, the best is reported")
+    args = parser.parse_args()
+
+    console = Console()
+    mismatches = check_parity(args.cases, args.seed, console)
+    style = "green" if mismatches == 0 else "red"
+    console.print(f"[{style}]{mismatches} mismatches in {args.cases} random cases[/{style}]")
+
+    if args.pdf_folder:
+        papers = load_papers(args.pdf_folder, args.paper_chars)
+        if not papers:
+            console.print(f"[red]No PDFs with text found in {args.pdf_folder}[/red]")
+            sys.exit(1)
+
+        # Settings of utils.chunk_text in the ingestion pipeline
+        langchain_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1500, chunk_overlap=300, separators=["\n\n", "\n", " ", ""]
+        )
+        native_splitter = RecursiveTextSplitter(1500, 300, ["\n\n", "\n", " ", ""])
+
+        for paper in papers:
+            if langchain_splitter.split_text(paper) != native_splitter.split_text(paper):
+                mismatches += 1
+                console.print("[red]Chunks differ on a benchmark paper[/red]")
+
+        total_mb = sum(len(paper) for paper in papers) / (1024 * 1024)
+        table = Table(title=f"Splitting {len(papers)} papers, {total_mb:.1f} M chars", box=box.ROUNDED)
+        table.add_column("Splitter", style="cyan")
+        table.add_column("Seconds", justify="right")
+        table.add_column("M chars/s", justify="right", style="green")
+        timings = [
+            ("langchain create_documents", time_splitter(
+                lambda paper: [doc.page_content for doc in langchain_splitter.create_documents([paper])],
+                papers, args.repeat,
+            )),
+            ("RecursiveTextSplitter.split_text", time_splitter(native_splitter.split_text, papers, args.repeat)),
+            ("RecursiveTextSplitter.split_offsets", time_splitter(native_splitter.split_offsets, papers, args.repeat)),
+        ]
+        for label, seconds in timings:
+            table.add_row(label, f"{seconds:.3f}", f"{total_mb / seconds:.1f}")
+        console.print(table)
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import platform
 import subprocess
 import sys
 import time
+from itertools import islice
+from pathlib import Path
 from typing import Dict, List
 import psutil
 from rich.text import Text
@@ -12,6 +14,10 @@ from rich.align import Align
 from rich.panel import Panel
 from rich import box
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import shards  # noqa: E402
+
 def setup_kb(host):
     """Setup Knowledge base before testing"""
     import requests, os
@@ -101,9 +107,14 @@ def load_search_queries(path) -> List[Dict]:
         """Load different types of search queries with varying complexity"""
         return json.load(open(path))
     
+# Fields of the records the ingestion benchmark inserts
+INGESTION_COLUMNS = ["text", "authors", "title", "categories", "arxiv_id"]
+
 def load_ingestion_data(path, data_size) -> List[Dict]:
-    test_data = json.load(open(path, "r", encoding="utf-16"))
-    test_data = test_data[:data_size]
+    # Shards are read lazily up to data_size records, and columnar shards only
+    # read the inserted columns
+    records = shards.iter_records(path, columns=INGESTION_COLUMNS)
+    test_data = list(islice(records, data_size))
     size_bytes = 0
     for item in test_data:
         size_bytes += len(item["text"].encode("utf-16"))
@@ -113,7 +124,7 @@ def load_ingestion_data(path, data_size) -> List[Dict]:
 
 def build_insert_queries(records: List[Dict]) -> List[str]:
     insert_queries = []
-    columns = ["text", "authors", "title", "categories", "arxiv_id"]
+    columns = INGESTION_COLUMNS
     for record in records:
         val = []
         for col in columns:
@@ -128,11 +139,11 @@ def build_insert_queries(records: List[Dict]) -> List[str]:
 
 
 def validate_args(parser, args):
-    if not os.path.isfile(args.data_file_path):
+    if not os.path.exists(args.data_file_path):
         parser.error(f"The file {args.data_file_path} does not exist.")
     
-    if not args.data_file_path.lower().endswith('.json'):
-        parser.error(f"The file {args.data_file_path} is not a JSON file.")
+    if os.path.isfile(args.data_file_path) and not args.data_file_path.lower().endswith(('.json', '.jsonl', '.jsonl.zst', '.parquet', '.arrow')):
+        parser.error(f"The file {args.data_file_path} is not a JSON, JSONL, Parquet or Arrow file.")
 
     if not os.path.isfile(args.search_query_file_path):
         parser.error(f"The file {args.search_query_file_path} does not exist.")
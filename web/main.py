@@ -4,21 +4,39 @@ This module provides a web API for searching ArXiv papers and chatting with
 AI agents about specific papers using MindsDB integration.
 """
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from src import arxiv_pipeline, psql, utils, config_loader as config
+from src import (
+    arxiv_pipeline,
+    downloader,
+    facets,
+    pagination,
+    pdf_extraction,
+    psql,
+    query_router,
+    suggest,
+    utils,
+    config_loader as config,
+)
 from src.MindsDBMiddleware import agent, knowledge_base, manager, ai_table
 from src.models import ChatRequest, ChatResponse, SearchResponse, ErrorResponse
 from src.models.common import HealthStatus
-from src.models.search import PaperResult
+from src.models.search import (
+    FacetsResponse,
+    PaperResult,
+    SearchStreamEvent,
+    Suggestion,
+    SuggestResponse,
+)
 
 os.makedirs("logs", exist_ok=True)
 
@@ -37,12 +55,19 @@ _kb: Optional[knowledge_base.KnowledgeBase] = None
 _psql: Optional[psql.PostgresHandler] = None
 _agent: Optional[agent.Agent] = None
 _aitable: Optional[ai_table.AITable] = None
+_router: Optional[query_router.QueryRouter] = None
+_suggest_index: Optional[suggest.PrefixIndex] = None
+_facet_cache: Optional[facets.FacetCache] = None
+_search_cache = pagination.SearchResultCache(
+    ttl_seconds=config.search.cursor_ttl_seconds,
+    max_entries=config.search.cache_max_entries,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle for startup and shutdown operations."""
-    global _mdb, _kb, _psql, _agent, _aitable
+    global _mdb, _kb, _psql, _agent, _aitable, _router, _suggest_index, _facet_cache
 
     try:
         # Startup
@@ -53,6 +78,8 @@ async def lifespan(app: FastAPI):
         _kb = knowledge_base.KnowledgeBase(_mdb)
         _agent = agent.Agent(_mdb)
         _aitable = ai_table.AITable(_mdb)
+        _router = query_router.QueryRouter(_psql)
+        _facet_cache = facets.FacetCache(_psql, config.search.facet_cache_ttl_seconds)
 
         # Run warmup
         try:
@@ -67,6 +94,12 @@ async def lifespan(app: FastAPI):
             logger.error(f"Warmup failed: {e}")
             raise
 
+        # Build the autocomplete index in the background once warmup data is in
+        _suggest_index = suggest.PrefixIndex(
+            _psql, config.search.suggest_refresh_seconds
+        )
+        _suggest_index.refresh_if_stale()
+
         logger.info("Application startup completed successfully")
         yield
 
@@ -91,6 +124,9 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.error(f"Error closing MindsDB connection: {e}")
 
+        pdf_extraction.shutdown_pool()
+        downloader.close_shared_downloader()
+
         logger.info("Application shutdown completed")
 
 
@@ -209,19 +245,33 @@ async def read_index(request: Request) -> HTMLResponse:
 
 @app.get("/api/search", response_model=SearchResponse)
 async def search_papers(
-    query: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    query: Optional[str] = Query(
+        None, min_length=1, max_length=200, description="Search query"
+    ),
     category: Optional[str] = Query(None, description="Paper category filter"),
     year: Optional[str] = Query(None, description="Publication year filter"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned by a previous page of this search"
+    ),
+    page_size: Optional[int] = Query(
+        None, ge=1, le=50, description="Number of results per page"
+    ),
 ) -> SearchResponse:
     """Search for ArXiv papers based on query and optional filters.
 
+    The first page runs the knowledge base search and caches the ranked
+    candidate list. Following pages are requested with the returned cursor and
+    served from that cache.
+
     Args:
-        query: Search query string
+        query: Search query string, required when no cursor is given
         category: Optional category filter
         year: Optional year filter
+        cursor: Optional cursor pointing at the next page of a previous search
+        page_size: Optional number of results per page
 
     Returns:
-        SearchResponse with search results
+        SearchResponse with one page of search results
 
     Raises:
         HTTPException: If search fails or validation fails
@@ -231,20 +281,65 @@ async def search_papers(
 
     try:
         # Validate and clean inputs
-        query = query.strip()
-        filters = _validate_search_filters(category, year)
+        if cursor:
+            try:
+                position = pagination.decode_cursor(cursor)
+            except pagination.InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = position["query"]
+            filters = _validate_search_filters(
+                position["filters"].get("category"), position["filters"].get("year")
+            )
+            offset = position["offset"]
+        elif query and query.strip():
+            query = query.strip()
+            filters = _validate_search_filters(category, year)
+            offset = 0
+        else:
+            raise HTTPException(
+                status_code=400, detail="Either query or cursor must be provided"
+            )
+
+        # ArXiv IDs and exact titles are answered from Postgres directly
+        if not cursor and _router:
+            routed = await asyncio.to_thread(_router.route, query, filters)
+            if routed:
+                return SearchResponse(results=_convert_to_paper_results(routed))
+
+        page_size = page_size or config.search.page_size
+        cache_key = pagination.build_cache_key(query, filters)
 
-        logger.info(f"Searching papers with query: '{query}', filters: {filters}")
+        logger.info(
+            f"Searching papers with query: '{query}', filters: {filters}, offset: {offset}"
+        )
 
-        # Perform search
-        raw_results = _kb.search(config.kb.name, query, filters)
+        # Perform search, reusing the ranked candidates of earlier pages
+        raw_results = _search_cache.get(cache_key)
+        if raw_results is None:
+            raw_results = _kb.search(
+                config.kb.name, query, filters, limit=config.search.max_candidates
+            )
+            raw_results = raw_results if raw_results else []
+            # KnowledgeBase.search returns [] on errors, so only cache hits
+            if raw_results:
+                _search_cache.put(cache_key, raw_results)
+        else:
+            logger.info(f"Serving page from cached results for query: '{query}'")
+
+        page = raw_results[offset : offset + page_size]
+        next_offset = offset + page_size
+        next_cursor = (
+            pagination.encode_cursor(query, filters, next_offset)
+            if next_offset < len(raw_results)
+            else None
+        )
 
         # Convert to PaperResult models
-        paper_results = _convert_to_paper_results(raw_results if raw_results else [])
+        paper_results = _convert_to_paper_results(page)
 
-        response = SearchResponse(results=paper_results)
+        response = SearchResponse(results=paper_results, next_cursor=next_cursor)
 
-        logger.info(f"Search completed. Found {len(paper_results)} results")
+        logger.info(f"Search completed. Returning {len(paper_results)} results")
         return response
 
     except HTTPException:
@@ -256,6 +351,221 @@ async def search_papers(
         )
 
 
+def _format_sse(event: SearchStreamEvent) -> str:
+    """Serialize a search phase event as a server-sent event message."""
+    return f"data: {event.model_dump_json()}\n\n"
+
+
+async def _stream_search_phases(
+    query: str, filters: Dict[str, str]
+) -> AsyncIterator[str]:
+    """Yield search results phase by phase as server-sent events.
+
+    ArXiv ID and exact title matches, as well as cached results, end the
+    stream immediately. Otherwise the semantic
+    (no rerank) and reranked knowledge base searches start concurrently while
+    Postgres answers a lexical query, and each phase is emitted as soon as it
+    is available unless a later phase has already finished. The knowledge
+    base returns no results when a search fails, so an empty reranked phase
+    does not replace the papers an earlier phase found. The knowledge base
+    searches are cancelled when the client disconnects.
+
+    Args:
+        query: Cleaned search query
+        filters: Validated search filters
+
+    Yields:
+        Server-sent event messages
+    """
+    page_size = config.search.page_size
+    cache_key = pagination.build_cache_key(query, filters)
+
+    if _router:
+        routed = await asyncio.to_thread(_router.route, query, filters)
+        if routed:
+            yield _format_sse(
+                SearchStreamEvent(
+                    phase="exact", results=_convert_to_paper_results(routed)
+                )
+            )
+            yield "event: done\ndata: {}\n\n"
+            return
+
+    def next_cursor_for(results: list) -> Optional[str]:
+        if page_size < len(results):
+            return pagination.encode_cursor(query, filters, page_size)
+        return None
+
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Streaming cached results for query: '{query}'")
+        yield _format_sse(
+            SearchStreamEvent(
+                phase="cached",
+                results=_convert_to_paper_results(cached[:page_size]),
+                next_cursor=next_cursor_for(cached),
+            )
+        )
+        yield "event: done\ndata: {}\n\n"
+        return
+
+    semantic_task = asyncio.create_task(
+        asyncio.to_thread(
+            _kb.search, config.kb.name, query, filters, limit=page_size, rerank=False
+        )
+    )
+    reranked_task = asyncio.create_task(
+        asyncio.to_thread(
+            _kb.search,
+            config.kb.name,
+            query,
+            filters,
+            limit=config.search.max_candidates,
+        )
+    )
+
+    try:
+        lexical = []
+        if _psql:
+            try:
+                lexical = await asyncio.to_thread(
+                    _psql.search_articles_lexical, query, filters, page_size
+                )
+            except Exception as e:
+                logger.warning(f"Lexical search failed for query '{query}': {e}")
+            if lexical and not reranked_task.done():
+                yield _format_sse(
+                    SearchStreamEvent(
+                        phase="lexical", results=_convert_to_paper_results(lexical)
+                    )
+                )
+
+        semantic = await semantic_task
+        if semantic and not reranked_task.done():
+            yield _format_sse(
+                SearchStreamEvent(
+                    phase="semantic", results=_convert_to_paper_results(semantic)
+                )
+            )
+
+        reranked = await reranked_task
+        if reranked:
+            _search_cache.put(cache_key, reranked)
+            yield _format_sse(
+                SearchStreamEvent(
+                    phase="reranked",
+                    results=_convert_to_paper_results(reranked[:page_size]),
+                    next_cursor=next_cursor_for(reranked),
+                )
+            )
+        elif semantic or lexical:
+            # The knowledge base returns no results when the search fails, so
+            # the earlier phase's results are kept instead of being cleared
+            logger.warning(
+                f"Reranked search returned nothing for query '{query}', "
+                f"keeping the {'semantic' if semantic else 'lexical'} results"
+            )
+            yield _format_sse(
+                SearchStreamEvent(
+                    phase="semantic" if semantic else "lexical",
+                    results=_convert_to_paper_results(semantic or lexical),
+                )
+            )
+        else:
+            yield _format_sse(SearchStreamEvent(phase="reranked", results=[]))
+        yield "event: done\ndata: {}\n\n"
+    finally:
+        # Stop waiting for the knowledge base when the client disconnected
+        for task in (semantic_task, reranked_task):
+            if not task.done():
+                task.cancel()
+
+
+@app.get("/api/search/stream")
+async def stream_search_papers(
+    query: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    category: Optional[str] = Query(None, description="Paper category filter"),
+    year: Optional[str] = Query(None, description="Publication year filter"),
+) -> StreamingResponse:
+    """Stream search results progressively over server-sent events.
+
+    Emits one event per search phase (exact, cached, lexical, semantic, reranked),
+    each tagged with its phase, followed by a final "done" event.
+
+    Args:
+        query: Search query string
+        category: Optional category filter
+        year: Optional year filter
+
+    Returns:
+        StreamingResponse producing text/event-stream messages
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    if not _kb:
+        raise HTTPException(status_code=503, detail="Knowledge base not initialized")
+
+    query = query.strip()
+    filters = _validate_search_filters(category, year)
+    logger.info(f"Streaming search with query: '{query}', filters: {filters}")
+
+    return StreamingResponse(
+        _stream_search_phases(query, filters),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/suggest", response_model=SuggestResponse)
+async def suggest_queries(
+    q: str = Query(..., min_length=2, max_length=100, description="Typed prefix"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=20, description="Maximum number of suggestions"
+    ),
+) -> SuggestResponse:
+    """Suggest paper titles, author names and categories for a typed prefix.
+
+    Args:
+        q: Prefix typed into the search box
+        limit: Optional maximum number of suggestions
+
+    Returns:
+        SuggestResponse with matching suggestions
+
+    Raises:
+        HTTPException: If the suggest index is not initialized
+    """
+    if not _suggest_index:
+        raise HTTPException(status_code=503, detail="Suggest index not initialized")
+
+    _suggest_index.refresh_if_stale()
+    suggestions = _suggest_index.suggest(q, limit or config.search.suggest_limit)
+    return SuggestResponse(suggestions=[Suggestion(**s) for s in suggestions])
+
+
+@app.get("/api/facets", response_model=FacetsResponse)
+async def get_facets() -> FacetsResponse:
+    """Get paper counts per category prefix and publication year.
+
+    Counts come from the facet materialized view, cached in memory.
+
+    Returns:
+        FacetsResponse with per-category, per-year and combined counts
+
+    Raises:
+        HTTPException: If the counts cannot be loaded
+    """
+    if not _facet_cache:
+        raise HTTPException(status_code=503, detail="Facet cache not initialized")
+
+    try:
+        return FacetsResponse(**await asyncio.to_thread(_facet_cache.get))
+    except Exception as e:
+        logger.error(f"Failed to load facet counts: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load facet counts")
+
+
 @app.get("/api/chat-ui", response_class=HTMLResponse)
 async def get_chat_ui(
     request: Request,
@@ -306,6 +616,13 @@ async def get_chat_ui(
                 _agent.create(paper_agent_name, [paper_kb_name], [])
                 logger.info(f"Agent created successfully: {paper_agent_name}")
 
+                # Make the new paper available to autocomplete right away
+                if _suggest_index:
+                    try:
+                        await asyncio.to_thread(_suggest_index.refresh)
+                    except Exception as e:
+                        logger.warning(f"Failed to refresh suggest index: {e}")
+
             except Exception as e:
                 logger.error(f"Failed to process paper {arxiv_id}: {e}")
                 raise HTTPException(
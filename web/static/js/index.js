@@ -13,6 +13,18 @@ paperCardsContainer.classList.add('paper-cards-wrapper'); // Add a class for pot
 // Append the new container to the results div, after the header
 resultsContainer.appendChild(paperCardsContainer);
 
+// "Load more" button for fetching the next page of results
+const loadMoreBtn = document.createElement('button');
+loadMoreBtn.classList.add('load-more-btn');
+loadMoreBtn.textContent = 'Load more';
+loadMoreBtn.style.display = 'none';
+resultsContainer.appendChild(loadMoreBtn);
+
+// Cursor for the next page of the current search and the query it belongs to
+let nextCursor = null;
+let currentQuery = '';
+let shownCount = 0;
+
 // Function to show the loading spinner
 const showLoading = () => {
     loading.style.display = 'block'; // Use flex to center spinner and text
@@ -58,53 +70,193 @@ const createPaperCard = (paper) => {
     return card;
 };
 
+// Labels shown next to the result count while results are still being refined
+const phaseLabels = {
+    exact: '',
+    cached: '',
+    lexical: ' (keyword matches, refining...)',
+    semantic: ' (semantic matches, reranking...)',
+    reranked: ''
+};
+
+// Build the query string shared by the search endpoints
+const buildSearchParams = (query) => {
+    var params = `query=${encodeURIComponent(query)}`;
+    if(field.value) params += `&category=${field.value}`;
+    if(year.value) params += `&year=${year.value}`;
+    return params;
+};
+
+// Replace the displayed results with a new set of papers
+const renderResults = (query, data, phase = '') => {
+    currentQuery = query;
+    shownCount = data.length;
+    resultsCount.textContent = `Found ${shownCount} papers for "${query}"${phaseLabels[phase] || ''}`;
+    paperCardsContainer.innerHTML = '';
+
+    if (data.length > 0) {
+        data.forEach(paper => {
+            const paperCard = createPaperCard(paper);
+            paperCardsContainer.appendChild(paperCard);
+        });
+    } else {
+        paperCardsContainer.innerHTML = '<p class="no-results">No papers found for your query.</p>';
+    }
+};
+
+const showSearchError = () => {
+    resultsCount.textContent = `Error: Could not retrieve papers.`;
+    paperCardsContainer.innerHTML = '<p class="error-message">An error occurred while fetching results. Please try again later.</p>';
+    setNextCursor(null);
+};
+
 // Function to fetch and display search results
 const fetchAndDisplayResults = async (query) => {
     showLoading();
     // Clear previous results
     paperCardsContainer.innerHTML = '';
+    setNextCursor(null);
     resultsCount.textContent = 'Searching...'; // Update count while loading
 
     try {
-        var url = `/api/search?query=${encodeURIComponent(query)}`;
-        if(field.value) url += `&category=${field.value}`;
-        if(year.value) url += `&year=${year.value}`;
-        const response = await fetch(url);
+        const response = await fetch(`/api/search?${buildSearchParams(query)}`);
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
         const res = await response.json(); // Assuming the API returns JSON
-        const data = res.results;
-        resultsCount.textContent = `Found ${data.length} papers for "${query}"`;
-
-        if (data.length > 0) {
-            data.forEach(paper => {
-                const paperCard = createPaperCard(paper);
-                paperCardsContainer.appendChild(paperCard);
-            });
-        } else {
-            paperCardsContainer.innerHTML = '<p class="no-results">No papers found for your query.</p>';
-        }
+        renderResults(query, res.results);
+        setNextCursor(res.next_cursor);
 
     } catch (error) {
         console.error('Error fetching papers:', error);
-        resultsCount.textContent = `Error: Could not retrieve papers.`;
-        paperCardsContainer.innerHTML = '<p class="error-message">An error occurred while fetching results. Please try again later.</p>';
+        showSearchError();
     } finally {
         hideLoading();
     }
 };
 
+// Stream of the search currently being displayed, closed when a new search starts
+let activeStream = null;
+
+// Display results progressively as each search phase arrives
+const streamAndDisplayResults = (query) => {
+    if (activeStream) activeStream.close();
+
+    showLoading();
+    paperCardsContainer.innerHTML = '';
+    setNextCursor(null);
+    resultsCount.textContent = 'Searching...';
+
+    let received = false;
+    const stream = new EventSource(`/api/search/stream?${buildSearchParams(query)}`);
+    activeStream = stream;
+
+    stream.onmessage = (event) => {
+        const res = JSON.parse(event.data);
+        received = true;
+        hideLoading();
+        renderResults(query, res.results, res.phase);
+        setNextCursor(res.next_cursor);
+    };
+
+    stream.addEventListener('done', () => {
+        stream.close();
+        hideLoading();
+        // The last phase may be an earlier one kept after reranking failed
+        if (received) {
+            resultsCount.textContent = `Found ${shownCount} papers for "${query}"`;
+        }
+    });
+
+    stream.onerror = () => {
+        stream.close();
+        if (!received) {
+            // Streaming unavailable or failed before any phase arrived
+            fetchAndDisplayResults(query);
+        }
+    };
+};
+
+// Remember the cursor of the next page and toggle the "Load more" button
+const setNextCursor = (cursor) => {
+    nextCursor = cursor || null;
+    loadMoreBtn.style.display = nextCursor ? 'block' : 'none';
+};
+
+// Fetch the next page of the current search and append it to the results
+const fetchNextPage = async () => {
+    if (!nextCursor) return;
+
+    loadMoreBtn.disabled = true;
+    loadMoreBtn.textContent = 'Loading...';
+
+    try {
+        const response = await fetch(`/api/search?cursor=${encodeURIComponent(nextCursor)}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const res = await response.json();
+        res.results.forEach(paper => {
+            paperCardsContainer.appendChild(createPaperCard(paper));
+        });
+        shownCount += res.results.length;
+        resultsCount.textContent = `Found ${shownCount} papers for "${currentQuery}"`;
+        setNextCursor(res.next_cursor);
+    } catch (error) {
+        console.error('Error fetching next page:', error);
+        setNextCursor(null);
+    } finally {
+        loadMoreBtn.disabled = false;
+        loadMoreBtn.textContent = 'Load more';
+    }
+};
+
+loadMoreBtn.addEventListener('click', fetchNextPage);
+
 document.addEventListener('DOMContentLoaded', function() {
     // Add this to your existing DOMContentLoaded code
     
     // API button clicks
     document.addEventListener('click', handleApiButtonClick);
+
+    // Paper counts next to the filter options
+    loadFacetCounts();
     
     // Your existing code continues here...
 });
 
+// Append paper counts to the field and year filter options
+async function loadFacetCounts() {
+    try {
+        const response = await fetch('/api/facets');
+        if (!response.ok) {
+            return;
+        }
+        const data = await response.json();
+
+        const annotate = (select, facetValues) => {
+            const counts = new Map(facetValues.map(facet => [facet.value, facet.count]));
+            Array.from(select.options).forEach(option => {
+                if (!option.value) {
+                    return;
+                }
+                if (!option.dataset.label) {
+                    option.dataset.label = option.textContent;
+                }
+                const count = counts.get(option.value) || 0;
+                option.textContent = `${option.dataset.label} (${count.toLocaleString()})`;
+            });
+        };
+
+        annotate(field, data.categories);
+        annotate(year, data.years);
+    } catch (error) {
+        console.error('Error loading facet counts:', error);
+    }
+}
+
 async function makeApiCall(action, paperId) {
 
     var url = `/api/ai-table?action=${action}&arxivId=${paperId}`;
@@ -179,7 +331,11 @@ function displayApiResponse(container, action, content, isError = false) {
 const performSearch = () => {
     const query = searchBox.value.trim();
     if (query) {
-        fetchAndDisplayResults(query);
+        if (window.EventSource) {
+            streamAndDisplayResults(query);
+        } else {
+            fetchAndDisplayResults(query);
+        }
     }
 }
 
@@ -188,6 +344,49 @@ searchBtn.addEventListener('click', () => {
     performSearch();
 });
 
+// Autocomplete suggestions for the search box
+const suggestionList = document.getElementById('search-suggestions');
+let suggestTimer = null;
+let suggestController = null;
+
+async function fetchSuggestions(prefix) {
+    if (suggestController) {
+        suggestController.abort();
+    }
+    suggestController = new AbortController();
+
+    try {
+        const response = await fetch(`/api/suggest?q=${encodeURIComponent(prefix)}`, {
+            signal: suggestController.signal
+        });
+        if (!response.ok) {
+            return;
+        }
+        const data = await response.json();
+        suggestionList.innerHTML = '';
+        data.suggestions.forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.text;
+            option.label = suggestion.kind;
+            suggestionList.appendChild(option);
+        });
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('Error fetching suggestions:', error);
+        }
+    }
+}
+
+searchBox.addEventListener('input', () => {
+    clearTimeout(suggestTimer);
+    const prefix = searchBox.value.trim();
+    if (prefix.length < 2) {
+        suggestionList.innerHTML = '';
+        return;
+    }
+    suggestTimer = setTimeout(() => fetchSuggestions(prefix), 150);
+});
+
 // Event listener for pressing Enter in the search box
 searchBox.addEventListener('keypress', (event) => {
     if (event.key === 'Enter') {
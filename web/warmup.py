@@ -2,12 +2,11 @@
 
 import json
 import logging
-import random
 from pathlib import Path
 from typing import List, Dict, Any
 
 from src.MindsDBMiddleware import manager, knowledge_base, ai_table
-from src import psql, utils, config_loader as config
+from src import bulk_ingest, psql, shards, config_loader as config
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +53,8 @@ class WarmUp:
 
             logger.debug(f"Executing SQL: {create_table_sql}")
             self._psql.execute_query(create_table_sql)
+            self._psql.create_search_indexes()
+            self._psql.create_facet_view()
             logger.info(
                 f"PostgreSQL table '{config.psql.table_name}' created/verified successfully"
             )
@@ -130,8 +131,17 @@ class WarmUp:
             )
             raise
 
-    def _load_sample_data(self) -> List[Dict[str, Any]]:
-        """Load sample data from JSON file.
+    def _load_sample_data(self, count: int) -> List[Dict[str, Any]]:
+        """Load a random sample of records from the sample data.
+
+        The sample data is read from the shards in data/sample_data, from
+        data/sample_data.parquet or data/sample_data.arrow, or from the JSON
+        list in data/sample_data.json, whichever exists first. Shards and
+        columnar files are streamed and sampled in one pass, so only the
+        sampled records are kept in memory.
+
+        Args:
+            count: Number of records to sample
 
         Returns:
             List of sample records
@@ -140,7 +150,12 @@ class WarmUp:
             FileNotFoundError: If data file doesn't exist
             json.JSONDecodeError: If JSON is invalid
         """
-        data_file_path = Path(__file__).parent.parent / "data/sample_data.json"
+        data_dir = Path(__file__).parent.parent / "data"
+        candidates = ["sample_data", "sample_data.parquet", "sample_data.arrow"]
+        data_file_path = next(
+            (data_dir / name for name in candidates if (data_dir / name).exists()),
+            data_dir / "sample_data.json",
+        )
         logger.info(f"Loading sample data from '{data_file_path}'")
 
         if not data_file_path.exists():
@@ -148,10 +163,9 @@ class WarmUp:
             raise FileNotFoundError(f"Data file not found: {data_file_path}")
 
         try:
-            with open(data_file_path, "r", encoding="utf-16") as file:
-                data = json.load(file)
-                logger.info(f"Successfully loaded {len(data)} records from data file")
-                return data
+            data = shards.sample_records(shards.iter_records(data_file_path), count)
+            logger.info(f"Successfully sampled {len(data)} records from data file")
+            return data
 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in data file '{data_file_path}': {e}")
@@ -160,58 +174,20 @@ class WarmUp:
             logger.error(f"Unexpected error loading data file '{data_file_path}': {e}")
             raise
 
-    def _process_record(self, record: Dict[str, Any]) -> None:
-        """Process a single record by inserting to PostgreSQL and knowledge base.
+    def insert_sample_records(self) -> None:
+        """Insert sample records to PostgreSQL and knowledge base.
 
-        Args:
-            record: Dictionary containing record data
+        Records are streamed through a bulk ingestion sink, which loads them
+        into PostgreSQL with COPY and inserts their chunks into the knowledge
+        base concurrently.
         """
-        try:
-            logger.debug(f"Processing record with keys: {list(record.keys())}")
-            text_content = record["text"]
-
-            logger.debug("Inserting record to PostgreSQL")
-            self._psql.insert_article(record)
-
-            if not text_content:
-                logger.warning(
-                    "Record contains no 'text' field, skipping text processing"
-                )
-                return
-
-            metadata = {k: v for k, v in record.items() if k != "text"}
-            logger.debug(f"Extracted metadata keys: {list(metadata.keys())}")
-
-            logger.debug(
-                f"Chunking text content (length: {len(text_content)} characters)"
-            )
-            chunks = utils.chunk_text(text_content, chunk_size=1500, chunk_overlap=300)
-            enriched_chunks = [chunk | metadata for chunk in chunks]
-
-            logger.info(
-                f"Processing {len(enriched_chunks)} chunks for record {metadata['article_id']}"
-            )
-
-            kb_name = config.kb.name
-            logger.debug(f"Inserting chunks to knowledge base '{kb_name}'")
-            self._kb.insert(kb_name, enriched_chunks, 10)
-            logger.info(
-                f"Successfully inserted {len(enriched_chunks)} chunks to knowledge base"
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to process record: {e}")
-            raise
-
-    def insert_sample_records(self) -> None:
-        """Insert sample records to PostgreSQL and knowledge base."""
         try:
             logger.info("Starting sample records insertion process")
-            records = self._load_sample_data()
-            records = random.sample(records, config.app.sample_data_count)
-            for i, record in enumerate(records, 1):
-                logger.info(f"Processing record {i}/{len(records)}")
-                self._process_record(record)
+            records = self._load_sample_data(config.app.sample_data_count)
+            with bulk_ingest.BulkIngestSink.from_config(self._kb, self._psql) as sink:
+                for i, record in enumerate(records, 1):
+                    logger.info(f"Queueing record {i}/{len(records)}")
+                    sink.add(record)
 
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Error loading sample data: {e}")
@@ -266,6 +242,7 @@ class WarmUp:
             if config.app.load_sample_data:
                 self.insert_sample_records()
                 self.create_index_on_kb()
+                self._psql.refresh_facet_view()
 
             logger.info("Step 6: Create AI tables")
             self._ai_table.create_ai_tables()